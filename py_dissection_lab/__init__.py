@@ -0,0 +1,14 @@
+"""
+py-dissection-lab: small, dissected examples of Python's execution machinery
+
+    py_dissection_lab.threads       threading.Event patterns, signal primitives, worker pool
+    py_dissection_lab.generators    generators, coroutines and the log pipelines built on them
+    py_dissection_lab.market        order book / market simulation (OOP)
+
+Importing a module has no side effects: demos run from main() only, and heavy
+optional dependencies (NumPy, zstd) are imported the first time they are used.
+
+Usage:
+    python -m py_dissection_lab --help
+    python -m py_dissection_lab logscan logs
+"""
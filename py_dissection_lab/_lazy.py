@@ -0,0 +1,61 @@
+"""
+Optional dependencies, imported on first use
+
+`import numpy` costs ~100 ms of cold start, paid by every command even when
+the NumPy path never runs. Modules hold a LazyModule instead:
+
+    np = optional_module("numpy")   # None when not installed (find_spec, nothing imported)
+
+    if np is not None: ...          # same checks as with try/except ImportError
+    np.asarray(values)              # first attribute access imports it
+    np.loaded                       # imported already? (an ndarray can only exist if so)
+
+Attributes are cached on the proxy after the first lookup, so hot loops pay
+an instance dict lookup, not a __getattr__ call.
+"""
+
+from __future__ import annotations
+
+import importlib
+import importlib.util
+import sys
+from types import ModuleType
+
+
+class LazyModule:
+    """Stand-in for an installed optional module that is imported on first attribute access."""
+
+    def __init__(self, name: str):
+        self.__dict__["_name"] = name
+        self.__dict__["_module"] = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._module is not None or self._name in sys.modules
+
+    def load(self) -> ModuleType:
+        if self._module is None:
+            self.__dict__["_module"] = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attr: str):
+        if attr.startswith("__"):
+            raise AttributeError(attr)
+        value = getattr(self.load(), attr)
+        self.__dict__[attr] = value
+        return value
+
+    def __repr__(self) -> str:
+        return f"<optional module {self._name!r} ({'loaded' if self.loaded else 'not loaded'})>"
+
+
+def optional_module(*names: str) -> LazyModule | None:
+    """The first of `names` that is installed, as a LazyModule; None if none is."""
+    for name in names:
+        try:
+            found = importlib.util.find_spec(name) is not None
+        except (ImportError, ValueError):       # parent package missing
+            found = False
+        if found:
+            return LazyModule(name)
+    return None
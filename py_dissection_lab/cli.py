@@ -0,0 +1,153 @@
+"""
+python -m py_dissection_lab <command>
+
+    palindromes      first palindromes from --lo, or how many lie in [--lo, --hi)
+    logscan          ERROR lines of every log file in a directory (sequential,
+                     parallel, or incremental with a checkpoint index)
+    push             the push pipeline: source_push -> filter_error -> sink_print
+    threading-demo   the threading.Event wait / set / join walk-through
+    importtime       cold-start import cost of the package against a budget
+
+Each command imports its module only when it runs, so `--help` and the cheap
+commands never pay for the heavy ones.
+
+Usage:
+    python -m py_dissection_lab palindromes --lo 1000000 --count 5
+    python -m py_dissection_lab logscan logs --workers 4
+    python -m py_dissection_lab push logs
+    python -m py_dissection_lab threading-demo --annotated
+    python -m py_dissection_lab importtime
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from itertools import islice
+from pathlib import Path
+
+
+def cmd_palindromes(args: argparse.Namespace) -> None:
+    from .generators.palindrome_generator_all_demos import MAX_RANGE_VALUE, count_palindromes, iter_palindrome_chunks
+
+    if args.hi is not None:
+        print(count_palindromes(args.lo, args.hi))
+        return
+    chunks = iter_palindrome_chunks(args.lo, MAX_RANGE_VALUE, chunk_size=min(args.count, 65536), use_numpy=False)
+    for value in islice((v for chunk in chunks for v in chunk), args.count):
+        print(value)
+
+
+def _matching(lines, needle: str):
+    from .generators.yield_from import iter_error_lines
+
+    return iter_error_lines(lines) if needle == "ERROR" else (line for line in lines if needle in line)
+
+
+def cmd_logscan(args: argparse.Namespace) -> None:
+    if args.index:
+        from .generators.log_checkpoint import OffsetIndex, follow_lines, iter_new_lines
+
+        index = OffsetIndex(args.index)
+        lines = follow_lines(args.log_dir, index) if args.follow else iter_new_lines(args.log_dir, index)
+        matches = _matching(lines, args.needle)
+    elif args.workers > 1:
+        from .generators.parallel_log_scan import iter_error_lines_parallel
+
+        matches = iter_error_lines_parallel(args.log_dir, args.needle, workers=args.workers)
+    else:
+        from .generators.yield_from import iter_all_log_lines
+
+        lines = iter_all_log_lines(args.log_dir, compressed=args.compressed)
+        matches = _matching(lines, args.needle)
+    for line in matches:
+        print(line, end="", flush=args.follow)
+
+
+def cmd_push(args: argparse.Namespace) -> None:
+    from .generators.push_based_pipeline import run_push_pipeline
+
+    if args.log_dir is None:
+        run_push_pipeline(["INFO ok", "ERROR boom", "INFO ok2", "ERROR AGAIN"])
+    else:
+        from .generators.yield_from import iter_all_log_lines
+
+        run_push_pipeline(line.rstrip("\n") for line in iter_all_log_lines(args.log_dir))
+
+
+def cmd_threading_demo(args: argparse.Namespace) -> None:
+    if args.annotated:
+        from .threads.threading_event_wait_annotated import main
+    else:
+        from .threads.threading_event_wait_original import main
+    main()
+
+
+def cmd_importtime(args: argparse.Namespace) -> None:
+    from .importtime import check, check_commands
+
+    if args.module:
+        ok = check(args.module, args.budget_ms, args.repeat, args.python)
+    else:
+        ok = check_commands(args.repeat, args.python)
+    if not ok:
+        sys.exit(1)
+
+
+def _count(text: str) -> int:
+    value = int(text)
+    if value < 0:
+        raise argparse.ArgumentTypeError(f"must be >= 0, got {value}")
+    return value
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m py_dissection_lab", description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    commands = parser.add_subparsers(dest="command", required=True, metavar="command")
+
+    p = commands.add_parser("palindromes", help="list or count palindromes")
+    p.add_argument("--lo", type=int, default=0, help="start of the range")
+    p.add_argument("--count", type=_count, default=10, help="how many to print")
+    p.add_argument("--hi", type=int, help="print how many palindromes lie in [lo, hi) instead")
+    p.set_defaults(run=cmd_palindromes)
+
+    p = commands.add_parser("logscan", help="print matching lines from a log directory")
+    p.add_argument("log_dir", type=Path)
+    p.add_argument("--needle", default="ERROR")
+    p.add_argument("--workers", type=int, default=1, help="> 1 scans files in a process pool")
+    p.add_argument("--index", type=Path, help="only read what previous runs have not (offset checkpoint file)")
+    p.add_argument("--follow", action="store_true", help="keep tailing new lines (needs --index)")
+    p.add_argument("--compressed", action="store_true",
+                   help="also read rotated .gz/.bz2/.xz/.zst files (sequential scan only)")
+    p.set_defaults(run=cmd_logscan)
+
+    p = commands.add_parser("push", help="push lines through filter_error into sink_print")
+    p.add_argument("log_dir", type=Path, nargs="?", help="push every line of these logs (default: four demo lines)")
+    p.set_defaults(run=cmd_push)
+
+    p = commands.add_parser("threading-demo", help="worker sets a threading.Event, main waits and joins")
+    p.add_argument("--annotated", action="store_true", help="run the commented English version")
+    p.set_defaults(run=cmd_threading_demo)
+
+    p = commands.add_parser("importtime", help="check cold-start import time against a budget")
+    p.add_argument("--budget-ms", type=float, default=None,
+                   help="with --module: fail above this many ms (default 60; commands have their own budgets)")
+    p.add_argument("--repeat", type=int, default=5, help="fresh interpreters to measure; the fastest counts")
+    p.add_argument("--module", action="append",
+                   help="module to import (repeatable; default: the import path of every command)")
+    p.add_argument("--python", default=sys.executable, help="interpreter to measure")
+    p.set_defaults(run=cmd_importtime)
+    return parser
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = build_parser().parse_args(argv)
+    if args.command == "logscan" and args.follow and not args.index:
+        build_parser().error("--follow needs --index")
+    if args.command == "logscan" and args.compressed and (args.index or args.workers > 1):
+        build_parser().error("--compressed works with the sequential scan only")
+    if args.command == "importtime" and args.budget_ms is not None and not args.module:
+        build_parser().error("--budget-ms applies to --module; each command has its own budget")
+    args.run(args)
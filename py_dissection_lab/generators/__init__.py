@@ -0,0 +1 @@
+"""Generators, coroutines and the pull / push log pipelines built on them."""
@@ -0,0 +1,294 @@
+"""
+asyncio versions of the pull (yield_from.py) and push (push_based_pipeline.py) pipelines
+
+The generator pipelines block their thread on open()/read() and on the sink, so
+inside an asyncio service each one would need its own thread. Here:
+
+pull side (async generators, consumed with `async for`)
+- aiter_log_files(log_dir)         ~ iter_log_files
+- aiter_lines(path)                ~ iter_lines
+- aiter_all_log_lines(log_dir)     ~ iter_all_log_lines
+- aiter_error_lines(lines)         ~ iter_error_lines
+
+File access runs in a bounded thread pool (io_executor()). aiter_lines reads large
+chunks there, splits them into lines (and with contains="ERROR" filters them)
+in the same call, and keeps up to `read_ahead` batches buffered ahead of the
+consumer. The event loop only hands finished lines out, a slice at a time.
+
+push side (async generators driven with asend / aclose)
+- sink_print_async()               ~ sink_print
+- filter_error_async(target)       ~ filter_error
+- source_push_async(lines, target) ~ source_push
+
+    out = await aprime(sink_print_async())
+    flt = await aprime(filter_error_async(out))
+    await source_push_async(aiter_all_log_lines(log_dir), flt)
+
+aclose() cascades down the chain the same way close() does in filter_error.
+
+Usage:
+    python -m py_dissection_lab.generators.async_pipelines logs
+    python -m py_dissection_lab.generators.async_pipelines /tmp/async-logs --bench --pipelines 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import os
+import sys
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import AsyncIterable, AsyncIterator, Iterable
+
+from .yield_from import iter_error_lines, iter_lines, iter_log_files
+
+_io_executor: ThreadPoolExecutor | None = None
+
+
+def io_executor() -> ThreadPoolExecutor:
+    """Shared, bounded thread pool for blocking file operations."""
+    global _io_executor
+    if _io_executor is None:
+        _io_executor = ThreadPoolExecutor(
+            max_workers=min(32, (os.cpu_count() or 1) * 4),
+            thread_name_prefix="log-io",
+        )
+    return _io_executor
+
+
+# ----------------------------------------------------------------------
+# Pull side
+# ----------------------------------------------------------------------
+async def aiter_log_files(log_dir: Path, pattern: str = "*.log", executor: Executor | None = None) -> AsyncIterator[Path]:
+    """Yield log file paths sorted by name; the directory listing runs in the executor."""
+    loop = asyncio.get_running_loop()
+    paths = await loop.run_in_executor(executor or io_executor(), lambda: list(iter_log_files(log_dir, pattern)))
+    for path in paths:
+        yield path
+
+
+_PIECE = 16 * 1024      # characters split per GIL hand-off in _read_lines
+
+
+def _read_lines(f, size: int, contains: str | None, tail: list[str]) -> list[str] | None:
+    """
+    Executor side of aiter_lines: read `size` characters and cut them into lines
+    (keeping "\n", like text-mode iteration), filtered on `contains`; None at EOF.
+    tail[0] carries the unfinished last line over to the next call.
+
+    Splitting holds the GIL. A busy worker would keep the loop thread waiting a
+    whole switch interval (5 ms) each time, so the chunk is split in _PIECE slices
+    with time.sleep(0) in between, which hands the GIL over right away.
+    """
+    chunk = f.read(size)
+    if not chunk:
+        if not tail[0]:
+            return None
+        parts, tail[0] = [tail[0]], ""
+        return parts if contains is None or contains in parts[0] else []
+    lines = []
+    for start in range(0, len(chunk), _PIECE):
+        parts = (tail[0] + chunk[start:start + _PIECE]).split("\n")
+        tail[0] = parts.pop()
+        lines += [part + "\n" for part in parts if contains is None or contains in part]
+        time.sleep(0)
+    return lines
+
+
+async def aiter_lines(
+    path: Path,
+    encoding: str = "utf-8",
+    *,
+    contains: str | None = None,
+    executor: Executor | None = None,
+    chunk_size: int = 64 * 1024,
+    read_ahead: int = 4,
+    slice_lines: int = 64,
+) -> AsyncIterator[str]:
+    """
+    Yield lines from a file lazily, like iter_lines(), without blocking the event loop.
+
+    A background task reads `chunk_size` characters at a time in the executor, where
+    they are also split into lines and, with `contains`, filtered (aiter_error_lines
+    over the result then sees only the matches). At most `read_ahead` batches are
+    queued, which bounds memory per pipeline. The loop thread only hands lines out,
+    and goes back to the loop every `slice_lines` of them.
+    """
+    loop = asyncio.get_running_loop()
+    executor = executor or io_executor()
+    f = await loop.run_in_executor(executor, partial(open, path, "r", encoding=encoding, errors="replace"))
+    batches: asyncio.Queue = asyncio.Queue(read_ahead)
+
+    async def read_ahead_task():
+        tail = [""]
+        try:
+            while (lines := await loop.run_in_executor(executor, _read_lines, f, chunk_size, contains, tail)) is not None:
+                if lines:
+                    await batches.put(lines)
+            await batches.put(None)
+        except asyncio.CancelledError:
+            raise
+        except BaseException as exc:
+            await batches.put(exc)
+
+    reader = asyncio.create_task(read_ahead_task())
+    try:
+        while (lines := await batches.get()) is not None:
+            if isinstance(lines, BaseException):
+                raise lines
+            for i in range(0, len(lines), slice_lines):
+                for line in lines[i:i + slice_lines]:
+                    yield line
+                # A queued batch never suspends on its own; give other pipelines a turn
+                await asyncio.sleep(0)
+    finally:
+        reader.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await reader
+        await loop.run_in_executor(executor, f.close)
+
+
+async def aiter_all_log_lines(log_dir: Path, **kwargs) -> AsyncIterator[str]:
+    """Treat many log files as a single continuous line stream"""
+    async for path in aiter_log_files(log_dir):
+        async for line in aiter_lines(path, **kwargs):
+            yield line
+
+
+async def aiter_error_lines(lines: AsyncIterable[str]) -> AsyncIterator[str]:
+    """Filter only error lines"""
+    async for line in lines:
+        if "ERROR" in line:
+            yield line
+
+
+# ----------------------------------------------------------------------
+# Push side
+# ----------------------------------------------------------------------
+async def aprime(agen):
+    """Advance an async coroutine stage to its first yield and return it."""
+    await agen.asend(None)
+    return agen
+
+
+async def sink_print_async(stream=None):
+    """Consumes items pushed via await .asend(item)"""
+    stream = stream or sys.stdout
+    try:
+        while True:
+            item = yield
+            stream.write(f"OUT: {item}\n")
+    except GeneratorExit:
+        return
+
+
+async def filter_error_async(target):
+    """Passes through only lines containing 'ERROR'"""
+    try:
+        while True:
+            line = yield
+            if "ERROR" in line:
+                await target.asend(line)
+    except GeneratorExit:
+        await target.aclose()       # zinciri kapat
+        return
+
+
+async def source_push_async(lines: AsyncIterable | Iterable, target) -> None:
+    """Producer pushes items downstream; accepts sync or async iterables"""
+    if hasattr(lines, "__aiter__"):
+        async for line in lines:
+            await target.asend(line)
+    else:
+        for line in lines:
+            await target.asend(line)
+    await target.aclose()
+
+
+# ----------------------------------------------------------------------
+# Benchmark: event-loop latency while many pipelines scan concurrently
+# ----------------------------------------------------------------------
+async def _count_errors(path: Path) -> int:
+    count = 0
+    async for _ in aiter_error_lines(aiter_lines(path, contains="ERROR")):
+        count += 1
+    return count
+
+
+async def _count_errors_blocking(path: Path) -> int:
+    # What you get by calling the sync generators from a coroutine: the loop stalls
+    return sum(1 for _ in iter_error_lines(iter_lines(path)))
+
+
+async def _watch_loop(interval: float, lags: list[float], stop: asyncio.Event) -> None:
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        before = loop.time()
+        await asyncio.sleep(interval)
+        lags.append(loop.time() - before - interval)
+
+
+async def _run(paths: list[Path], pipelines: int, scan) -> tuple[int, float, list[float]]:
+    lags: list[float] = []
+    stop = asyncio.Event()
+    watcher = asyncio.create_task(_watch_loop(0.005, lags, stop))
+    start = time.perf_counter()
+    counts = await asyncio.gather(*(scan(paths[i % len(paths)]) for i in range(pipelines)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await watcher
+    return sum(counts), elapsed, lags
+
+
+def bench(log_dir: Path, pipelines: int, compare_blocking: bool) -> None:
+    import statistics
+
+    paths = list(iter_log_files(log_dir))
+    total_bytes = sum(paths[i % len(paths)].stat().st_size for i in range(pipelines))
+    print(f"{pipelines} pipelines over {len(paths)} files, {total_bytes / 2**20:,.0f} MiB scanned in total")
+    print(f"{'mode':<10}{'matches':>10}{'seconds':>9}{'MiB/s':>8}{'lag p50 ms':>12}{'p99 ms':>9}{'max ms':>9}")
+
+    modes = [("async", _count_errors)]
+    if compare_blocking:
+        modes.append(("blocking", _count_errors_blocking))
+    for name, scan in modes:
+        matches, elapsed, lags = asyncio.run(_run(paths, pipelines, scan))
+        lags_ms = sorted(lag * 1000 for lag in lags) or [0.0]
+        p99 = lags_ms[min(len(lags_ms) - 1, int(len(lags_ms) * 0.99))]
+        print(f"{name:<10}{matches:>10,}{elapsed:>9.2f}{total_bytes / 2**20 / elapsed:>8,.0f}"
+              f"{statistics.median(lags_ms):>12.2f}{p99:>9.2f}{lags_ms[-1]:>9.2f}")
+
+
+async def _print_errors(log_dir: Path) -> None:
+    out = await aprime(sink_print_async())
+    flt = await aprime(filter_error_async(out))
+    await source_push_async(aiter_all_log_lines(log_dir), flt)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("log_dir", type=Path, nargs="?", default=Path("logs"))
+    parser.add_argument("--bench", action="store_true")
+    parser.add_argument("--pipelines", type=int, default=200)
+    parser.add_argument("--compare-blocking", action="store_true", help="also run the sync generators in the loop")
+    parser.add_argument("--generate", type=int, metavar="FILES", help="write synthetic logs into log_dir first")
+    parser.add_argument("--mb", type=float, default=2, help="size of each generated file in MiB")
+    args = parser.parse_args()
+
+    if args.generate:
+        from .synthetic_logs import write_synthetic_logs
+
+        write_synthetic_logs(args.log_dir, args.generate, args.mb)
+
+    if args.bench:
+        bench(args.log_dir, args.pipelines, args.compare_blocking)
+    else:
+        asyncio.run(_print_errors(args.log_dir))
+
+
+if __name__ == "__main__":
+    main()
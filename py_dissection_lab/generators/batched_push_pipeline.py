@@ -0,0 +1,267 @@
+"""
+Batched push pipeline
+
+In push_based_pipeline.py every item costs one generator resume per stage:
+
+    source_push -> filter_error -> sink_print      (3 resumes per line)
+
+Here stages receive and forward *batches* (a list, or any container with append(),
+e.g. array('d') for numbers). A chain of k stages then costs k resumes per batch,
+and the per-item work inside a stage is a tight comprehension instead of a resume.
+
+- batcher(target, batch_size, max_latency) turns single items into batches; it
+  flushes when the batch is full, when max_latency seconds passed since the first
+  item of the batch (checked whenever an item arrives), when it receives FLUSH,
+  and on close(). A timer thread must not send() into a generator another thread
+  is running, so periodic flushing is the caller's job: send FLUSH from the
+  producer's own loop.
+- filter_error_batched / sink_print_batched are batch versions of the originals.
+- lift(stage_factory, target) wraps an existing single-item stage such as
+  filter_error so it can sit in a batched chain unchanged.
+- unbatch(target) feeds batches into a single-item stage such as sink_print.
+
+close() still cascades down the chain exactly like filter_error does.
+
+Usage:
+    python -m py_dissection_lab.generators.batched_push_pipeline            # demo
+    python -m py_dissection_lab.generators.batched_push_pipeline --bench
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Callable, Iterable
+
+from .push_based_pipeline import filter_error, sink_print, source_push
+
+# Sent into batcher() to force out a partial batch
+FLUSH = object()
+
+
+def batcher(target, batch_size: int = 64, max_latency: float | None = None, batch_type: Callable = list):
+    """Collects single items pushed via .send(item) and forwards them as batches"""
+    if batch_size < 1:
+        raise ValueError(f"batch_size must be >= 1, got {batch_size}")
+    batch = batch_type()
+    first_at = 0.0
+    try:
+        while True:
+            item = yield
+            if item is FLUSH:
+                if batch:
+                    target.send(batch)
+                    batch = batch_type()
+                continue
+
+            if not batch and max_latency is not None:
+                first_at = time.monotonic()
+            batch.append(item)
+
+            if len(batch) >= batch_size or (
+                max_latency is not None and time.monotonic() - first_at >= max_latency
+            ):
+                target.send(batch)
+                batch = batch_type()
+    except GeneratorExit:
+        if batch:
+            target.send(batch)      # kalanları da gönder
+        target.close()
+        return
+
+
+def source_push_batched(items: Iterable, target, batch_size: int = 64, batch_type: Callable = list):
+    """Producer pushes items downstream in batches of `batch_size`"""
+    batch = batch_type()
+    append = batch.append
+    for item in items:
+        append(item)
+        if len(batch) >= batch_size:
+            target.send(batch)
+            batch = batch_type()
+            append = batch.append
+    if batch:
+        target.send(batch)
+    target.close()
+
+
+def filter_error_batched(target):
+    """Passes through only lines containing 'ERROR', one batch at a time"""
+    try:
+        while True:
+            batch = yield
+            kept = [line for line in batch if "ERROR" in line]
+            if kept:                # boş batch'i aşağı göndermeye gerek yok
+                target.send(kept)
+    except GeneratorExit:
+        target.close()
+        return
+
+
+def filter_batched(predicate: Callable, target):
+    """Generic batch filter: forwards the items of each batch for which predicate(item) is true"""
+    try:
+        while True:
+            batch = yield
+            kept = [item for item in batch if predicate(item)]
+            if kept:
+                target.send(kept)
+    except GeneratorExit:
+        target.close()
+        return
+
+
+def sink_print_batched():
+    """Consumes batches pushed via .send(batch)"""
+    try:
+        while True:
+            batch = yield
+            for item in batch:
+                print("OUT:", item)
+    except GeneratorExit:
+        return
+
+
+def _collector(out: list):
+    try:
+        while True:
+            out.append((yield))
+    except GeneratorExit:
+        return
+
+
+def lift(stage_factory: Callable, target):
+    """
+    Run a single-item stage inside a batched chain.
+
+    stage_factory(downstream) must build the stage, e.g. filter_error or
+    functools.partial(my_stage, option=1). Every item of a batch is sent through
+    the wrapped stage; whatever it emits is forwarded as one batch.
+    """
+    out: list = []
+    collector = _collector(out)
+    next(collector)
+    inner = stage_factory(collector)
+    next(inner)
+    try:
+        while True:
+            batch = yield
+            for item in batch:
+                inner.send(item)
+            if out:
+                target.send(out.copy())
+                out.clear()
+    except GeneratorExit:
+        inner.close()               # closes the collector too; may emit a final item
+        if out:
+            target.send(out.copy())
+        target.close()
+        return
+
+
+def unbatch(target):
+    """Feeds each item of incoming batches to a single-item stage"""
+    send = target.send
+    try:
+        while True:
+            batch = yield
+            for item in batch:
+                send(item)
+    except GeneratorExit:
+        target.close()
+        return
+
+
+def prime(coro):
+    """Advance a freshly created coroutine to its first yield and return it."""
+    next(coro)
+    return coro
+
+
+# ----------------------------------------------------------------------
+# Micro-benchmark: items/sec for 1, 3, 10 stage chains at batch sizes 1, 64, 4096
+# ----------------------------------------------------------------------
+def _count_sink(counter: list):
+    try:
+        while True:
+            yield
+            counter[0] += 1
+    except GeneratorExit:
+        return
+
+
+def _count_batches_sink(counter: list):
+    try:
+        while True:
+            batch = yield
+            counter[0] += len(batch)
+    except GeneratorExit:
+        return
+
+
+def _build_single_chain(stages: int, counter: list):
+    head = prime(_count_sink(counter))
+    for _ in range(stages):
+        head = prime(filter_error(head))
+    return head
+
+
+def _build_batched_chain(stages: int, counter: list):
+    head = prime(_count_batches_sink(counter))
+    for _ in range(stages):
+        head = prime(filter_error_batched(head))
+    return head
+
+
+def bench(item_count: int) -> None:
+    # Every line passes the filter so each stage sees every item
+    lines = [f"ERROR event {i}" for i in range(item_count)]
+
+    print(f"{item_count:,} items per run")
+    print(f"{'stages':>7}{'batch':>8}{'items/s':>16}{'vs unbatched':>14}")
+    for stages in (1, 3, 10):
+        counter = [0]
+        start = time.perf_counter()
+        source_push(lines, _build_single_chain(stages, counter))
+        baseline = time.perf_counter() - start
+        assert counter[0] == item_count, counter
+        print(f"{stages:>7}{'none':>8}{item_count / baseline:>16,.0f}{1:>14.2f}")
+
+        for batch_size in (1, 64, 4096):
+            counter = [0]
+            start = time.perf_counter()
+            source_push_batched(lines, _build_batched_chain(stages, counter), batch_size)
+            elapsed = time.perf_counter() - start
+            assert counter[0] == item_count, counter
+            print(f"{stages:>7}{batch_size:>8}{item_count / elapsed:>16,.0f}{baseline / elapsed:>14.2f}")
+
+
+def demo() -> None:
+    lines = ["INFO ok", "ERROR boom", "INFO ok2", "ERROR AGAIN", "ERROR third"]
+
+    # fully batched chain
+    source_push_batched(lines, prime(filter_error_batched(prime(sink_print_batched()))), batch_size=2)
+
+    # the original single-item stages wrapped into a batched chain
+    out = prime(unbatch(prime(sink_print())))
+    flt = prime(lift(filter_error, out))
+    b = prime(batcher(flt, batch_size=4, max_latency=0.05))
+    for line in lines:
+        b.send(line)
+    b.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--bench", action="store_true")
+    parser.add_argument("--items", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    if args.bench:
+        bench(args.items)
+    else:
+        demo()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+"""
+Compressed log files for the yield_from.py readers
+
+Rotated logs are app-YYYY-MM-DD.log.gz (or .bz2 / .xz / .zst). Instead of
+decompressing them to disk before every sweep, open_log() hands back a text
+stream over the decompressed data. iter_lines() in yield_from.py uses it for
+any path with a known suffix, and iter_all_log_lines(log_dir, compressed=True)
+lists those files next to the plain *.log ones:
+
+    .gz   gzip          (stdlib)
+    .bz2  bz2           (stdlib)
+    .xz   lzma          (stdlib)
+    .zst  zstd          compression.zstd on Python 3.14+, else the `zstandard`
+                        package; without either, .zst files are not listed
+
+Decompression runs in a background thread that reads `chunk_size` (1 MiB)
+blocks into a small bounded queue. zlib, bz2, lzma and zstd release the GIL
+while they work, so the next blocks are decompressed while the pipeline is
+still filtering the previous ones; the queue depth bounds memory per file.
+The consumer side is a normal io.TextIOWrapper, so lines, newline handling
+and decode errors are exactly those of open(path, "r", errors="replace").
+
+iter_all_log_lines() also opens the next `prefetch` compressed files early:
+their threads decompress while the current file is read, so several files
+decompress in parallel and lines still come out in file order.
+
+Overlap needs a second core. On a single-CPU machine the thread only adds
+hand-off cost, so threaded= and prefetch= default to off there.
+
+Usage:
+    python -m py_dissection_lab.generators.compressed_logs /tmp/zlogs --bench --files 4 --mb 16
+"""
+
+from __future__ import annotations
+
+import argparse
+import bz2
+import gzip
+import io
+import lzma
+import os
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import IO, Callable
+
+from .._lazy import optional_module
+
+# compression.zstd on Python 3.14+, else the optional `zstandard` package; imported on first use
+_zstd = optional_module("compression.zstd", "zstandard")
+
+CHUNK_SIZE = 1 << 20    # decompressed bytes per queue item
+QUEUE_DEPTH = 4         # chunks buffered ahead of the reader, per file
+PARALLEL = (os.cpu_count() or 1) > 1
+
+# suffix -> opener(path, "rb") for the decompressed byte stream
+CODECS: dict[str, Callable[[Path], IO[bytes]]] = {
+    ".gz": lambda path: gzip.open(path, "rb"),
+    ".bz2": lambda path: bz2.open(path, "rb"),
+    ".xz": lambda path: lzma.open(path, "rb"),
+}
+if _zstd is not None:
+    CODECS[".zst"] = lambda path: _zstd.open(path, "rb")
+
+
+def is_compressed(path: Path) -> bool:
+    return path.suffix in CODECS
+
+
+class ThreadedDecompressor(io.RawIOBase):
+    """Raw byte stream fed by a thread that decompresses `path` chunk by chunk."""
+
+    def __init__(self, path: Path, chunk_size: int = CHUNK_SIZE, depth: int = QUEUE_DEPTH):
+        super().__init__()
+        self.path = Path(path)
+        self._opener = CODECS[self.path.suffix]
+        self._chunk_size = chunk_size
+        self._queue: queue.Queue = queue.Queue(depth)
+        self._stop = threading.Event()
+        self._pending = memoryview(b"")
+        self._eof = False
+        self._thread = threading.Thread(target=self._run, name=f"decompress-{self.path.name}", daemon=True)
+        self._thread.start()
+
+    def _put(self, item) -> bool:
+        # Blocking put that still notices close(): a reader that stopped early must not strand the thread
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _run(self) -> None:
+        try:
+            with self._opener(self.path) as f:
+                while self._put(data := f.read(self._chunk_size)) and data:
+                    pass
+        except BaseException as exc:    # handed to the reader, raised from readinto()
+            self._put(exc)
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        if not self._pending:
+            if self._eof:
+                return 0
+            item = self._queue.get()
+            if isinstance(item, BaseException):
+                self._eof = True
+                raise item
+            if not item:
+                self._eof = True
+                return 0
+            self._pending = memoryview(item)
+        n = min(len(buffer), len(self._pending))
+        buffer[:n] = self._pending[:n]
+        self._pending = self._pending[n:]
+        return n
+
+    def close(self) -> None:
+        if not self.closed:
+            self._stop.set()
+            self._thread.join()
+            self._pending = memoryview(b"")
+        super().close()
+
+
+def open_log(
+    path: Path,
+    encoding: str = "utf-8",
+    *,
+    threaded: bool = PARALLEL,
+    chunk_size: int = CHUNK_SIZE,
+    depth: int = QUEUE_DEPTH,
+) -> IO[str]:
+    """Text stream over a plain or compressed log file; decode errors are replaced."""
+    path = Path(path)
+    if not is_compressed(path):
+        return open(path, "r", encoding=encoding, errors="replace")
+    if not threaded:
+        return io.TextIOWrapper(CODECS[path.suffix](path), encoding=encoding, errors="replace")
+    raw = ThreadedDecompressor(path, chunk_size, depth)
+    text = io.TextIOWrapper(io.BufferedReader(raw, chunk_size), encoding=encoding, errors="replace")
+    text._CHUNK_SIZE = 1 << 16      # decode 64 KiB per step instead of 8 KiB
+    return text
+
+
+# ----------------------------------------------------------------------
+# Benchmark: streaming vs. decompress-to-disk-then-scan, per codec
+# ----------------------------------------------------------------------
+_WRITERS = {
+    ".gz": lambda path: gzip.open(path, "wb", compresslevel=6),
+    ".bz2": lambda path: bz2.open(path, "wb"),
+    ".xz": lambda path: lzma.open(path, "wb"),
+}
+if _zstd is not None:
+    _WRITERS[".zst"] = lambda path: _zstd.open(path, "wb")
+
+
+def _count_errors(lines) -> int:
+    from .yield_from import iter_error_lines
+
+    return sum(1 for _ in iter_error_lines(lines))
+
+
+def _decompress_then_scan(paths: list[Path], scratch: Path) -> int:
+    """The old workflow: write every file out uncompressed, then scan the copies."""
+    import shutil
+
+    from .yield_from import iter_lines
+
+    found = 0
+    for path in paths:
+        plain = scratch / path.stem
+        with CODECS[path.suffix](path) as src, open(plain, "wb") as dst:
+            shutil.copyfileobj(src, dst, CHUNK_SIZE)
+        found += _count_errors(iter_lines(plain))
+        plain.unlink()
+    return found
+
+
+def bench(log_dir: Path, files: int, mb: float) -> None:
+    import shutil
+    import tempfile
+
+    from .synthetic_logs import write_synthetic_logs
+    from .yield_from import iter_all_log_lines, iter_lines
+
+    plain_dir = log_dir / "plain"
+    plain = sorted(plain_dir.glob("*.log")) or write_synthetic_logs(plain_dir, files, mb)
+    raw_bytes = sum(p.stat().st_size for p in plain)
+    expected = _count_errors(line for p in plain for line in iter_lines(p))
+    print(f"{len(plain)} files, {raw_bytes / 2**20:.0f} MiB uncompressed, {expected:,} ERROR lines")
+    print("MB/s = uncompressed MiB per second of wall time")
+    print(f"{'codec':<6}{'ratio':>7}{'to disk+scan':>14}{'stream':>10}{'threaded':>10}{'+prefetch':>11}")
+
+    for suffix, writer in _WRITERS.items():
+        codec_dir = log_dir / suffix.lstrip(".")
+        codec_dir.mkdir(parents=True, exist_ok=True)
+        for p in plain:
+            target = codec_dir / (p.name + suffix)
+            if not target.exists():
+                with open(p, "rb") as src, writer(target) as dst:
+                    shutil.copyfileobj(src, dst, CHUNK_SIZE)
+        paths = sorted(codec_dir.glob("*" + suffix))
+        packed = sum(p.stat().st_size for p in paths)
+
+        speeds = {}
+        with tempfile.TemporaryDirectory(dir=log_dir) as scratch:
+            runs = {
+                "to disk": lambda: _decompress_then_scan(paths, Path(scratch)),
+                "stream": lambda: _count_errors(line for p in paths for line in open_log(p, threaded=False)),
+                "threaded": lambda: _count_errors(line for p in paths for line in open_log(p, threaded=True)),
+                "prefetch": lambda: _count_errors(iter_all_log_lines(codec_dir, compressed=True, prefetch=len(paths))),
+            }
+            for name, run in runs.items():
+                start = time.perf_counter()
+                found = run()
+                elapsed = time.perf_counter() - start
+                assert found == expected, (suffix, name, found, expected)
+                speeds[name] = raw_bytes / 2**20 / elapsed
+        print(f"{suffix:<6}{raw_bytes / packed:>6.1f}x{speeds['to disk']:>14.0f}{speeds['stream']:>10.0f}"
+              f"{speeds['threaded']:>10.0f}{speeds['prefetch']:>11.0f}")
+
+    start = time.perf_counter()
+    _count_errors(iter_all_log_lines(plain_dir))
+    print(f"{'plain':<6}{1:>6.1f}x{'':>14}{raw_bytes / 2**20 / (time.perf_counter() - start):>10.0f}")
+    if _zstd is None:
+        print("(.zst skipped: neither compression.zstd nor zstandard is available)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("log_dir", type=Path, help="working directory for the generated files")
+    parser.add_argument("--bench", action="store_true")
+    parser.add_argument("--files", type=int, default=4)
+    parser.add_argument("--mb", type=float, default=16)
+    args = parser.parse_args()
+    if args.bench:
+        bench(args.log_dir, args.files, args.mb)
+    else:
+        for path in sorted(args.log_dir.iterdir()):
+            if is_compressed(path):
+                with open_log(path) as f:
+                    print(path.name, sum(1 for _ in f), "lines")
+
+
+if __name__ == "__main__":
+    main()
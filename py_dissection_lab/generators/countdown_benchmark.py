@@ -0,0 +1,73 @@
+"""
+Countdown (range-backed lazy sequence) vs. the hand-written iterators
+
+Compares, for the same n:
+- CountdownIterator          example_class.py, a Python __next__ call per item
+- countdown()                generator_iterator_diff.py, a generator resume per item
+- Countdown                  example_class.py, iteration runs in range's C iterator
+
+and the "give me the k-th value" / len() questions, which the iterators can only
+answer by walking k items (islice) while Countdown answers in O(1).
+
+Usage:
+    python -m py_dissection_lab.generators.countdown_benchmark
+    python -m py_dissection_lab.generators.countdown_benchmark --n 100000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from collections import deque
+from itertools import islice
+
+from .example_class import Countdown, CountdownIterator
+from .generator_iterator_diff import countdown
+
+
+def _best(fn, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _drain(it) -> None:
+    deque(it, maxlen=0)     # consume in C, so only the iterator's own cost is measured
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--n", type=int, default=10_000_000)
+    args = parser.parse_args()
+    n = args.n
+
+    print(f"full iteration, n={n:,}")
+    rows = [
+        ("CountdownIterator", lambda: _drain(CountdownIterator(n))),
+        ("countdown()", lambda: _drain(countdown(n))),
+        ("Countdown", lambda: _drain(Countdown(n))),
+        ("Countdown + for loop", lambda: [None for _ in Countdown(n)]),
+        ("sum(Countdown)", lambda: sum(Countdown(n))),
+    ]
+    baseline = None
+    for name, fn in rows:
+        elapsed = _best(fn)
+        baseline = baseline or elapsed
+        print(f"  {name:<22}{elapsed:>8.3f}s {elapsed / n * 1e9:>7.1f} ns/item  x{baseline / elapsed:>5.1f}")
+
+    k = n // 2
+    print(f"\nvalue #{k:,} and len()")
+    elapsed = _best(lambda: next(islice(CountdownIterator(n), k, None)))
+    print(f"  {'islice(CountdownIterator)':<28}{elapsed * 1e6:>12,.1f} us")
+    elapsed = _best(lambda: sum(1 for _ in CountdownIterator(n)))
+    print(f"  {'len via iteration':<28}{elapsed * 1e6:>12,.1f} us")
+    c = Countdown(n)
+    elapsed = _best(lambda: (c[k], len(c), c[k:k + 10][3], (k in c)))
+    print(f"  {'Countdown c[k], len(c), ...':<28}{elapsed * 1e6:>12,.3f} us")
+
+
+if __name__ == "__main__":
+    main()
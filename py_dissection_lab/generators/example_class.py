@@ -0,0 +1,142 @@
+# Creating a simple iterable class
+from collections.abc import Sequence
+
+
+class Bag:
+    def __init__(self, items):
+        self._items = list(items)
+
+    def __iter__(self):
+        # burada iterator olarak liste iteratörünü döndürüyoruz
+        return iter(self._items)
+
+# b = Bag(["comb", "napkin", "water"])
+# for item in b:
+#     print(item)
+
+
+# What is next() ?
+# It's a built-in function and it utilizes/calls the __next__() metthod of the iterator
+# value = next(iterator)
+# yukarıdaki çağrı iterator'ün __next__() metodunu çağırır ve şuna dönüşür:
+# next(iterator) -> iterator.__next__()
+# Iterator biterse StopIteration hatası fırlatır. Hata fırlatmaması için default değer verirsin:
+# it = iter([10, 20])
+# next(it)        # 10
+# next(it)        # 20
+# next(it, -1)    # -1  (bittiği için default döndü)
+
+
+# Iterable olmak = iter(object) çalışması
+# Iterator olmak = next(iterator) çalışması
+
+
+# Iterable ayrı, Iterator ayrı class
+
+class Countdown(Sequence):
+    """
+    start, start - step, ... down to (not including) stop, as a lazy sequence.
+
+    Everything is delegated to a range object, so len(), indexing, `in`,
+    reversed() and slicing are O(1) and iteration runs in range's C iterator
+    instead of a Python __next__ per item. A slice is another lazy Countdown
+    (a reversed slice such as c[::-1] counts up, i.e. has a negative step).
+    """
+
+    __slots__ = ("_range",)
+
+    def __init__(self, start: int, stop: int = 0, step: int = 1):
+        if step == 0:
+            raise ValueError("step must not be zero")
+        self._range = range(start, stop, -step)
+
+    @classmethod
+    def _wrap(cls, r: range) -> "Countdown":
+        c = cls.__new__(cls)
+        c._range = r
+        return c
+
+    @property
+    def start(self) -> int:
+        return self._range.start
+
+    @property
+    def stop(self) -> int:
+        return self._range.stop
+
+    @property
+    def step(self) -> int:
+        return -self._range.step
+
+    def __iter__(self):
+        # Hâlâ bir iterator döndürüyor, ama elle yazılmış __next__ yerine range'in C iterator'ü
+        return iter(self._range)
+
+    def __reversed__(self):
+        return reversed(self._range)
+
+    def __len__(self) -> int:
+        return len(self._range)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return Countdown._wrap(self._range[i])
+        return self._range[i]
+
+    def __contains__(self, x) -> bool:
+        return x in self._range
+
+    def index(self, x, start: int = 0, stop: int | None = None) -> int:
+        if start == 0 and stop is None:
+            return self._range.index(x)     # O(1)
+        return super().index(x, start, len(self) if stop is None else stop)
+
+    def count(self, x) -> int:
+        return self._range.count(x)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, Countdown):
+            return self._range == other._range
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(self._range)
+
+    def __repr__(self) -> str:
+        return f"Countdown({self.start}, {self.stop}, {self.step})"
+
+
+class CountdownIterator:
+    def __init__(self, current):
+        self.current = current
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self.current <= 0:
+            raise StopIteration
+        # the value that is gonna be produced
+        value = self.current
+        # current has to be minus 1
+        self.current -= 1
+        return value
+
+# Countdown is the lectern and the CountdownIterator is a tool in order to toggle the page
+# Countdown is iterable class and CountdownIterator is an iterator class. But they both have __iter_-
+# dunder method as python expects it.
+# Iterable olan sınıfta __iter__ olmalı çünkü for x in Countdown(4): yazınca Python önce şunu yapar
+# iterable = iter(countdown_object)
+# bu da countdown_object'e ait __iter__() metodunu çağırır yani şuna dönüşür:
+# countdown_object.__iter__(4)
+# Yani Countdown.__iter__()'in görevi iterator objesini döndürmek.
+# Iterator olan class'ta da __iter__() olmalı çünkü iterator next() ile ilerler (__next__()) ama aynı zamanda
+# iter(it) çağrıldığında kendisini döndürmelidir.
+
+# NOT: Countdown artık range'e yaslanan lazy bir sequence (len, indeks, slice, reversed, in
+# hepsi O(1)). Elle yazılmış iterator örneği olarak CountdownIterator duruyor;
+# farkı görmek için: python -m py_dissection_lab.generators.countdown_benchmark
+
+# MEALEN:
+# Countdown.__iter__ = iterator üret der
+# CountdownIterator.__iter__() = ben zaten iteratorum kendimi ver der
\ No newline at end of file
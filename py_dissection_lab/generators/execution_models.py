@@ -0,0 +1,355 @@
+"""
+Execution models: how the repo's workloads scale across threads, subinterpreters and processes
+
+Four workloads, each cut into equal tasks (one per worker, same total work at
+every worker count):
+
+    palindromes      is_palindrome() over a range of integers        (pure Python CPU)
+    log_filter       iter_error_lines() over synthetic log lines    (generator pipeline)
+    running_average  send() into the running_average() coroutine    (coroutine resume cost)
+    event_workers    thread + threading.Event hand-off, shaped like
+                     threading_event_wait_original.py                (thread start / signal / join)
+
+and up to three execution models per interpreter:
+
+    thread        ThreadPoolExecutor: serialized by the GIL on the regular build,
+                  parallel on a free-threaded build (python3.14t)
+    interpreter   InterpreterPoolExecutor (concurrent.interpreters, Python 3.14+):
+                  one GIL per subinterpreter
+    process       ProcessPoolExecutor
+
+Every interpreter given with --python (default: the current one) is measured
+in a fresh child process, so one run can put the GIL build and the
+free-threaded build side by side. Pools are created and warmed up before the
+clock starts; each point is the best of --repeat runs. Speedup is against
+running the same tasks inline on one thread.
+
+The results file is JSON (one record per workload / build / mode / workers).
+A point is keyed on the Python series and build ("3.14 free-threaded"); the
+exact version is kept next to it, so a baseline from 3.14.0 still compares
+against 3.14.1 and the change shows up in the status column.
+--compare OLD.json prints the change per point and exits with status 1 when
+any point lost more than --threshold of its throughput.
+
+Usage:
+    python -m py_dissection_lab.generators.execution_models --workers 4 --out results.json
+    python -m py_dissection_lab.generators.execution_models --python python3.14 --python python3.14t --out results.json
+    python -m py_dissection_lab.generators.execution_models --workers 4 --compare results.json --threshold 0.10
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import threading
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from datetime import date, datetime, timezone
+from functools import cache
+from itertools import cycle, islice
+from pathlib import Path
+from typing import Callable
+
+try:
+    from concurrent import interpreters as _interpreters  # Python 3.14+
+    from concurrent.futures import InterpreterPoolExecutor
+except ImportError:
+    _interpreters = InterpreterPoolExecutor = None
+
+from .generator_iterator_diff import running_average
+from .palindrome_generator_all_demos import is_palindrome
+from .palindrome_sharded import free_threaded
+from .synthetic_logs import make_line
+from .yield_from import iter_error_lines
+
+RESULTS_VERSION = 1
+MODES = ("thread", "interpreter", "process")
+
+
+# ----------------------------------------------------------------------
+# Workloads: fn(task_index, units) -> checksum, module-level so every
+# execution model can import them by name
+# ----------------------------------------------------------------------
+def palindrome_task(index: int, units: int) -> int:
+    lo = 10 ** 9 + index * units
+    return sum(1 for n in range(lo, lo + units) if is_palindrome(n))
+
+
+@cache
+def _sample_lines() -> tuple[str, ...]:
+    rng = random.Random(7)
+    return tuple(make_line(rng, date(2026, 2, 10), second, 0.02) for second in range(1024))
+
+
+def log_filter_task(index: int, units: int) -> int:
+    lines = islice(cycle(_sample_lines()), index % 1024, index % 1024 + units)
+    return sum(1 for _ in iter_error_lines(lines))
+
+
+def running_average_task(index: int, units: int) -> int:
+    coro = running_average()
+    next(coro)
+    send = coro.send
+    avg = 0.0
+    for i in range(units):
+        avg = send(float((index + i) & 1023))
+    return int(avg)
+
+
+def _event_worker(done: threading.Event, box: list) -> None:
+    # worker() in threading_event_wait_original.py sleeps 3 s, prints and sets a
+    # module-level event; this keeps its start / set / wait / join shape only
+    box.append(sum(range(100)))     # a little work, then the signal
+    done.set()
+
+
+def event_worker_task(index: int, units: int) -> int:
+    box: list = []
+    for _ in range(units):
+        done = threading.Event()
+        worker = threading.Thread(target=_event_worker, args=(done, box))
+        worker.start()
+        done.wait()
+        worker.join()
+    return len(box)
+
+
+@dataclass(frozen=True)
+class Workload:
+    name: str
+    fn: Callable[[int, int], int]
+    units: int          # total per measurement, split across the tasks
+    unit: str
+
+
+WORKLOADS = {
+    w.name: w
+    for w in (
+        Workload("palindromes", palindrome_task, 400_000, "numbers"),
+        Workload("log_filter", log_filter_task, 1_000_000, "lines"),
+        Workload("running_average", running_average_task, 1_000_000, "sends"),
+        Workload("event_workers", event_worker_task, 4_000, "hand-offs"),
+    )
+}
+
+
+# ----------------------------------------------------------------------
+# Measurement (runs inside the child process for one interpreter)
+# ----------------------------------------------------------------------
+@dataclass
+class Point:
+    workload: str
+    python: str         # "3.14 free-threaded": major.minor and build, what results are keyed on
+    mode: str
+    workers: int
+    units: int
+    seconds: float      # best of the repeats
+    median: float
+    per_sec: float
+    speedup: float      # vs. the same tasks inline on one thread
+    version: str = ""   # exact "3.14.0", metadata only: a patch upgrade still compares to the baseline
+
+    @property
+    def key(self) -> tuple:
+        return self.workload, self.python, self.mode, self.workers
+
+
+def build_name() -> str:
+    return "free-threaded" if free_threaded() else "gil"
+
+
+def available_modes() -> list[str]:
+    return [m for m in MODES if m != "interpreter" or InterpreterPoolExecutor is not None]
+
+
+def make_executor(mode: str, workers: int) -> Executor:
+    if mode == "thread":
+        return ThreadPoolExecutor(max_workers=workers)
+    if mode == "interpreter":
+        return InterpreterPoolExecutor(max_workers=workers)
+    if mode == "process":
+        from concurrent.futures import ProcessPoolExecutor     # pulls in multiprocessing: only when used
+
+        return ProcessPoolExecutor(max_workers=workers)
+    raise ValueError(f"unknown execution model: {mode!r}")
+
+
+def _warm(fn: Callable[[int, int], int]) -> int:
+    time.sleep(0.05)    # hold the worker so the next warm-up task lands on another one
+    return fn(0, 1)
+
+
+def _tasks(units: int, workers: int) -> list[tuple[int, int]]:
+    share, extra = divmod(units, workers)
+    return [(i, share + (i < extra)) for i in range(workers)]
+
+
+def _timed_runs(run: Callable[[], object], repeat: int) -> list[float]:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def measure(workloads: list[Workload], modes: list[str], max_workers: int, repeat: int, scale: float) -> list[Point]:
+    import statistics
+
+    python = f"{sys.version_info.major}.{sys.version_info.minor} {build_name()}"
+    version = platform.python_version()
+    counts = sorted({1, *[w for w in (2, 4, 8, 16, 32, 64) if w < max_workers], max_workers})
+    points = []
+    for workload in workloads:
+        units = max(1, int(workload.units * scale))
+        fn = workload.fn
+        fn(0, 1)
+        inline = min(_timed_runs(lambda: fn(0, units), repeat))
+        for mode in modes:
+            for workers in counts:
+                tasks = _tasks(units, workers)
+                with make_executor(mode, workers) as executor:
+                    for f in [executor.submit(_warm, fn) for _ in range(workers)]:
+                        f.result()
+                    times = _timed_runs(
+                        lambda: [f.result() for f in [executor.submit(fn, *task) for task in tasks]], repeat
+                    )
+                best = min(times)
+                points.append(Point(workload.name, python, mode, workers, units, best,
+                                    statistics.median(times), units / best, inline / best, version))
+                print(f"  {workload.name:<16}{mode:<12}{workers:>3} workers {units / best:>14,.0f}/s", flush=True)
+    return points
+
+
+# ----------------------------------------------------------------------
+# Results file, tables, regressions
+# ----------------------------------------------------------------------
+def write_results(path: Path, runs: list[dict]) -> None:
+    payload = {"version": RESULTS_VERSION, "created": datetime.now(timezone.utc).isoformat(), "runs": runs}
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(payload, indent=1), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def load_points(path: Path) -> list[Point]:
+    data = json.loads(Path(path).read_text(encoding="utf-8"))
+    if data.get("version") != RESULTS_VERSION:
+        raise ValueError(f"{path}: unsupported results version {data.get('version')!r}")
+    return [Point(**record) for run in data["runs"] for record in run["results"]]
+
+
+def print_scaling(points: list[Point]) -> None:
+    """One table per workload: rows = worker counts, columns = interpreter build x mode."""
+    for name in dict.fromkeys(p.workload for p in points):
+        rows = [p for p in points if p.workload == name]
+        columns = list(dict.fromkeys((p.python, p.mode) for p in rows))
+        by_key = {(p.python, p.mode, p.workers): p for p in rows}
+        unit = WORKLOADS[name].unit if name in WORKLOADS else "units"
+        print(f"\n{name}: {unit}/s (speedup vs. inline)")
+        print(f"{'workers':>7}" + "".join(f"{f'{py} {mode}':>30}" for py, mode in columns))
+        for workers in sorted({p.workers for p in rows}):
+            cells = []
+            for py, mode in columns:
+                p = by_key.get((py, mode, workers))
+                cells.append(f"{f'{p.per_sec:,.0f} ({p.speedup:.2f}x)':>30}" if p else f"{'-':>30}")
+            print(f"{workers:>7}" + "".join(cells))
+
+
+def compare(baseline: list[Point], current: list[Point], threshold: float) -> int:
+    """Print throughput change per point; returns the number of regressions beyond `threshold`."""
+    old = {p.key: p for p in baseline}
+    regressions = 0
+    print(f"\n{'workload':<16}{'python':<22}{'mode':<12}{'workers':>7}{'baseline/s':>14}{'current/s':>14}"
+          f"{'change':>9}  status")
+    for p in current:
+        base = old.pop(p.key, None)
+        if base is None:
+            status, change = "new", ""
+        else:
+            ratio = p.per_sec / base.per_sec
+            change = f"{ratio - 1:+.1%}"
+            if ratio < 1 - threshold:
+                status = "REGRESSION"
+                regressions += 1
+            else:
+                status = "faster" if ratio > 1 + threshold else "ok"
+            if base.version and p.version and base.version != p.version:
+                status += f" ({base.version} -> {p.version})"
+        print(f"{p.workload:<16}{p.python:<22}{p.mode:<12}{p.workers:>7}"
+              f"{f'{base.per_sec:,.0f}' if base else '-':>14}{p.per_sec:>14,.0f}{change:>9}  {status}")
+    for base in old.values():
+        print(f"{base.workload:<16}{base.python:<22}{base.mode:<12}{base.workers:>7}{base.per_sec:>14,.0f}"
+              f"{'-':>14}{'':>9}  not measured")
+    print(f"{regressions} regression(s) beyond -{threshold:.0%}")
+    return regressions
+
+
+def run_child(python: str, args: argparse.Namespace) -> dict:
+    """Measure under another interpreter; the package root goes on its PYTHONPATH so it can import us."""
+    import subprocess
+    import tempfile
+
+    root = str(Path(__file__).resolve().parents[2])
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [root, env.get("PYTHONPATH")]))
+    with tempfile.TemporaryDirectory() as tmp:
+        out = Path(tmp) / "run.json"
+        command = [python, "-m", __spec__.name, "--child", str(out),
+                   "--workers", str(args.workers), "--repeat", str(args.repeat), "--scale", str(args.scale),
+                   "--workloads", *args.workloads, "--modes", *args.modes]
+        subprocess.run(command, env=env, check=True)
+        return json.loads(out.read_text(encoding="utf-8"))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--python", action="append", help="interpreter to measure (repeatable; default: this one)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="largest worker count")
+    parser.add_argument("--workloads", nargs="+", choices=list(WORKLOADS), default=list(WORKLOADS))
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply every workload's size")
+    parser.add_argument("--out", type=Path, help="write the results file here")
+    parser.add_argument("--compare", type=Path, metavar="BASELINE", help="results file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed throughput loss vs. the baseline")
+    parser.add_argument("--child", type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        modes = [m for m in args.modes if m in available_modes()]
+        print(f"{sys.executable}: Python {platform.python_version()} ({build_name()}), "
+              f"{os.cpu_count()} CPUs, modes {', '.join(modes)}", flush=True)
+        # Pools pickle the task functions by reference: take them from the named module, not from __main__
+        from . import execution_models
+
+        workloads = [execution_models.WORKLOADS[name] for name in args.workloads]
+        points = execution_models.measure(workloads, modes, args.workers, args.repeat, args.scale)
+        run = {
+            "executable": sys.executable,
+            "version": platform.python_version(),
+            "build": build_name(),
+            "modes": modes,
+            "cpu_count": os.cpu_count(),
+            "platform": platform.platform(),
+            "results": [asdict(p) for p in points],
+        }
+        args.child.write_text(json.dumps(run), encoding="utf-8")
+        return
+
+    runs = [run_child(python, args) for python in args.python or [sys.executable]]
+    points = [Point(**record) for run in runs for record in run["results"]]
+    print_scaling(points)
+    if args.out:
+        write_results(args.out, runs)
+        print(f"\nresults written to {args.out}")
+    if args.compare and compare(load_points(args.compare), points, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
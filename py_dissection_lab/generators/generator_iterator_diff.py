@@ -9,6 +9,8 @@
     - __iter__() metodu olacak → genelde return self (iterator’lar iterable gibi de davranır)
 """
 
+from .state_codec import pack_state, unpack_state
+
 # class ile manuel iterator
 class CountdownIterator:
     def __init__(self, start: int):
@@ -24,6 +26,15 @@ class CountdownIterator:
         self.current -= 1
         return value
 
+    # Tüm state tek bir int: kaydetmek/geri yüklemek ucuz (bkz. resumable_iterators.py)
+    def snapshot(self) -> bytes:
+        return pack_state("countdown", self.current)
+
+    @classmethod
+    def restore(cls, data: bytes) -> "CountdownIterator":
+        (current,) = unpack_state(data, "countdown")
+        return cls(current)
+
 
 # aynı countdown'un generator versiyonu
 def countdown(start: int):
@@ -76,11 +87,15 @@ def running_average():
         n += 1
         avg = total / n
 
-coro = running_average()
-print(next(coro))   # coroutine'i prime eder: ilk yield'e kadar çalıştırır -> None
-print(coro.send(10))    # 10 gönder, avg döner -> 10
-print(coro.send(20))    # 15
-print(coro.send(30))    # 20
+# Sadece ortalama; varyans, min/max, quantile ve toplu (buffer) gönderim için
+# streaming_stats.py'deki running_stats() coroutine'ine bak.
+
+if __name__ == "__main__":
+    coro = running_average()
+    print(next(coro))   # coroutine'i prime eder: ilk yield'e kadar çalıştırır -> None
+    print(coro.send(10))    # 10 gönder, avg döner -> 10
+    print(coro.send(20))    # 15
+    print(coro.send(30))    # 20
 
 # NOTE: neden next(coro) ile prime ediyoruz? Çünkü send ilk olarak yield noktasına gelmiş bir generator ister.
 # Başlamamışsa önce next() ile yield'e getirirsin.
@@ -104,12 +119,13 @@ def counter():
         except Reset:
             i = 0
 
-c = counter()
-print(next(c))              # 0
-print(c.send("inc"))        # 1
-print(c.send("inc"))        # 2
-print(c.throw(Reset))       # 0
-print(c.send("inc"))        # 1
+if __name__ == "__main__":
+    c = counter()
+    print(next(c))              # 0
+    print(c.send("inc"))        # 1
+    print(c.send("inc"))        # 2
+    print(c.throw(Reset))       # 0
+    print(c.send("inc"))        # 1
 
 
 
@@ -125,9 +141,10 @@ def reader(path):
         print("file closed")
 
 
-g = reader("logs/app.log")
-print(next(g))
-g.close()  # "file closed" basar, dosya kapanır
+if __name__ == "__main__":
+    g = reader("logs/app.log")
+    print(next(g))
+    g.close()  # "file closed" basar, dosya kapanır
 
 # Çoğu zaman .close()’u sen elle çağırmazsın; with, garbage collection veya framework çağırır.
 # Ama generator “resource” tutuyorsa finally ile cleanup çok değerlidir.
\ No newline at end of file
@@ -48,12 +48,17 @@ sensör/telemetri
 
 
 # Generator tek kullanımlıktır. Yani sonuçlar birden fazla defa kullanılacaksa generator kullanma
-g = (x for x in range(3))
-print(list(g))  #[1, 2, 3]
-print(list(g))  # []
+def single_use_demo():
+    g = (x for x in range(3))
+    print(list(g))  #[1, 2, 3]
+    print(list(g))  # []
 
 
 # Bir generator başka bir iterable'ı akıtabilir
 def chain(a, b):
     yield from a
-    yield from b
\ No newline at end of file
+    yield from b
+
+
+if __name__ == "__main__":
+    single_use_demo()
@@ -0,0 +1,511 @@
+"""
+Keyed, windowed aggregation for many concurrent streams
+
+running_average() is one generator object per stream. With ~1M metric keys that
+is ~1M suspended frames, and every sample pays a generator resume. Here all keys
+share one store:
+
+- every key gets a slot number (dict key -> slot, free list for reuse)
+- per-slot state lives in flat columns (NumPy arrays, or array('d') / array('i')
+  without NumPy): count (32-bit), sum, sum of squares, min, max per time bucket
+- a window is `buckets` consecutive time buckets of `slide` seconds kept in a
+  ring per slot:
+    tumbling  window=60            -> 1 bucket of 60 s
+    sliding   window=60, slide=10  -> 6 buckets of 10 s, the window moves every 10 s
+  each slot keeps one ring head, the newest bucket it holds (32-bit, counted
+  from the first bucket the store saw). When the head moves forward the cells
+  it passes are emptied, so no cell needs an epoch of its own
+- time is event time: the watermark is the largest timestamp seen. Samples older
+  than the window behind the watermark are dropped and counted as `late`
+- keys whose newest bucket ended `idle_timeout` seconds before the watermark are
+  evicted and their slot reused (the timeout is effectively rounded up to a slide)
+
+    store = KeyedWindowStore(window=60, slide=10, idle_timeout=300)
+    store.ingest(keys, timestamps, values)     # a batch of (key, ts, value)
+    store.stats("api.latency")                 # WindowStats for the current window
+
+What it costs, from --bench on one core (100k keys, 1M samples, skewed keys):
+
+    window=60 slide=10 (6 buckets)   store/numpy   ~1.2 M samples/s   ~290 B/key
+                                     store/python  ~0.5 M samples/s   ~290 B/key
+    window=60 slide=60 (1 bucket)    store/numpy   ~1.3 M samples/s   ~100 B/key
+                                     store/python  ~0.5 M samples/s   ~100 B/key
+    generator per key (mean only)                  ~1.2 M samples/s   ~300 B/key
+
+Best of several runs; the machine is noisy. A sample here updates five
+aggregates of a window instead of one mean, so the store is about as fast per
+sample as a generator per key, not faster. A cell is 36 bytes and a slot 4 more
+for its head, and the bytes include the spare slots from growing the columns
+(by a quarter at a time). Up to six buckets the store stays at or under a
+generator per key and still offers windows, min/max/stddev, late samples, idle
+eviction and a snapshot of every key. The array.array fallback keeps all of
+that without NumPy at less than half the NumPy rate; install NumPy for
+throughput.
+
+running_window(store, key) keeps the running_average() coroutine shape for a
+single-key caller: send a value (or a (timestamp, value) pair), get the window
+mean back.
+
+Usage:
+    python -m py_dissection_lab.generators.keyed_windows
+    python -m py_dissection_lab.generators.keyed_windows --bench --keys 1000000 --samples 5000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import math
+import sys
+import time
+from array import array
+from dataclasses import dataclass
+from typing import Hashable, Iterable, Sequence
+
+from .._lazy import optional_module
+from .generator_iterator_diff import running_average
+
+# optional, imported on first use: columns fall back to array.array and a Python loop
+np = optional_module("numpy")
+
+
+@dataclass(frozen=True)
+class WindowStats:
+    count: int
+    mean: float
+    stddev: float
+    min: float
+    max: float
+
+
+_EMPTY = WindowStats(0, math.nan, math.nan, math.nan, math.nan)
+
+
+class KeyedWindowStore:
+    """Per-key window aggregates held in shared columns, one slot per key."""
+
+    def __init__(
+        self,
+        window: float = 60.0,
+        slide: float | None = None,
+        idle_timeout: float | None = None,
+        capacity: int = 1024,
+        use_numpy: bool | None = None,
+    ):
+        slide = window if slide is None else slide
+        if slide <= 0 or window < slide:
+            raise ValueError("need 0 < slide <= window")
+        buckets = window / slide
+        if abs(buckets - round(buckets)) > 1e-9:
+            raise ValueError("window must be a multiple of slide")
+        self.window = window
+        self.slide = slide
+        self.buckets = int(round(buckets))
+        self.idle_timeout = idle_timeout
+        self.use_numpy = (np is not None) if use_numpy is None else use_numpy
+        if self.use_numpy and np is None:
+            raise RuntimeError("use_numpy=True but NumPy is not installed")
+
+        self._slot_of: dict[Hashable, int] = {}
+        self._key_of: list = []             # slot -> key (None for a free slot)
+        self._free: list[int] = []
+        self.watermark = -math.inf          # largest timestamp seen
+        self._origin: int | None = None     # bucket number of the first sample; heads count from it
+        self.late = 0                       # samples dropped for being older than the window
+        self.evicted = 0
+        self._next_eviction = -math.inf
+        self._capacity = 0
+        self._grow(max(1, capacity))
+
+    # ------------------------------------------------------------------
+    # Columns
+    # ------------------------------------------------------------------
+    def _column(self, typecode: str, n: int, fill):
+        if self.use_numpy:
+            return np.full(n, fill, dtype=np.float64 if typecode == "d" else np.int32)
+        return array(typecode, [fill]) * n
+
+    def _extend(self, column, typecode: str, n: int, fill):
+        if self.use_numpy:
+            return np.concatenate([column, self._column(typecode, n, fill)])
+        column.extend(array(typecode, [fill]) * n)
+        return column
+
+    # A cell with count 0 is empty; the other fields are only read after a reset
+    _CELL_COLUMNS = (
+        ("_count", "i", 0),
+        ("_sum", "d", 0.0),
+        ("_sumsq", "d", 0.0),
+        ("_min", "d", math.inf),
+        ("_max", "d", -math.inf),
+    )
+    _FREE = 2**31 - 1                       # head of a free slot: never idle
+    _NEW = -2**31                           # head of a new slot: the first sample empties the whole ring
+
+    def _grow(self, new_capacity: int) -> None:
+        added = new_capacity - self._capacity
+        if self._capacity == 0:
+            for name, typecode, fill in self._CELL_COLUMNS:
+                setattr(self, name, self._column(typecode, added * self.buckets, fill))
+            self._head = self._column("i", added, self._FREE)
+        else:
+            for name, typecode, fill in self._CELL_COLUMNS:
+                setattr(self, name, self._extend(getattr(self, name), typecode, added * self.buckets, fill))
+            self._head = self._extend(self._head, "i", added, self._FREE)
+        self._free.extend(range(new_capacity - 1, self._capacity - 1, -1))
+        self._key_of.extend([None] * added)
+        self._capacity = new_capacity
+
+    def _slot(self, key: Hashable) -> int:
+        slot = self._slot_of.get(key)
+        if slot is None:
+            if not self._free:
+                # 1.25x rather than 2x: every spare slot costs a full ring of cells
+                self._grow(self._capacity + max(1024, self._capacity // 4))
+            slot = self._free.pop()
+            self._slot_of[key] = slot
+            self._key_of[slot] = key
+            self._head[slot] = self._NEW
+        return slot
+
+    def _release(self, slots: list[int]) -> None:
+        """Put `slots` back on the free list; their cells are emptied on reuse."""
+        if self.use_numpy:
+            self._head[np.asarray(slots, dtype=np.int64)] = self._FREE
+        else:
+            for slot in slots:
+                self._head[slot] = self._FREE
+        self._free.extend(slots)
+
+    # ------------------------------------------------------------------
+    # Ingestion
+    # ------------------------------------------------------------------
+    def add(self, key: Hashable, ts: float, value: float) -> None:
+        """Add one sample."""
+        # A NumPy round trip per sample costs more than the Python loop, even on NumPy columns
+        self._ingest_python((key,), (ts,), (value,))
+        self._maybe_evict()
+
+    def ingest(self, keys: Sequence[Hashable], timestamps: Iterable[float], values: Iterable[float]) -> None:
+        """Add a batch of (key, timestamp, value) samples given as three parallel sequences."""
+        if self.use_numpy:
+            self._ingest_numpy(keys, timestamps, values)
+        else:
+            self._ingest_python(keys, timestamps, values)
+        self._maybe_evict()
+
+    def _maybe_evict(self) -> None:
+        if self.idle_timeout is not None and self.watermark >= self._next_eviction:
+            self.evict_idle()
+            # Scanning every slot on every batch would dominate; once per slide is enough
+            self._next_eviction = self.watermark + self.slide
+
+    def _ingest_python(self, keys, timestamps, values) -> None:
+        slide, nb = self.slide, self.buckets
+        count, total, sumsq, lo, hi, head = self._count, self._sum, self._sumsq, self._min, self._max, self._head
+        slot_of = self._slot_of.get
+        empty_ring = self._column("i", nb, 0)
+        # watermark / late live in locals for the loop; the oldest live bucket only
+        # moves when the watermark does. Buckets are counted from origin so heads fit in 32 bits
+        watermark, origin, late = self.watermark, self._origin, 0
+        oldest = int(watermark // slide) - origin - nb if origin is not None else -math.inf
+        try:
+            for key, ts, value in zip(keys, timestamps, values):
+                if ts > watermark:
+                    if origin is None:
+                        origin = self._origin = int(ts // slide)
+                    watermark = ts
+                    oldest = int(ts // slide) - origin - nb
+                bucket = int(ts // slide) - origin
+                if bucket <= oldest:
+                    late += 1
+                    continue
+                slot = slot_of(key)
+                if slot is None:
+                    slot = self._slot(key)
+                    # _grow() may have replaced the columns
+                    count, total, sumsq, lo, hi, head = (self._count, self._sum, self._sumsq,
+                                                         self._min, self._max, self._head)
+                top = head[slot]
+                if bucket > top:
+                    # the ring moves forward: empty the cells of the buckets it passes
+                    if top <= bucket - nb:
+                        count[slot * nb:(slot + 1) * nb] = empty_ring
+                    else:
+                        for b in range(top + 1, bucket + 1):
+                            count[slot * nb + b % nb] = 0
+                    head[slot] = bucket
+                elif bucket <= top - nb:
+                    late += 1               # the ring already moved past this bucket
+                    continue
+                cell = slot * nb + bucket % nb
+                if not count[cell]:
+                    count[cell] = 1
+                    total[cell] = lo[cell] = hi[cell] = value
+                    sumsq[cell] = value * value
+                    continue
+                count[cell] += 1
+                total[cell] += value
+                sumsq[cell] += value * value
+                if value < lo[cell]:
+                    lo[cell] = value
+                elif value > hi[cell]:
+                    hi[cell] = value
+        finally:
+            self.watermark = watermark
+            self.late += late
+
+    def _ingest_numpy(self, keys, timestamps, values) -> None:
+        ts = np.asarray(timestamps, dtype=np.float64)
+        vals = np.asarray(values, dtype=np.float64)
+        if ts.size == 0:
+            return
+        nb = self.buckets
+        if self._origin is None:
+            self._origin = int(ts[0] // self.slide)
+        buckets = np.floor_divide(ts, self.slide).astype(np.int64) - self._origin
+        # Lateness is judged against the watermark as it was when each sample arrived,
+        # same as the one-by-one path
+        seen = np.maximum(np.maximum.accumulate(ts), self.watermark)
+        live = buckets > np.floor_divide(seen, self.slide) - self._origin - nb
+        self.watermark = float(seen[-1])
+        if not live.all():
+            # Late samples are dropped before the slot lookup: they must not create keys
+            self.late += int(live.size - np.count_nonzero(live))
+            keep = np.flatnonzero(live)
+            keys = [keys[i] for i in keep.tolist()]
+            ts, vals, buckets = ts[keep], vals[keep], buckets[keep]
+            if ts.size == 0:
+                return
+
+        # The key -> slot lookup is the one per-sample Python step; new keys take the slow path
+        get = self._slot_of.get
+        slot_list = [get(key) for key in keys]
+        if None in slot_list:
+            slot_list = [self._slot(key) if slot is None else slot for key, slot in zip(keys, slot_list)]
+        slots = np.array(slot_list, dtype=np.int64)
+
+        back = np.arange(nb)
+        for bucket in np.unique(buckets).tolist():
+            skipped = bucket - back
+            sel = buckets == bucket
+            s, v = slots[sel], vals[sel]
+            top = self._head[s].astype(np.int64)
+            passed = top - nb >= bucket
+            if passed.any():
+                # the ring already moved past this bucket
+                self.late += int(np.count_nonzero(passed))
+                s, v, top = s[~passed], v[~passed], top[~passed]
+            ahead = top < bucket
+            if ahead.any():
+                # the ring moves forward: empty the cells of the buckets it passes
+                # (a slot listed twice just writes the same zeros twice)
+                moving, top = s[ahead], top[ahead]
+                passes = skipped[None, :] > top[:, None]
+                self._count[(moving[:, None] * nb + skipped % nb)[passes]] = 0
+                self._head[moving] = bucket
+            cells = s * nb + bucket % nb
+            fresh = cells[self._count[cells] == 0]
+            if fresh.size:
+                self._sum[fresh] = 0.0
+                self._sumsq[fresh] = 0.0
+                self._min[fresh] = np.inf
+                self._max[fresh] = -np.inf
+            np.add.at(self._count, cells, 1)
+            np.add.at(self._sum, cells, v)
+            np.add.at(self._sumsq, cells, v * v)
+            np.minimum.at(self._min, cells, v)
+            np.maximum.at(self._max, cells, v)
+
+    # ------------------------------------------------------------------
+    # Eviction
+    # ------------------------------------------------------------------
+    def evict_idle(self, now: float | None = None) -> int:
+        """Drop keys whose last sample is older than idle_timeout; returns how many."""
+        if self.idle_timeout is None:
+            return 0
+        cutoff = (self.watermark if now is None else now) - self.idle_timeout
+        if self._origin is None or not math.isfinite(cutoff):
+            return 0
+        # a slot is idle once its newest bucket ended at or before the cutoff
+        stale = min(self._FREE, max(self._NEW + 1, int(cutoff // self.slide) - self._origin))
+        if self.use_numpy:
+            idle = np.nonzero(self._head[: self._capacity] < stale)[0].tolist()
+        else:
+            idle = [slot for slot, top in enumerate(self._head) if top < stale]
+        for slot in idle:
+            del self._slot_of[self._key_of[slot]]
+            self._key_of[slot] = None
+        if idle:
+            self._release(idle)
+        self.evicted += len(idle)
+        return len(idle)
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+    def _live_cells(self, slot: int):
+        nb, top = self.buckets, int(self._head[slot])
+        current = int(self.watermark // self.slide) - self._origin
+        for bucket in range(max(top, current) - nb + 1, top + 1):
+            cell = slot * nb + bucket % nb
+            if self._count[cell]:
+                yield cell
+
+    def stats(self, key: Hashable) -> WindowStats:
+        """Aggregate of `key` over the window ending at the watermark."""
+        slot = self._slot_of.get(key)
+        if slot is None:
+            return _EMPTY
+        n, total, sumsq, lo, hi = 0, 0.0, 0.0, math.inf, -math.inf
+        for cell in self._live_cells(slot):
+            n += int(self._count[cell])
+            total += float(self._sum[cell])
+            sumsq += float(self._sumsq[cell])
+            lo = min(lo, float(self._min[cell]))
+            hi = max(hi, float(self._max[cell]))
+        if n == 0:
+            return _EMPTY
+        mean = total / n
+        # sum / sum-of-squares form: fine for window-sized counts, not for huge offsets
+        var = max(0.0, (sumsq - n * mean * mean) / (n - 1)) if n > 1 else 0.0
+        return WindowStats(n, mean, math.sqrt(var), lo, hi)
+
+    def snapshot(self) -> dict[Hashable, WindowStats]:
+        """WindowStats for every live key (keys with nothing in the window are left out)."""
+        out = {}
+        for key in self._slot_of:
+            stats = self.stats(key)
+            if stats.count:
+                out[key] = stats
+        return out
+
+    def __len__(self) -> int:
+        return len(self._slot_of)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._slot_of
+
+    def memory_bytes(self) -> int:
+        """Bytes held by the columns plus the key index (not counting the key objects)."""
+        columns = [getattr(self, name) for name, _, _ in self._CELL_COLUMNS] + [self._head]
+        if self.use_numpy:
+            total = sum(c.nbytes for c in columns)
+        else:
+            total = sum(c.itemsize * len(c) for c in columns)
+        return (total + sys.getsizeof(self._slot_of) + sys.getsizeof(self._key_of)
+                + sys.getsizeof(self._free))
+
+    def memory_per_key(self) -> float:
+        return self.memory_bytes() / max(1, len(self))
+
+
+# ----------------------------------------------------------------------
+# Coroutine API for single-key callers
+# ----------------------------------------------------------------------
+def running_window(store: KeyedWindowStore, key: Hashable):
+    """
+    running_average() with a window: send a value (timestamp = time.time()) or a
+    (timestamp, value) pair; yields the mean of `key` over the current window.
+    """
+    mean = None
+    while True:
+        item = yield mean   # dışarı pencere ortalamasını ver, içeri yeni örneği al
+        if isinstance(item, tuple):
+            ts, value = item
+        else:
+            ts, value = time.time(), item
+        store.add(key, ts, value)
+        stats = store.stats(key)
+        mean = stats.mean if stats.count else None
+
+
+# ----------------------------------------------------------------------
+# Benchmark
+# ----------------------------------------------------------------------
+def _generator_bytes_per_key(keys: int) -> float:
+    import tracemalloc
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    gens = {}
+    for i in range(keys):
+        coro = running_average()
+        next(coro)
+        coro.send(1.0)
+        gens[f"metric.{i}"] = coro
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    key_bytes = sum(sys.getsizeof(k) for k in gens)
+    return (used - key_bytes) / keys
+
+
+def bench(keys: int, samples: int, batch: int, window: float, slide: float) -> None:
+    import random
+
+    rng = random.Random(7)
+    names = [f"metric.{i}" for i in range(keys)]
+    span = window * 4                        # samples spread over four windows of event time
+    # Skewed key popularity, like real metrics: a few hot keys, a long tail
+    key_idx = [min(keys - 1, int(rng.paretovariate(1.2)) - 1) if rng.random() < 0.3 else rng.randrange(keys)
+               for _ in range(samples)]
+    ts = sorted(rng.uniform(0, span) for _ in range(samples))
+    vals = [rng.lognormvariate(3, 0.5) for _ in range(samples)]
+    sample_keys = [names[i] for i in key_idx]
+    print(f"{keys:,} keys, {samples:,} samples, batch={batch:,}, window={window}s slide={slide}s")
+
+    modes = [("python", False)] + ([("numpy", True)] if np is not None else [])
+    for label, use_numpy in modes:
+        store = KeyedWindowStore(window, slide, idle_timeout=window, use_numpy=use_numpy)
+        start = time.perf_counter()
+        for i in range(0, samples, batch):
+            store.ingest(sample_keys[i:i + batch], ts[i:i + batch], vals[i:i + batch])
+        elapsed = time.perf_counter() - start
+        print(f"  store/{label:<7} {samples / elapsed / 1e6:6.2f} M samples/s  "
+              f"{store.memory_per_key():7.1f} B/key ({len(store):,} live keys, "
+              f"{store.evicted:,} evicted, {store.late:,} late)")
+
+    gens = {}
+    start = time.perf_counter()
+    for key, value in zip(sample_keys, vals):
+        coro = gens.get(key)
+        if coro is None:
+            coro = gens[key] = running_average()
+            next(coro)
+        coro.send(value)
+    elapsed = time.perf_counter() - start
+    per_key = _generator_bytes_per_key(min(keys, 200_000))
+    print(f"  generator/key   {samples / elapsed / 1e6:6.2f} M samples/s  {per_key:7.1f} B/key "
+          f"(no windows, mean only)")
+
+
+def demo() -> None:
+    store = KeyedWindowStore(window=60, slide=10, idle_timeout=120)
+    store.ingest(["api", "db", "api", "api"], [1, 2, 15, 59], [10.0, 3.0, 20.0, 30.0])
+    print("api @59 :", store.stats("api"))
+    store.ingest(["api"], [75], [40.0])               # window is now (20, 80]: the t=1 and t=15 samples fall out
+    print("api @75 :", store.stats("api"))
+    store.ingest(["web"], [300], [1.0])               # db and api have been idle for > 120 s
+    print("evicted :", store.evicted, "live keys:", sorted(store.snapshot()))
+
+    coro = running_window(KeyedWindowStore(window=60), "single")
+    print(next(coro))                                 # None, same as running_average
+    print(coro.send((0, 10)), coro.send((1, 20)), coro.send((2, 30)))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--bench", action="store_true")
+    parser.add_argument("--keys", type=int, default=100_000)
+    parser.add_argument("--samples", type=int, default=1_000_000)
+    parser.add_argument("--batch", type=int, default=65536)
+    parser.add_argument("--window", type=float, default=60.0)
+    parser.add_argument("--slide", type=float, default=10.0)
+    args = parser.parse_args()
+    if args.bench:
+        bench(args.keys, args.samples, args.batch, args.window, args.slide)
+    else:
+        demo()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+"""
+Incremental log reading with a persisted offset index, plus a follow (tail -f) mode
+
+Running yield_from.py rescans every file from byte 0 on each run. Here a small
+JSON index remembers, per file, what we already consumed:
+
+    {"version": 1, "files": {"logs/app-2026-02-10.log":
+        {"dev": 2049, "inode": 131, "size": 52311, "mtime_ns": ..., "offset": 52311}}}
+
+On the next run, for every file from iter_log_files():
+- same inode, same size/mtime, offset at the end   -> skipped without opening it
+- same inode, grown                                 -> resumed from the saved offset
+- new path whose inode we know (renamed by rotation) -> resumed from that entry's offset
+- smaller than the saved offset (truncated) or a different inode under the
+  same name (replaced)                              -> read again from 0
+
+Only complete lines (ending with a newline) are consumed; a half-written last
+line stays for the next run. The offset of a line is committed only after the
+consumer asks for the next one, so a crash re-delivers at most the line that
+was being processed (at-least-once).
+
+follow_lines() keeps going after the initial catch-up: every round is another
+incremental pass (one stat() per unchanged file), so appends to the newest file
+and new daily files are both picked up. Between rounds it waits with inotify on
+Linux (through ctypes) or by polling elsewhere.
+
+Usage (through yield_from.py):
+    python -m py_dissection_lab.generators.yield_from logs --index .log-index.json
+    python -m py_dissection_lab.generators.yield_from logs --index .log-index.json --follow
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import select
+import sys
+import threading
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Iterator
+
+from .yield_from import iter_log_files
+
+
+@dataclass
+class FileCheckpoint:
+    dev: int
+    inode: int
+    size: int
+    mtime_ns: int
+    offset: int
+
+
+class OffsetIndex:
+    """Per-file checkpoints, loaded from and saved to a small JSON file."""
+
+    VERSION = 1
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.files: dict[str, FileCheckpoint] = {}
+        self.dirty = False
+        if self.path.exists():
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            if data.get("version") == self.VERSION:
+                self.files = {name: FileCheckpoint(**entry) for name, entry in data["files"].items()}
+
+    def save(self) -> None:
+        """Write the index atomically: a crash mid-write leaves the previous version intact."""
+        if not self.dirty:
+            return
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        payload = {"version": self.VERSION, "files": {name: asdict(cp) for name, cp in self.files.items()}}
+        tmp.write_text(json.dumps(payload, indent=1), encoding="utf-8")
+        os.replace(tmp, self.path)
+        self.dirty = False
+
+    def start_offset(self, path: Path, st: os.stat_result) -> int | None:
+        """
+        Where to resume reading `path`, or None if it is unchanged and can be skipped.
+        """
+        entry = self.files.get(str(path))
+        if entry is None or (entry.dev, entry.inode) != (st.st_dev, st.st_ino):
+            # Unknown name: maybe a file we already know that was renamed by rotation
+            entry = self._find_inode(st)
+            if entry is None:
+                return 0
+            # Keep the checkpoint under the new name; the old one is pruned later
+            self.files[str(path)] = entry
+            self.dirty = True
+        if st.st_size < entry.offset:
+            return 0  # truncated (copytruncate rotation): start over
+        if st.st_size == entry.size and st.st_mtime_ns == entry.mtime_ns and entry.offset == st.st_size:
+            return None
+        return entry.offset
+
+    def _find_inode(self, st: os.stat_result) -> FileCheckpoint | None:
+        for entry in self.files.values():
+            if (entry.dev, entry.inode) == (st.st_dev, st.st_ino):
+                return entry
+        return None
+
+    def update(self, path: Path, st: os.stat_result, offset: int) -> None:
+        self.files[str(path)] = FileCheckpoint(st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns, offset)
+        self.dirty = True
+
+    def prune(self, existing: set[str]) -> None:
+        """Forget files that no longer exist."""
+        for name in list(self.files):
+            if name not in existing:
+                del self.files[name]
+                self.dirty = True
+
+
+def _iter_complete_lines(path: Path, offset: int, encoding: str) -> Iterator[tuple[str, int]]:
+    """Yield (line, offset after the line) for complete lines starting at `offset`."""
+    with open(path, "rb") as f:
+        f.seek(offset)
+        for raw in f:
+            if not raw.endswith(b"\n"):
+                return  # still being written; picked up next time
+            offset += len(raw)
+            yield raw.decode(encoding, errors="replace"), offset
+
+
+def iter_new_lines(
+    log_dir: Path,
+    index: OffsetIndex,
+    pattern: str = "*.log",
+    encoding: str = "utf-8",
+    checkpoint_every: int = 10_000,
+) -> Iterator[str]:
+    """
+    Like iter_all_log_lines(log_dir), but only lines not consumed by a previous run.
+
+    The index is saved every `checkpoint_every` lines and when the generator finishes
+    or is closed.
+    """
+    paths = list(iter_log_files(log_dir, pattern))
+    pending = 0
+    try:
+        for path in paths:
+            st = os.stat(path)
+            offset = index.start_offset(path, st)
+            if offset is None:
+                continue
+            # stat() is refreshed as we go so the saved size/mtime match what was read
+            index.update(path, st, offset)
+            for line, end in _iter_complete_lines(path, offset, encoding):
+                yield line
+                # The consumer came back for more, so this line is done
+                index.files[str(path)].offset = end
+                index.dirty = True
+                pending += 1
+                if pending >= checkpoint_every:
+                    _refresh_stat(index, path)
+                    index.save()
+                    pending = 0
+            _refresh_stat(index, path)
+        # Only now: renamed files had to be found by inode first
+        index.prune({str(p) for p in paths})
+    finally:
+        index.save()
+
+
+def _refresh_stat(index: OffsetIndex, path: Path) -> None:
+    entry = index.files[str(path)]
+    st = os.stat(path)
+    index.update(path, st, entry.offset)
+
+
+# ----------------------------------------------------------------------
+# Follow mode: wait for new data
+# ----------------------------------------------------------------------
+class _Inotify:
+    """Minimal inotify watcher on a directory (Linux only, via ctypes)."""
+
+    IN_MODIFY = 0x00000002
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_NONBLOCK = os.O_NONBLOCK
+    IN_CLOEXEC = os.O_CLOEXEC
+
+    def __init__(self, directory: Path):
+        import ctypes
+        import ctypes.util
+
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or None, use_errno=True)
+        self.fd = libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        mask = self.IN_MODIFY | self.IN_CREATE | self.IN_MOVED_TO
+        if libc.inotify_add_watch(self.fd, os.fsencode(directory), mask) < 0:
+            os.close(self.fd)
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {directory}")
+
+    def wait(self, timeout: float) -> None:
+        """Block until something changes in the directory or `timeout` expires."""
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if readable:
+            # Drain the queue; we only care that *something* happened
+            try:
+                while os.read(self.fd, 4096):
+                    pass
+            except BlockingIOError:
+                pass
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+def _make_waiter(directory: Path, poll_interval: float):
+    if sys.platform.startswith("linux"):
+        try:
+            watcher = _Inotify(directory)
+            return watcher.wait, watcher.close
+        except (OSError, AttributeError):
+            pass  # no inotify (old kernel, exotic libc): fall back to polling
+    return time.sleep, lambda: None
+
+
+def follow_lines(
+    log_dir: Path,
+    index: OffsetIndex,
+    pattern: str = "*.log",
+    encoding: str = "utf-8",
+    poll_interval: float = 1.0,
+    stop_event: threading.Event | None = None,
+) -> Iterator[str]:
+    """
+    Catch up like iter_new_lines(), then keep yielding lines as they are appended.
+
+    Waits for changes with inotify where available, otherwise polls every
+    `poll_interval` seconds. Stops when `stop_event` is set (checked at least
+    every poll_interval) or when the generator is closed.
+    """
+    wait, close_waiter = _make_waiter(log_dir, poll_interval)
+    try:
+        while stop_event is None or not stop_event.is_set():
+            # Each round is one incremental pass: unchanged files cost one stat()
+            # and rotation to a new daily file is picked up by iter_log_files().
+            got_any = False
+            for line in iter_new_lines(log_dir, index, pattern, encoding):
+                got_any = True
+                yield line
+            if not got_any:
+                wait(poll_interval)
+    finally:
+        close_waiter()
@@ -0,0 +1,550 @@
+"""
+On-disk inverted index over daily log files
+
+A question like "which days had ERROR for customer C0042" is a full scan of
+log_dir through iter_all_log_lines(). The index answers it by reading only the
+parts of the files that can contain the answer:
+
+- every file from iter_log_files() is cut into newline-aligned blocks of about
+  `block_size` bytes (16 KiB)
+- each block is tokenized once (runs of [a-z0-9_], lowercased; pure numbers
+  such as latencies and clock fields are skipped) and the index records
+  token -> the blocks containing it
+- a query intersects the posting lists of its tokens and reads only those
+  candidate blocks (pread), then checks the lines in them
+
+Files on disk, in the index directory:
+
+    manifest.json      indexed files (id, inode, size, mtime, bytes indexed) and segments
+    seg-00001.lidx     immutable segment, memory-mapped at query time
+
+Each update() writes one new segment for whatever is new: new daily files, or
+the grown tail of a file already indexed (same inode). A truncated or
+replaced file gets a new file id and its old blocks are ignored from then on.
+compact() merges all segments into one and drops dead blocks.
+
+Segment layout (little-endian, sections 8-byte aligned):
+
+    header      b"LIDX" u32 version, u32 blocks, u32 terms, 8 bytes 0
+    blocks      file_id u32[blocks] | offset u64[blocks] | length u32[blocks]
+    terms       term_start u64[terms + 1] | postings_start u64[terms + 1]
+                | term bytes (sorted, concatenated) | postings
+    postings    per term, ascending block numbers as delta LEB128 varints
+
+Terms are found by binary search over the memory-mapped term table, so
+opening an index costs nothing in proportion to its size.
+
+Only complete lines (ending with a newline) are indexed, like log_checkpoint.py;
+a half-written last line is picked up by the next update().
+
+Compressed days (.gz / .bz2 / .xz / .zst, see compressed_logs.py) are not
+indexed: a block is fetched with one pread at its byte offset, which a
+compressed stream does not have. Only files matching `pattern` (*.log) are
+indexed and scan_search() reads exactly the same files, so both answer for
+the plain logs only.
+
+Usage:
+    python -m py_dissection_lab.generators.log_index logs --index .log-index --update
+    python -m py_dissection_lab.generators.log_index logs --index .log-index --query ERROR C0042
+    python -m py_dissection_lab.generators.log_index /tmp/ck-logs --index /tmp/ck-index --bench
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import mmap
+import os
+import re
+import struct
+import time
+from array import array
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from .yield_from import iter_lines, iter_log_files
+
+MAGIC = b"LIDX"
+VERSION = 1
+BLOCK_SIZE = 16 * 1024     # smaller blocks: fewer bytes read per rare hit, slightly larger postings
+_HEADER = struct.Struct("<4sIIII4x")     # 24 bytes, keeps the arrays 8-aligned
+_TOKEN = re.compile(rb"[a-z0-9_]+")
+
+
+def tokenize(data: bytes) -> set[bytes]:
+    """Distinct index terms in `data`: lowercased [a-z0-9_] runs, pure digit runs dropped."""
+    return {t for t in set(_TOKEN.findall(data.lower())) if not t.isdigit()}
+
+
+def query_terms(words: Iterable[str]) -> list[bytes]:
+    """The index terms a query asks for (each word may yield several, e.g. customer=C0042)."""
+    terms: list[bytes] = []
+    for word in words:
+        terms.extend(t for t in _TOKEN.findall(word.lower().encode()) if not t.isdigit() and t not in terms)
+    return terms
+
+
+def required_terms(words: Iterable[str]) -> list[bytes]:
+    """
+    query_terms(), but a query without any index term is a ValueError: numbers
+    ("500") and non-ASCII words are never indexed, so no line could match them
+    as tokens, and an empty term list would otherwise match every line.
+    """
+    words = list(words)
+    terms = query_terms(words)
+    if not terms:
+        raise ValueError(f"query {' '.join(words)!r} has no index terms (numbers and non-ASCII words are not indexed)")
+    return terms
+
+
+def line_has_terms(raw: bytes, terms: list[bytes]) -> bool:
+    """Every term is a token of `raw`; a substring test first, so most lines never reach the regex."""
+    lowered = raw.lower()
+    return all(t in lowered for t in terms) and set(terms) <= tokenize(raw)
+
+
+def _write_varint(out: bytearray, n: int) -> None:
+    while n >= 0x80:
+        out.append(n & 0x7F | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+def _read_postings(data, pos: int, end: int) -> list[int]:
+    blocks, n, shift, last = [], 0, 0, 0
+    for byte in data[pos:end]:
+        n |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            last += n
+            blocks.append(last)
+            n = shift = 0
+        else:
+            shift += 7
+    return blocks
+
+
+def _pad8(out: bytearray) -> None:
+    out += bytes(-len(out) % 8)
+
+
+# ----------------------------------------------------------------------
+# Segments
+# ----------------------------------------------------------------------
+def write_segment(path: Path, blocks: list[tuple[int, int, int]], postings: dict[bytes, array]) -> None:
+    """blocks: (file_id, offset, length); postings: term -> ascending block numbers."""
+    terms = sorted(postings)
+    out = bytearray(_HEADER.pack(MAGIC, VERSION, len(blocks), len(terms), 0))
+    out += array("I", [b[0] for b in blocks]).tobytes()
+    _pad8(out)
+    out += array("Q", [b[1] for b in blocks]).tobytes()
+    out += array("I", [b[2] for b in blocks]).tobytes()
+    _pad8(out)
+
+    term_starts, post_starts = array("Q", [0]), array("Q", [0])
+    blob, posts = bytearray(), bytearray()
+    for term in terms:
+        blob += term
+        term_starts.append(len(blob))
+        last = 0
+        for block in postings[term]:
+            _write_varint(posts, block - last)
+            last = block
+        post_starts.append(len(posts))
+    out += term_starts.tobytes()
+    out += post_starts.tobytes()
+    out += blob
+    out += posts
+
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_bytes(out)
+    os.replace(tmp, path)
+
+
+class Segment:
+    """A memory-mapped segment file."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.n_blocks, self.n_terms, _ = _HEADER.unpack_from(self._mm)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{self.path} is not a version {VERSION} log index segment")
+        view = memoryview(self._mm)
+        pos = _HEADER.size
+        nb, nt = self.n_blocks, self.n_terms
+        self.file_ids = view[pos:pos + 4 * nb].cast("I")
+        pos += 4 * nb
+        pos += -pos % 8
+        self.offsets = view[pos:pos + 8 * nb].cast("Q")
+        pos += 8 * nb
+        self.lengths = view[pos:pos + 4 * nb].cast("I")
+        pos += 4 * nb
+        pos += -pos % 8
+        self._term_starts = view[pos:pos + 8 * (nt + 1)].cast("Q")
+        pos += 8 * (nt + 1)
+        self._post_starts = view[pos:pos + 8 * (nt + 1)].cast("Q")
+        pos += 8 * (nt + 1)
+        self._terms_at = pos
+        self._posts_at = pos + (self._term_starts[nt] if nt else 0)
+
+    def _term(self, i: int) -> bytes:
+        at = self._terms_at
+        return self._mm[at + self._term_starts[i]:at + self._term_starts[i + 1]]
+
+    def postings(self, term: bytes) -> list[int]:
+        """Block numbers (in this segment) whose text contains `term`."""
+        lo, hi = 0, self.n_terms
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._term(mid) < term:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo == self.n_terms or self._term(lo) != term:
+            return []
+        at = self._posts_at
+        return _read_postings(self._mm, at + self._post_starts[lo], at + self._post_starts[lo + 1])
+
+    def terms(self) -> Iterator[bytes]:
+        return (self._term(i) for i in range(self.n_terms))
+
+    def close(self) -> None:
+        for view in (self.file_ids, self.offsets, self.lengths, self._term_starts, self._post_starts):
+            view.release()
+        self._mm.close()
+
+
+# ----------------------------------------------------------------------
+# Index
+# ----------------------------------------------------------------------
+@dataclass
+class IndexedFile:
+    file_id: int
+    dev: int
+    inode: int
+    size: int
+    mtime_ns: int
+    indexed: int        # bytes of complete lines covered by segments
+
+
+class LogIndex:
+    """Manifest + segments in `index_dir`, for the files of `log_dir`."""
+
+    def __init__(self, index_dir: Path, log_dir: Path, pattern: str = "*.log", block_size: int = BLOCK_SIZE):
+        self.index_dir = Path(index_dir)
+        self.log_dir = Path(log_dir)
+        self.pattern = pattern
+        self.block_size = block_size
+        self.files: dict[str, IndexedFile] = {}
+        self.segment_names: list[str] = []
+        self.next_file_id = 0
+        self._segments: dict[str, Segment] = {}
+        manifest = self.index_dir / "manifest.json"
+        if manifest.exists():
+            data = json.loads(manifest.read_text(encoding="utf-8"))
+            if data.get("version") == VERSION:
+                self.block_size = data["block_size"]
+                self.files = {name: IndexedFile(**entry) for name, entry in data["files"].items()}
+                self.segment_names = data["segments"]
+                self.next_file_id = data["next_file_id"]
+
+    def _save_manifest(self) -> None:
+        payload = {
+            "version": VERSION,
+            "block_size": self.block_size,
+            "next_file_id": self.next_file_id,
+            "segments": self.segment_names,
+            "files": {name: asdict(entry) for name, entry in self.files.items()},
+        }
+        tmp = self.index_dir / "manifest.json.tmp"
+        tmp.write_text(json.dumps(payload, indent=1), encoding="utf-8")
+        os.replace(tmp, self.index_dir / "manifest.json")
+
+    def _segment(self, name: str) -> Segment:
+        segment = self._segments.get(name)
+        if segment is None:
+            segment = self._segments[name] = Segment(self.index_dir / name)
+        return segment
+
+    def _next_segment_name(self) -> str:
+        last = max((int(name[4:9]) for name in self.segment_names), default=0)
+        return f"seg-{last + 1:05d}.lidx"
+
+    def close(self) -> None:
+        for segment in self._segments.values():
+            segment.close()
+        self._segments.clear()
+
+    def __enter__(self) -> LogIndex:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # ------------------------------------------------------------------
+    # Building
+    # ------------------------------------------------------------------
+    def _blocks(self, path: Path, start: int) -> Iterator[tuple[int, bytes]]:
+        """Newline-aligned (offset, bytes) blocks of the complete lines after `start`."""
+        with open(path, "rb") as f:
+            f.seek(start)
+            carry, offset = b"", start
+            while chunk := f.read(self.block_size):
+                data = carry + chunk
+                cut = data.rfind(b"\n") + 1
+                if not cut:
+                    carry = data            # one line longer than a block: keep reading
+                    continue
+                yield offset, data[:cut]
+                offset += cut
+                carry = data[cut:]
+            # `carry` is a line without its newline yet: left for the next update()
+
+    def update(self) -> int:
+        """Index whatever is new in log_dir; returns the number of bytes indexed."""
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        live = {}
+        work: list[tuple[int, Path, int]] = []      # (file_id, path, start offset)
+        for path in iter_log_files(self.log_dir, self.pattern):
+            st = path.stat()
+            entry = self.files.get(path.name)
+            same = entry is not None and (entry.dev, entry.inode) == (st.st_dev, st.st_ino)
+            if not same or st.st_size < entry.indexed:
+                # New file, or replaced / truncated: fresh id, the old id's blocks become dead
+                entry = IndexedFile(self.next_file_id, st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns, 0)
+                self.next_file_id += 1
+            if entry.indexed < st.st_size:
+                work.append((entry.file_id, path, entry.indexed))
+            entry.size, entry.mtime_ns = st.st_size, st.st_mtime_ns
+            live[path.name] = entry
+        self.files = live
+        if not work:
+            self._save_manifest()
+            return 0
+
+        blocks: list[tuple[int, int, int]] = []
+        postings: dict[bytes, array] = {}
+        total = 0
+        by_id = {entry.file_id: entry for entry in live.values()}
+        for file_id, path, start in work:
+            end = start
+            for offset, data in self._blocks(path, start):
+                number = len(blocks)
+                blocks.append((file_id, offset, len(data)))
+                for term in tokenize(data):
+                    posting = postings.get(term)
+                    if posting is None:
+                        posting = postings[term] = array("I")
+                    posting.append(number)
+                end = offset + len(data)
+            total += end - start
+            by_id[file_id].indexed = end
+        if blocks:
+            name = self._next_segment_name()
+            write_segment(self.index_dir / name, blocks, postings)
+            self.segment_names.append(name)
+        self._save_manifest()
+        return total
+
+    def compact(self) -> None:
+        """Merge every segment into one, dropping blocks of files no longer live."""
+        live_ids = {entry.file_id for entry in self.files.values()}
+        blocks: list[tuple[int, int, int]] = []
+        postings: dict[bytes, array] = {}
+        for name in self.segment_names:
+            segment = self._segment(name)
+            remap = {}
+            for i in range(segment.n_blocks):
+                if segment.file_ids[i] in live_ids:
+                    remap[i] = len(blocks)
+                    blocks.append((segment.file_ids[i], segment.offsets[i], segment.lengths[i]))
+            for term in segment.terms():
+                moved = [remap[b] for b in segment.postings(term) if b in remap]
+                if moved:
+                    postings.setdefault(term, array("I")).extend(moved)
+        old = self.segment_names
+        self.close()
+        name = self._next_segment_name()
+        write_segment(self.index_dir / name, blocks, postings)
+        self.segment_names = [name]
+        self._save_manifest()
+        for stale in old:
+            (self.index_dir / stale).unlink(missing_ok=True)
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+    def candidate_blocks(self, terms: list[bytes]) -> list[tuple[str, int, int]]:
+        """(file name, offset, length) of the blocks containing every term, in file order."""
+        names = {entry.file_id: name for name, entry in self.files.items()}
+        found = []
+        for seg_name in self.segment_names:
+            segment = self._segment(seg_name)
+            lists = sorted((segment.postings(term) for term in terms), key=len)
+            if not lists or not lists[0]:
+                continue
+            hits = set(lists[0])
+            for other in lists[1:]:
+                hits.intersection_update(other)
+                if not hits:
+                    break
+            for block in hits:
+                name = names.get(segment.file_ids[block])
+                if name is not None:
+                    found.append((name, segment.offsets[block], segment.lengths[block]))
+        found.sort()
+        return found
+
+    def search(self, words: Iterable[str], encoding: str = "utf-8") -> Iterator[str]:
+        """
+        Lines containing every query word as a token, reading only candidate blocks.
+        Raises ValueError right away if the query has no index terms.
+        """
+        return self._search(required_terms(words), encoding)
+
+    def _search(self, terms: list[bytes], encoding: str) -> Iterator[str]:
+        current, fd = None, -1
+        try:
+            for name, offset, length in self.candidate_blocks(terms):
+                if name != current:
+                    if fd >= 0:
+                        os.close(fd)
+                    fd, current = os.open(self.log_dir / name, os.O_RDONLY), name
+                data = os.pread(fd, length, offset)
+                for raw in data.splitlines(keepends=True):
+                    if line_has_terms(raw, terms):
+                        yield raw.decode(encoding, errors="replace")
+        finally:
+            if fd >= 0:
+                os.close(fd)
+
+    def files_matching(self, words: Iterable[str]) -> list[str]:
+        """Which files (days) have at least one line with every query word."""
+        terms = required_terms(words)
+        days: list[str] = []
+        for name, offset, length in self.candidate_blocks(terms):
+            if days and days[-1] == name:
+                continue
+            with open(self.log_dir / name, "rb") as f:
+                data = os.pread(f.fileno(), length, offset)
+            if any(line_has_terms(raw, terms) for raw in data.splitlines()):
+                days.append(name)
+        return days
+
+    def size_bytes(self) -> int:
+        return sum((self.index_dir / name).stat().st_size for name in self.segment_names)
+
+
+def scan_search(log_dir: Path, words: Iterable[str], pattern: str = "*.log") -> Iterator[str]:
+    """
+    The same question without an index: every complete line of the files LogIndex
+    would index. Raises ValueError right away if the query has no index terms.
+    """
+    return _scan_search(log_dir, required_terms(words), pattern)
+
+
+def _scan_search(log_dir: Path, terms: list[bytes], pattern: str) -> Iterator[str]:
+    for path in iter_log_files(log_dir, pattern):
+        for line in iter_lines(path):
+            if line.endswith("\n") and line_has_terms(line.encode(), terms):
+                yield line
+
+
+# ----------------------------------------------------------------------
+# Benchmark: build, size, incremental update and query latency vs. full scan
+# ----------------------------------------------------------------------
+def _timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def _link_or_copy(src: Path, dst: Path) -> None:
+    try:
+        os.link(src, dst)
+    except OSError:         # other file system, or no hard links there
+        import shutil
+
+        shutil.copy2(src, dst)
+
+
+def bench(log_dir: Path, index_dir: Path, block_size: int = BLOCK_SIZE) -> None:
+    import shutil
+    import tempfile
+
+    shutil.rmtree(index_dir, ignore_errors=True)
+    index_dir.mkdir(parents=True)
+    with tempfile.TemporaryDirectory(dir=index_dir.parent) as scratch:
+        # log_dir itself is never touched: the bench works on links/copies in a scratch directory
+        _bench(log_dir, Path(scratch), index_dir, block_size)
+
+
+def _bench(source_dir: Path, log_dir: Path, index_dir: Path, block_size: int) -> None:
+    paths = list(iter_log_files(source_dir))
+    raw = sum(p.stat().st_size for p in paths)
+    for path in paths[:-1]:
+        _link_or_copy(path, log_dir / path.name)
+
+    # Build over all but the newest day, then add that day the way a nightly run would
+    index = LogIndex(index_dir, log_dir, block_size=block_size)
+    built, build_s = _timed(index.update)
+    _link_or_copy(paths[-1], log_dir / paths[-1].name)
+    added, update_s = _timed(index.update)
+    noop, noop_s = _timed(index.update)
+    print(f"{len(paths)} files, {raw / 2**20:.0f} MiB")
+    print(f"build ({len(paths) - 1} files): {build_s:.1f}s, {built / 2**20 / build_s:.0f} MiB/s")
+    print(f"update (+1 new day):   {update_s:.1f}s for {added / 2**20:.0f} MiB; no-op update {noop_s * 1e3:.1f} ms")
+    _, compact_s = _timed(index.compact)
+    print(f"compact: {compact_s:.1f}s; index {index.size_bytes() / 2**20:.1f} MiB"
+          f" = {index.size_bytes() / raw:.1%} of the logs")
+
+    queries = [["ERROR", "C0042"], ["payment", "declined", "C1234"], ["FATAL"], ["ERROR"]]
+    print(f"{'query':<28}{'lines':>8}{'blocks':>8}{'index ms':>10}{'scan ms':>10}{'speedup':>9}")
+    for words in queries:
+        index.close()
+        cold = LogIndex(index_dir, log_dir)              # fresh open: mmap + manifest per query
+        hits, index_s = _timed(lambda: list(cold.search(words)))
+        blocks = len(cold.candidate_blocks(query_terms(words)))
+        cold.close()
+        scanned, scan_s = _timed(lambda: list(scan_search(log_dir, words)))
+        assert hits == scanned, (words, len(hits), len(scanned))
+        print(f"{' '.join(words):<28}{len(hits):>8,}{blocks:>8,}{index_s * 1e3:>10.1f}{scan_s * 1e3:>10.0f}"
+              f"{scan_s / index_s:>8.0f}x")
+    with LogIndex(index_dir, log_dir) as index:
+        days, days_s = _timed(lambda: index.files_matching(["ERROR", "C0042"]))
+    print(f"days with ERROR for C0042: {days} ({days_s * 1e3:.1f} ms)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("log_dir", type=Path)
+    parser.add_argument("--index", type=Path, default=Path(".log-index"), help="index directory")
+    parser.add_argument("--update", action="store_true", help="index new files / appended data first")
+    parser.add_argument("--compact", action="store_true")
+    parser.add_argument("--block-size", type=int, default=BLOCK_SIZE, help="bytes per block for a new index")
+    parser.add_argument("--query", nargs="+", metavar="WORD")
+    parser.add_argument("--days", action="store_true", help="print matching file names instead of lines")
+    parser.add_argument("--bench", action="store_true")
+    args = parser.parse_args()
+    if args.query and not query_terms(args.query):
+        parser.error(f"--query {' '.join(args.query)!r} has no index terms (numbers and non-ASCII words are not indexed)")
+    if args.bench:
+        bench(args.log_dir, args.index, args.block_size)
+        return
+    with LogIndex(args.index, args.log_dir, block_size=args.block_size) as index:
+        if args.update or not index.segment_names:
+            print(f"indexed {index.update() / 2**20:.1f} MiB", flush=True)
+        if args.compact:
+            index.compact()
+        if args.query:
+            if args.days:
+                print("\n".join(index.files_matching(args.query)))
+            else:
+                for line in index.search(args.query):
+                    print(line, end="")
+
+
+if __name__ == "__main__":
+    main()
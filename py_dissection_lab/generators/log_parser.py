@@ -0,0 +1,394 @@
+"""
+Structured log parsing into columnar batches
+
+After iter_error_lines() every line used to be re-split by hand into a dict:
+
+    {"ts": ..., "level": ..., "logger": ..., "message": ...}     # one per line
+
+parse_batches() is a pipeline stage that groups lines into LogBatch objects
+instead. A batch keeps the raw lines and builds a column only when it is asked
+for, once, then caches it:
+
+    batch.timestamps        array('q') of epoch milliseconds (UTC, naive times)
+    batch["level"]          list[str], one per line
+    batch.codes("level")    (array('H') codes, categories) for low-cardinality columns
+    batch.kv("latency_ms")  value of a key=value pair inside the message, lazily too
+
+A group-by on level and time bucket touches the timestamp and level columns
+only; logger and message are never split out. Field values are slices of the
+lines, so a column that is not asked for costs nothing.
+
+The line layout is a LineFormat template, "{date} {time} {level} {logger} - {message}"
+by default (the synthetic_logs.py / app-YYYY-MM-DD.log layout). Whitespace
+separated templates are extracted with str.split(None, k), everything else
+with a regex compiled from the template. On the split path a line must have
+the template's tokens and its literal ones ("-") in place; a line that does
+not goes through the regex instead. Lines that do not fit either get ""
+fields and timestamp -1.
+
+    fmt = LineFormat("{date} {time} {level} {logger} - {message}")
+    for batch in parse_batches(iter_error_lines(iter_all_log_lines(log_dir)), fmt):
+        per_level = batch.count_by("level")
+        per_minute = batch.count_by_bucket("level", 60_000)
+
+Usage:
+    python -m py_dissection_lab.generators.log_parser /tmp/logs
+    python -m py_dissection_lab.generators.log_parser /tmp/logs --bench
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import re
+import sys
+import time
+from array import array
+from collections import Counter
+from datetime import date, datetime, timezone
+from itertools import islice
+from operator import itemgetter
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from .._lazy import optional_module
+from .yield_from import iter_all_log_lines, iter_error_lines
+
+# optional, imported on first use: vectorized time-bucket group-by
+np = optional_module("numpy")
+
+DEFAULT_TEMPLATE = "{date} {time} {level} {logger} - {message}"
+_PLACEHOLDER = re.compile(r"\{(\w+)\}")
+_EPOCH = date(1970, 1, 1)
+
+
+class LineFormat:
+    """
+    A line layout: literal text and {field} placeholders; the last field takes the rest of the line.
+
+    `date` (YYYY-MM-DD) and `time` (HH:MM:SS[.mmm]) fields make up the timestamp
+    column, or a single ISO `ts` field holding both (YYYY-MM-DDTHH:MM:SS[.fff]).
+    """
+
+    def __init__(self, template: str = DEFAULT_TEMPLATE):
+        self.template = template
+        self.fields = _PLACEHOLDER.findall(template)
+        if not self.fields:
+            raise ValueError(f"template has no {{field}}: {template!r}")
+        if len(set(self.fields)) != len(self.fields):
+            raise ValueError(f"duplicate field in template: {template!r}")
+
+        # Fast path: every whitespace-separated token is a single placeholder or a literal
+        tokens = template.split()
+        self.token_index: dict[str, int] | None = {}
+        for i, token in enumerate(tokens):
+            match = _PLACEHOLDER.fullmatch(token)
+            if match:
+                self.token_index[match.group(1)] = i
+            elif "{" in token:
+                self.token_index = None
+                break
+        self.rest = self.fields[-1]
+        self.maxsplit = len(tokens) - 1
+        # A split row fits when it has every token (the rest field may be empty) and the
+        # literal tokens match: literal_at(row) == literal_values
+        self.min_tokens = self.maxsplit if _PLACEHOLDER.fullmatch(tokens[-1]) else len(tokens)
+        literals = [(i, token) for i, token in enumerate(tokens) if not _PLACEHOLDER.fullmatch(token)]
+        self.literal_at = itemgetter(*(i for i, _ in literals)) if literals else None
+        self.literal_values = literals[0][1] if len(literals) == 1 else tuple(t for _, t in literals)
+
+        # General path: the same template as a regex, literals escaped, whitespace runs -> \s+
+        parts, pos = [], 0
+        for match in _PLACEHOLDER.finditer(template):
+            parts.append(r"\s+".join(map(re.escape, re.split(r"\s+", template[pos:match.start()]))))
+            last = match.group(1) == self.rest
+            parts.append(f"(?P<{match.group(1)}>{'.*?' if last else r'\S+?'})")
+            pos = match.end()
+        parts.append(re.escape(template[pos:]) + r"\r?\n?$")
+        self.regex = re.compile("".join(parts))
+
+    def __repr__(self) -> str:
+        return f"LineFormat({self.template!r})"
+
+
+DEFAULT_FORMAT = LineFormat()
+
+
+def _to_ms(day: str, clock: str, days: dict[str, int]) -> int:
+    """YYYY-MM-DD + HH:MM:SS[.fff] -> epoch ms, -1 if either does not parse."""
+    # Tarih başına bir kez hesapla: bir batch'te genelde tek bir gün var
+    day_ms = days.get(day)
+    if day_ms is None:
+        try:
+            day_ms = (date.fromisoformat(day) - _EPOCH).days * 86_400_000
+        except ValueError:
+            day_ms = -1
+        days[day] = day_ms
+    if day_ms < 0 or len(clock) < 8:
+        return -1
+    try:
+        # Sliced instead of strptime (~20x cheaper)
+        ms = day_ms + int(clock[0:2]) * 3_600_000 + int(clock[3:5]) * 60_000 + int(clock[6:8]) * 1000
+        return ms + int(clock[9:12].ljust(3, "0")) if len(clock) > 9 else ms
+    except ValueError:
+        return -1
+
+
+class LogBatch:
+    """A batch of lines with lazily materialized, cached columns."""
+
+    __slots__ = ("lines", "fmt", "_columns", "_timestamps", "_codes")
+
+    def __init__(self, lines: list[str], fmt: LineFormat = DEFAULT_FORMAT):
+        self.lines = lines
+        self.fmt = fmt
+        self._columns: dict[str, list[str]] = {}
+        self._codes: dict[str, tuple[array, list[str]]] = {}
+        self._timestamps: array | None = None
+
+    def __len__(self) -> int:
+        return len(self.lines)
+
+    # ------------------------------------------------------------------
+    # Columns
+    # ------------------------------------------------------------------
+    def _extract(self, name: str) -> list[str]:
+        column = self._columns.get(name)
+        if column is not None:
+            return column
+        fmt = self.fmt
+        if name not in fmt.fields:
+            raise KeyError(f"{name!r} is not a field of {fmt}")
+        index = fmt.token_index.get(name) if fmt.token_index is not None else None
+        match = fmt.regex.match
+        if index is None:
+            return [(m.group(name) if (m := match(line)) else "") for line in self.lines]
+        column = []
+        append = column.append
+        for line, row in zip(self.lines, self._rows()):
+            if row is None:
+                append(m.group(name) if (m := match(line)) else "")
+            elif index < len(row):
+                append(row[index].rstrip("\r\n") if index == fmt.maxsplit else row[index])
+            else:
+                append("")              # empty rest field
+        return column
+
+    def _rows(self) -> list[list[str] | None]:
+        """Every line split to the template's depth; None where the row does not fit the template."""
+        fmt = self.fmt
+        depth, min_tokens = fmt.maxsplit, fmt.min_tokens
+        rows = [line.split(None, depth) for line in self.lines]
+        if fmt.literal_at is None:
+            return [row if len(row) >= min_tokens else None for row in rows]
+        literal_at, literal_values = fmt.literal_at, fmt.literal_values
+        return [row if len(row) >= min_tokens and literal_at(row) == literal_values else None for row in rows]
+
+    def __getitem__(self, name: str) -> list[str]:
+        column = self._columns.get(name)
+        if column is None:
+            column = self._columns[name] = self._extract(name)
+        return column
+
+    @property
+    def timestamps(self) -> array:
+        """Epoch milliseconds per line (-1 where the line has no parsable timestamp)."""
+        if self._timestamps is None:
+            days: dict[str, int] = {}
+            fields = self.fmt.fields
+            # date/time strings are only needed on the way to the int64 column; they are not kept
+            index = self.fmt.token_index or {}
+            if "date" in index and "time" in index and not {"date", "time"} & self._columns.keys():
+                # Both tokens from one split per line; a row that does not fit has no timestamp
+                i, j = index["date"], index["time"]
+                pairs = ((row[i], row[j]) if row is not None else ("", "") for row in self._rows())
+            elif "date" in fields and "time" in fields:
+                pairs = zip(self._extract("date"), self._extract("time"))
+            elif "ts" in fields:
+                pairs = ((ts[:10], ts[11:]) for ts in self._extract("ts"))
+            else:
+                raise KeyError(f"{self.fmt} has neither date/time nor ts fields")
+            self._timestamps = array("q", [_to_ms(d, t, days) for d, t in pairs])
+        return self._timestamps
+
+    def codes(self, name: str) -> tuple[array, list[str]]:
+        """Dictionary-encode a column: codes[i] indexes categories (for group-by)."""
+        encoded = self._codes.get(name)
+        if encoded is None:
+            lookup: dict[str, int] = {}
+            codes = array("H", [lookup.setdefault(v, len(lookup)) for v in self._extract(name)])
+            encoded = self._codes[name] = (codes, list(lookup))
+        return encoded
+
+    def kv(self, key: str, cast=str, default=None) -> list:
+        """Values of `key=value` pairs inside the last (rest) field, one per line."""
+        cache_key = f"{key}="
+        column = self._columns.get(cache_key)
+        if column is None:
+            column = []
+            append = column.append
+            for message in self[self.fmt.rest]:
+                start = message.find(cache_key)
+                if start < 0 or (start and message[start - 1] != " "):
+                    append(None)
+                    continue
+                start += len(cache_key)
+                end = message.find(" ", start)
+                append(message[start:] if end < 0 else message[start:end])
+            self._columns[cache_key] = column
+        if cast is str:
+            return [default if v is None else v for v in column]
+        return [default if v is None else cast(v) for v in column]
+
+    @property
+    def materialized(self) -> list[str]:
+        """Names of the columns built so far."""
+        names = list(self._columns) + [f"{name} (codes)" for name in self._codes]
+        return names + ["timestamps"] if self._timestamps is not None else names
+
+    # ------------------------------------------------------------------
+    # Group-by
+    # ------------------------------------------------------------------
+    def count_by(self, name: str) -> Counter:
+        codes, categories = self.codes(name)
+        counts = Counter(codes)
+        return Counter({categories[code]: n for code, n in counts.items()})
+
+    def count_by_bucket(self, name: str, bucket_ms: int) -> Counter:
+        """(bucket start ms, value) -> count; lines without a timestamp are skipped."""
+        codes, categories = self.codes(name)
+        stamps = self.timestamps
+        if np is not None and len(stamps) >= 1024:
+            ts = np.frombuffer(stamps, dtype=np.int64)
+            keep = ts >= 0
+            keys = (ts[keep] // bucket_ms) * len(categories) + np.frombuffer(codes, dtype=np.uint16)[keep]
+            uniq, counts = np.unique(keys, return_counts=True)
+            width = len(categories)
+            return Counter({(int(k // width) * bucket_ms, categories[int(k % width)]): int(n)
+                            for k, n in zip(uniq, counts)})
+        counts = Counter((t - t % bucket_ms, c) for t, c in zip(stamps, codes) if t >= 0)
+        return Counter({(t, categories[c]): n for (t, c), n in counts.items()})
+
+
+def parse_batches(lines: Iterable[str], fmt: LineFormat = DEFAULT_FORMAT, batch_size: int = 4096) -> Iterator[LogBatch]:
+    """Pipeline stage: lines in, LogBatch objects of up to `batch_size` lines out."""
+    it = iter(lines)
+    while batch := list(islice(it, batch_size)):
+        yield LogBatch(batch, fmt)
+
+
+def merge_counts(batches: Iterable[LogBatch], name: str = "level", bucket_ms: int | None = None) -> Counter:
+    """count_by (or count_by_bucket) summed over a whole stream of batches."""
+    total = Counter()
+    for batch in batches:
+        total.update(batch.count_by(name) if bucket_ms is None else batch.count_by_bucket(name, bucket_ms))
+    return total
+
+
+# ----------------------------------------------------------------------
+# Benchmark: columnar batches vs. one dict per line
+# ----------------------------------------------------------------------
+def parse_dict(line: str) -> dict:
+    """The ad-hoc way: split every line into a dict of all fields."""
+    day, clock, level, logger, _, message = line.split(None, 5)
+    ts = datetime.strptime(f"{day} {clock}", "%Y-%m-%d %H:%M:%S.%f").replace(tzinfo=timezone.utc)
+    return {"ts": int(ts.timestamp() * 1000), "level": level, "logger": logger, "message": message.rstrip("\n")}
+
+
+def _dict_counts(lines: Iterable[str], bucket_ms: int) -> tuple[Counter, Counter]:
+    by_level, by_bucket = Counter(), Counter()
+    for line in lines:
+        row = parse_dict(line)
+        by_level[row["level"]] += 1
+        by_bucket[(row["ts"] - row["ts"] % bucket_ms, row["level"])] += 1
+    return by_level, by_bucket
+
+
+def _batch_counts(lines: Iterable[str], bucket_ms: int) -> tuple[Counter, Counter]:
+    by_level, by_bucket = Counter(), Counter()
+    for batch in parse_batches(lines):
+        by_level.update(batch.count_by("level"))
+        by_bucket.update(batch.count_by_bucket("level", bucket_ms))
+    return by_level, by_bucket
+
+
+def _retained_bytes(build) -> int:
+    import tracemalloc
+
+    gc.collect()
+    tracemalloc.start()
+    kept = build()
+    used = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return used
+
+
+def bench(log_dir: Path, max_lines: int, bucket_ms: int = 60_000) -> None:
+    lines = list(islice(iter_all_log_lines(log_dir), max_lines))
+    n = len(lines)
+    raw = sum(map(len, lines))
+    print(f"{n:,} lines, {raw / n:.0f} chars/line, group-by level and {bucket_ms // 1000}s bucket")
+    print(f"{'parser':<26}{'lines/s':>12}{'B/line kept':>13}")
+
+    results = {}
+    for name, run in (("dict per line", _dict_counts), ("LogBatch (ts + level)", _batch_counts)):
+        best = float("inf")
+        for _ in range(3):
+            start = time.perf_counter()
+            results[name] = run(lines, bucket_ms)
+            best = min(best, time.perf_counter() - start)
+        print(f"{name:<26}{n / best:>12,.0f}", end="")
+        if name == "dict per line":
+            kept = _retained_bytes(lambda: [parse_dict(line) for line in lines])
+        else:
+            def build():
+                batches = list(parse_batches(lines))
+                for batch in batches:
+                    batch.timestamps, batch.codes("level")
+                return batches
+            kept = _retained_bytes(build)
+        print(f"{kept / n:>13.1f}")
+    assert results["dict per line"] == results["LogBatch (ts + level)"], "parsers disagree"
+
+    # Every column, for comparison with the dict's full materialization
+    def everything():
+        batches = list(parse_batches(lines))
+        for batch in batches:
+            batch.timestamps, batch["level"], batch["logger"], batch["message"]
+        return batches
+    start = time.perf_counter()
+    everything()
+    elapsed = time.perf_counter() - start
+    print(f"{'LogBatch (all columns)':<26}{n / elapsed:>12,.0f}{_retained_bytes(everything) / n:>13.1f}")
+    line_bytes = sum(map(sys.getsizeof, lines)) / n
+    print(f"B/line kept does not count the input lines ({line_bytes:.0f} B/line as str objects),"
+          " which a LogBatch references and the dicts let go")
+
+
+def demo(log_dir: Path) -> None:
+    batches = list(parse_batches(iter_error_lines(iter_all_log_lines(log_dir)), batch_size=1000))
+    if not batches:
+        print("no ERROR lines")
+        return
+    first = batches[0]
+    print(first.timestamps[:3], first["level"][:3], first.kv("latency_ms", int)[:3])
+    print("materialized:", first.materialized)      # logger hiç ayrıştırılmadı
+    print(merge_counts(batches, "logger"))
+    print(sorted(merge_counts(batches, "level", bucket_ms=3_600_000).items())[:3])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("log_dir", type=Path)
+    parser.add_argument("--bench", action="store_true")
+    parser.add_argument("--lines", type=int, default=1_000_000)
+    args = parser.parse_args()
+    if args.bench:
+        bench(args.log_dir, args.lines)
+    else:
+        demo(args.log_dir)
+
+
+if __name__ == "__main__":
+    main()
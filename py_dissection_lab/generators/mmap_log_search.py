@@ -0,0 +1,186 @@
+"""
+Bytes-level ERROR search over memory-mapped log files
+
+iter_lines() + iter_error_lines() decode every line to str and run "ERROR" in line
+on each one, even though almost every line is thrown away afterwards.
+
+Here each file is mmap'ed and the needle is searched in the raw buffer with
+bytes.find() (a memchr-style C loop). Only when a hit is found do we look for the
+surrounding newlines and slice out that one line:
+
+    buffer:  ....\\n2026-02-10 ... ERROR upstream timeout ...\\n....
+                   ^line_start       ^hit                     ^line_end
+
+Lines that do not match are never turned into Python objects at all.
+Items are decoded str lines, the same text iter_lines() gives: "\r\n" and a
+lone "\r" end a line and come out as "\n", as in text mode. With decode=False
+they are zero-copy memoryview slices of the mapping, line endings as in the file.
+
+Usage:
+    python -m py_dissection_lab.generators.mmap_log_search logs
+    python -m py_dissection_lab.generators.mmap_log_search /tmp/bench-logs --generate 4 --mb 1024 --bench
+"""
+
+from __future__ import annotations
+
+import argparse
+import mmap
+import time
+from pathlib import Path
+from typing import Iterator
+
+from .yield_from import iter_all_log_lines, iter_error_lines, iter_log_files
+
+
+def iter_matching_spans(buf, needle: bytes, start: int = 0, end: int | None = None) -> Iterator[tuple[int, int]]:
+    """
+    Yield (line_start, line_end) for every line in buf[start:end] that contains needle.
+
+    line_end includes the trailing newline when there is one. A line is reported
+    once even if the needle occurs in it several times. `start` must be a line start.
+    """
+    if end is None:
+        end = len(buf)
+
+    pos = start
+    while True:
+        hit = buf.find(needle, pos, end)
+        if hit < 0:
+            return
+        line_start = buf.rfind(b"\n", start, hit) + 1 or start
+        newline = buf.find(b"\n", hit, end)
+        line_end = end if newline < 0 else newline + 1
+        yield line_start, line_end
+        # Continue after this line so the same line is not reported twice
+        pos = line_end
+
+
+def iter_mmap_lines_matching(
+    path: Path,
+    needle: str = "ERROR",
+    *,
+    decode: bool = True,
+    encoding: str = "utf-8",
+) -> Iterator[str | memoryview]:
+    """
+    Yield lines of `path` containing `needle`, searching the mmap'ed bytes.
+
+    Decoded lines end in "\n" whatever the file uses, like iter_lines().
+    decode=False yields memoryview slices of the mapping: no copy, but a view keeps
+    the mapping alive until it is released, so copy (bytes(view)) anything you keep.
+    """
+    needle_bytes = needle.encode(encoding)
+    with open(path, "rb") as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            return  # empty files can not be mapped
+
+    try:
+        # Tell the kernel we read front to back (bigger read-ahead)
+        if hasattr(mm, "madvise"):
+            mm.madvise(mmap.MADV_SEQUENTIAL)
+
+        if decode:
+            for line_start, line_end in iter_matching_spans(mm, needle_bytes):
+                line = mm[line_start:line_end].decode(encoding, errors="replace")
+                if "\r" not in line:
+                    yield line
+                    continue
+                # Spans are cut at "\n" only; text mode also ends a line at a lone "\r"
+                for part in line.replace("\r\n", "\n").replace("\r", "\n").splitlines(keepends=True):
+                    if needle in part:
+                        yield part
+        else:
+            view = memoryview(mm)
+            try:
+                for line_start, line_end in iter_matching_spans(mm, needle_bytes):
+                    yield view[line_start:line_end]
+            finally:
+                view.release()
+    finally:
+        try:
+            mm.close()
+        except BufferError:
+            # A caller still holds one of the memoryviews; the mapping is
+            # unmapped when the last view is garbage collected.
+            pass
+
+
+def iter_mmap_error_lines(
+    log_dir: Path,
+    needle: str = "ERROR",
+    *,
+    decode: bool = True,
+    pattern: str = "*.log",
+) -> Iterator[str | memoryview]:
+    """Drop-in for iter_error_lines(iter_all_log_lines(log_dir)) on top of mmap search."""
+    for path in iter_log_files(log_dir, pattern):
+        yield from iter_mmap_lines_matching(path, needle, decode=decode)
+
+
+# ----------------------------------------------------------------------
+# Benchmark: str pipeline vs. mmap search
+# ----------------------------------------------------------------------
+def _measure(label: str, make_stream, total_bytes: int, trace: bool) -> int:
+    import tracemalloc
+
+    if trace:
+        tracemalloc.start()
+    wall = time.perf_counter()
+    cpu = time.process_time()
+    found = 0
+    for _ in make_stream():
+        found += 1
+    cpu = time.process_time() - cpu
+    wall = time.perf_counter() - wall
+    peak = ""
+    if trace:
+        peak = f"{tracemalloc.get_traced_memory()[1] / 1024:>12,.0f}"
+        tracemalloc.stop()
+    gib = total_bytes / 2**30
+    print(f"{label:<26}{found:>10,}{wall:>10.3f}{cpu:>10.3f}{cpu / gib:>12.3f}{gib / wall * 1024:>10,.0f}{peak}")
+    return found
+
+
+def bench(log_dir: Path, trace: bool) -> None:
+    total_bytes = sum(p.stat().st_size for p in iter_log_files(log_dir))
+    print(f"{total_bytes / 2**30:,.2f} GiB in {log_dir}  (tracemalloc {'on' if trace else 'off'})")
+    header = f"{'method':<26}{'matches':>10}{'wall s':>10}{'cpu s':>10}{'cpu s/GiB':>12}{'MiB/s':>10}"
+    print(header + (f"{'peak KiB':>12}" if trace else ""))
+
+    # str objects created: one per line for the baseline, one per match for mmap
+    expected = _measure("str lines (iter_lines)", lambda: iter_error_lines(iter_all_log_lines(log_dir)),
+                        total_bytes, trace)
+    found = _measure("mmap + find, decoded", lambda: iter_mmap_error_lines(log_dir), total_bytes, trace)
+    assert found == expected, (found, expected)
+    found = _measure("mmap + find, memoryview", lambda: iter_mmap_error_lines(log_dir, decode=False),
+                     total_bytes, trace)
+    assert found == expected, (found, expected)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("log_dir", type=Path)
+    parser.add_argument("--needle", default="ERROR")
+    parser.add_argument("--bench", action="store_true")
+    parser.add_argument("--trace", action="store_true", help="report tracemalloc peak (slows every method down)")
+    parser.add_argument("--generate", type=int, metavar="FILES", help="write synthetic logs into log_dir first")
+    parser.add_argument("--mb", type=float, default=1024, help="size of each generated file in MiB")
+    args = parser.parse_args()
+
+    if args.generate:
+        from .synthetic_logs import write_synthetic_logs
+
+        write_synthetic_logs(args.log_dir, args.generate, args.mb)
+
+    if args.bench:
+        bench(args.log_dir, args.trace)
+        return
+
+    for line in iter_mmap_error_lines(args.log_dir, args.needle):
+        print(line, end="")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+"""
+One-pass multi-pattern filter stage for the pull and push log pipelines
+
+iter_error_lines() and filter_error() only know "ERROR". Checking ERROR, FATAL,
+Traceback and a dozen customer ids that way means one pass per pattern.
+
+MultiMatcher compiles every literal into a single trie-shaped regex:
+
+    ["ERROR", "ERR", "FATAL"]  ->  (?:ERR(?:OR)?|FATAL)
+
+The regex engine walks it like an automaton (Aho-Corasick style): at each position
+it only follows the branch for the current character, so the cost per line stays
+roughly flat as literals are added. Because longer continuations are tried first,
+a hit is always the longest literal starting there; every shorter literal that
+matched at the same position is one of its prefixes, which we precompute.
+
+Optional regexes are checked only on lines that already passed the combined
+prefilter, and each output is tagged with the names of everything that matched.
+
+The same matcher plugs into both pipeline styles:
+- pull: iter_tagged_lines(lines, matcher)  -> yields (line, tags)
+- push: filter_patterns(matcher, target)   -> sends (line, tags) downstream
+
+Usage:
+    python -m py_dissection_lab.generators.multi_pattern --bench
+"""
+
+from __future__ import annotations
+
+import argparse
+import re
+import time
+from typing import Iterable, Iterator, Mapping
+
+
+def _trie_regex(words: Iterable[str]) -> str:
+    """Regex source matching any of `words`, preferring the longest one at each position."""
+    trie: dict = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = True  # end-of-word marker
+
+    def build(node: dict) -> str:
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if "" in node:
+            # A word ends here but longer ones continue: greedy optional keeps the longest
+            body = "(?:" + body + ")?"
+        return body
+
+    return build(trie)
+
+
+class MultiMatcher:
+    """
+    Literal patterns + optional regexes compiled into one matcher.
+
+    Tags are the literal strings themselves and the regex names (or sources when
+    regexes are given as a plain list). Regexes must not use global inline flags
+    like (?i); scoped ones like (?i:fatal) are fine.
+    """
+
+    def __init__(self, literals: Iterable[str] = (), regexes: Mapping[str, str] | Iterable[str] = ()):
+        self.literals = tuple(dict.fromkeys(lit for lit in literals if lit))
+        if not isinstance(regexes, Mapping):
+            regexes = {source: source for source in regexes}
+        self.regex_names = tuple(regexes)
+        if not self.literals and not self.regex_names:
+            raise ValueError("MultiMatcher needs at least one literal or regex")
+
+        # str and bytes flavours share the same tag order
+        self._str = _CompiledSet(self.literals, list(regexes.values()), to_pattern=lambda s: s)
+        # bytes patterns: build over latin-1 so every byte of the UTF-8 encoding is one "character"
+        self._bytes = _CompiledSet(
+            [lit.encode("utf-8").decode("latin-1") for lit in self.literals],
+            [source.encode("utf-8").decode("latin-1") for source in regexes.values()],
+            to_pattern=lambda s: s.encode("latin-1"),
+        )
+        self.tags = self.literals + self.regex_names
+
+    def match(self, line: str) -> tuple[str, ...]:
+        """Tags of every pattern found in `line`, in declaration order; () for no match."""
+        return self._tags(self._str.hit_ids(line))
+
+    def match_bytes(self, line: bytes) -> tuple[str, ...]:
+        return self._tags(self._bytes.hit_ids(line))
+
+    def iter_buffer_matches(self, buf, start: int = 0, end: int | None = None) -> Iterator[tuple[int, int, tuple[str, ...]]]:
+        """
+        One pass over a raw buffer (bytes, mmap, ...): yield (line_start, line_end, tags)
+        for every line containing at least one pattern. line_end includes the newline.
+        """
+        if end is None:
+            end = len(buf)
+        search = self._bytes.any.search
+        pos = start
+        while (hit := search(buf, pos, end)) is not None:
+            line_start = buf.rfind(b"\n", start, hit.start()) + 1 or start
+            newline = buf.find(b"\n", hit.start(), end)
+            line_end = end if newline < 0 else newline + 1
+            yield line_start, line_end, self.match_bytes(bytes(buf[line_start:line_end]))
+            pos = line_end
+
+    def _tags(self, ids: set[int]) -> tuple[str, ...]:
+        return tuple(self.tags[i] for i in sorted(ids))
+
+
+class _CompiledSet:
+    """Compiled regexes for one flavour (str or bytes) of a MultiMatcher."""
+
+    def __init__(self, literals: list[str], regexes: list[str], to_pattern):
+        n_literals = len(literals)
+        trie = _trie_regex(literals) if literals else ""
+
+        # Prefilter: rejects non-matching lines in one search
+        alternatives = ([trie] if trie else []) + [f"(?:{source})" for source in regexes]
+        self.any = re.compile(to_pattern("|".join(alternatives)))
+
+        # Lookahead makes finditer report a hit at every position, so overlapping literals are found
+        self.scan = re.compile(to_pattern(f"(?=({trie}))")) if trie else None
+        # longest literal -> ids of every literal that is a prefix of it (including itself)
+        self.prefix_ids = {
+            to_pattern(lit): {i for i, other in enumerate(literals) if lit.startswith(other)}
+            for lit in literals
+        }
+        self.regexes = [(n_literals + i, re.compile(to_pattern(source))) for i, source in enumerate(regexes)]
+
+    def hit_ids(self, line) -> set[int]:
+        if self.any.search(line) is None:
+            return set()
+        ids: set[int] = set()
+        if self.scan is not None:
+            for m in self.scan.finditer(line):
+                ids |= self.prefix_ids[m.group(1)]
+        for i, regex in self.regexes:
+            if regex.search(line) is not None:
+                ids.add(i)
+        return ids
+
+
+# ----------------------------------------------------------------------
+# Pipeline stages
+# ----------------------------------------------------------------------
+def iter_tagged_lines(lines: Iterable[str], matcher: MultiMatcher) -> Iterator[tuple[str, tuple[str, ...]]]:
+    """Pull stage: like iter_error_lines(), but for every pattern at once; yields (line, tags)."""
+    match = matcher.match
+    for line in lines:
+        tags = match(line)
+        if tags:
+            yield line, tags
+
+
+def filter_patterns(matcher: MultiMatcher, target):
+    """Push stage: like filter_error(target), but sends (line, tags) for every matching line"""
+    match = matcher.match
+    try:
+        while True:
+            line = yield
+            tags = match(line)
+            if tags:
+                target.send((line, tags))
+    except GeneratorExit:
+        target.close()              # zinciri kapat
+        return
+
+
+# ----------------------------------------------------------------------
+# Benchmark: one pass per pattern vs. one MultiMatcher pass
+# ----------------------------------------------------------------------
+def _bench_lines(count: int, seed: int = 0) -> list[str]:
+    import random
+    from datetime import date
+
+    from .synthetic_logs import make_line
+
+    rng = random.Random(seed)
+    return [make_line(rng, date(2026, 2, 10), i // 20, 0.005) for i in range(count)]
+
+
+def bench(line_count: int) -> None:
+    import random
+
+    lines = _bench_lines(line_count)
+    base = ["ERROR", "FATAL", "Traceback"]
+    rng = random.Random(1)
+
+    print(f"{line_count:,} lines")
+    print(f"{'patterns':>9}{'naive s':>10}{'matcher s':>11}{'matcher ns/line':>17}{'hits':>9}")
+    for n in (1, 4, 16, 64, 256):
+        customers = [f"customer=C{c:04d}" for c in rng.sample(range(10000), max(0, n - len(base)))]
+        patterns = (base + customers)[:n]
+        matcher = MultiMatcher(patterns)
+
+        start = time.perf_counter()
+        naive_hits = sum(1 for line in lines if any(p in line for p in patterns))
+        naive = time.perf_counter() - start
+
+        start = time.perf_counter()
+        hits = sum(1 for _ in iter_tagged_lines(lines, matcher))
+        elapsed = time.perf_counter() - start
+
+        assert hits == naive_hits, (hits, naive_hits)
+        print(f"{n:>9}{naive:>10.3f}{elapsed:>11.3f}{elapsed / line_count * 1e9:>17,.0f}{hits:>9,}")
+
+
+def demo() -> None:
+    from .push_based_pipeline import sink_print, source_push
+
+    matcher = MultiMatcher(["ERROR", "FATAL", "customer=C0042"], {"traceback": r"Traceback \(most recent"})
+    lines = [
+        "INFO ok customer=C0042",
+        "ERROR boom",
+        "INFO ok2",
+        "ERROR FATAL disk quota customer=C0042",
+        "Traceback (most recent call last):",
+    ]
+
+    print("pull:")
+    for line, tags in iter_tagged_lines(lines, matcher):
+        print("  ", tags, line)
+
+    print("push:")
+    out = sink_print()
+    next(out)
+    flt = filter_patterns(matcher, out)
+    next(flt)
+    source_push(lines, flt)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--bench", action="store_true")
+    parser.add_argument("--lines", type=int, default=200_000)
+    args = parser.parse_args()
+
+    if args.bench:
+        bench(args.lines)
+    else:
+        demo()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""
+Scan vs. constructive palindrome engines
+
+- scan_palindromes()      -> tests every integer with is_palindrome()
+- infinite_palindromes()  -> builds each palindrome by mirroring its left half
+
+Three measurements:
+1) Throughput: how long it takes to pull the first N palindromes.
+   The scan engine gets a time budget because it can not reach N = 10^6
+   (the 10^6-th palindrome has 12 digits); the items it managed are reported.
+2) Jumps: cost of gen.send(X) for X around 10^12, 10^15 and 10^18.
+   Exactly 10^k is the easy case for scanning (10^k + 1 is a palindrome),
+   so a "worst" target just above the previous palindrome is measured as well.
+3) Bulk range: every palindrome in [lo, hi) pulled one at a time through
+   infinite_palindromes() vs. iter_palindrome_chunks(), plus count_palindromes().
+
+Usage:
+    python -m py_dissection_lab.generators.palindrome_benchmark --count 1000000 --scan-budget 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import time
+
+from .palindrome_generator_all_demos import (
+    count_palindromes,
+    infinite_palindromes,
+    iter_palindrome_chunks,
+    is_palindrome,
+    scan_palindromes,
+)
+
+
+@contextlib.contextmanager
+def _quiet():
+    # Both engines print a cleanup line in their finally block; keep the table readable.
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+def bench_first_n(factory, count: int, budget: float) -> tuple[int, float]:
+    """Pull up to `count` palindromes, stopping early once `budget` seconds are spent."""
+    gen = factory()
+    produced = 0
+    start = time.perf_counter()
+    deadline = start + budget
+    with _quiet():
+        # Check the clock every 1024 items so timing does not dominate the loop
+        while produced < count:
+            step = min(1024, count - produced)
+            for _ in range(step):
+                next(gen)
+            produced += step
+            if time.perf_counter() > deadline:
+                break
+        elapsed = time.perf_counter() - start
+        gen.close()
+    return produced, elapsed
+
+
+def bench_jump(factory, target: int, budget: float) -> tuple[int | None, float]:
+    """
+    Time a single gen.send(target).
+
+    The scan engine is driven manually (it would block forever on a bad target), so
+    a budget overrun is reported as (None, elapsed).
+    """
+    gen = factory()
+    with _quiet():
+        next(gen)
+        start = time.perf_counter()
+        if factory is scan_palindromes:
+            result = _bounded_scan_jump(target, budget)
+        else:
+            result = gen.send(target)
+        elapsed = time.perf_counter() - start
+        gen.close()
+    return result, elapsed
+
+
+def _bounded_scan_jump(target: int, budget: float) -> int | None:
+    # Same loop as scan_palindromes() after send(target), but with a deadline
+    num = target + 1
+    deadline = time.perf_counter() + budget
+    while True:
+        for _ in range(4096):
+            if is_palindrome(num):
+                return num
+            num += 1
+        if time.perf_counter() > deadline:
+            return None
+
+
+def _worst_target(power: int) -> int:
+    # 10^k + 1 is a palindrome; the next one is 10^k + 10^(k//2) (+10^(k//2 - 1)..)
+    # so jumping right after 10^k + 1 forces the longest gap in that decade.
+    return 10 ** power + 1
+
+
+def bench_range(lo: int, hi: int, chunk_size: int) -> None:
+    """Compare per-item generator consumption with the chunked range API over [lo, hi)."""
+    with _quiet():
+        start = time.perf_counter()
+        gen = infinite_palindromes()
+        next(gen)
+        total = 0
+        p = gen.send(lo - 1)
+        while p < hi:
+            total += 1
+            p = next(gen)
+        gen.close()
+        generator_elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    chunked_total = sum(len(chunk) for chunk in iter_palindrome_chunks(lo, hi, chunk_size))
+    chunked_elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    counted = count_palindromes(lo, hi)
+    count_elapsed = time.perf_counter() - start
+
+    assert total == chunked_total == counted
+    print(f"{'generator':<20}{total:>12,}{generator_elapsed:>12.3f}")
+    print(f"{f'chunks({chunk_size})':<20}{chunked_total:>12,}{chunked_elapsed:>12.3f}")
+    print(f"{'count_palindromes':<20}{counted:>12,}{count_elapsed:>12.6f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=1_000_000)
+    parser.add_argument("--chunk-size", type=int, default=65536)
+    parser.add_argument("--scan-budget", type=float, default=5.0, help="seconds allowed per scan measurement")
+    args = parser.parse_args()
+
+    engines = {"scan": scan_palindromes, "constructive": infinite_palindromes}
+
+    print(f"First {args.count:,} palindromes")
+    print(f"{'engine':<14}{'items':>12}{'seconds':>12}{'items/s':>16}")
+    for name, factory in engines.items():
+        produced, elapsed = bench_first_n(factory, args.count, args.scan_budget)
+        note = "" if produced == args.count else "  (budget hit)"
+        print(f"{name:<14}{produced:>12,}{elapsed:>12.3f}{produced / elapsed:>16,.0f}{note}")
+
+    print("\nsend(jump)")
+    print(f"{'engine':<14}{'target':>24}{'result':>24}{'microseconds':>16}")
+    for power in (12, 15, 18):
+        for target in (10 ** power, _worst_target(power)):
+            for name, factory in engines.items():
+                result, elapsed = bench_jump(factory, target, args.scan_budget)
+                shown = "budget hit" if result is None else str(result)
+                print(f"{name:<14}{target:>24}{shown:>24}{elapsed * 1e6:>16,.1f}")
+
+    lo, hi = 10 ** 12, 10 ** 13
+    print(f"\nAll palindromes in [{lo:,}, {hi:,})")
+    print(f"{'method':<20}{'items':>12}{'seconds':>12}")
+    bench_range(lo, hi, args.chunk_size)
+
+
+if __name__ == "__main__":
+    main()
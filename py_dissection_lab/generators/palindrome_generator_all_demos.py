@@ -0,0 +1,405 @@
+"""
+Palindrome generator demo pack (yield / next / send / close / throw)
+"""
+
+from __future__ import annotations
+
+from array import array
+from typing import Iterator
+
+from .._lazy import optional_module
+
+# optional, imported on first use: the range API falls back to array('Q')
+np = optional_module("numpy")
+
+
+def is_palindrome(num: int) -> bool:
+    """
+    Arithmetic palindrome check, single-digit numbers are not considered.
+    """
+    if num < 10:
+        return False
+
+    original = num
+    reversed_num = 0
+
+    while num > 0:
+        digit = num % 10
+        reversed_num = reversed_num * 10 + digit
+        num //= 10
+
+    return original == reversed_num
+
+
+def _half_len(digits: int) -> int:
+    """Number of leading digits that fully determine a palindrome of `digits` digits."""
+    return (digits + 1) // 2
+
+
+def mirror_half(half: int, digits: int) -> int:
+    """
+    Build the palindrome of `digits` digits whose left half is `half`.
+
+    Even length: 12 -> 1221
+    Odd length:  123 -> 12321 (the middle digit is not repeated)
+    """
+    s = str(half)
+    if digits % 2:
+        return int(s + s[-2::-1])
+    return int(s + s[::-1])
+
+
+def seek_palindrome(target: int) -> tuple[int, int]:
+    """
+    Return the (digits, half) state of the first palindrome >= target in O(digits).
+
+    Single-digit numbers are not palindromes here (see is_palindrome()), so every
+    target below 11 resolves to 11.
+    """
+    if target <= 11:
+        return 2, 1
+
+    s = str(target)
+    digits = len(s)
+    half = int(s[:_half_len(digits)])
+
+    # The mirrored prefix is either already >= target, or the next prefix is.
+    if mirror_half(half, digits) < target:
+        half += 1
+        if half == 10 ** _half_len(digits):
+            # 99..9 overflowed: the answer is the smallest palindrome one digit longer
+            digits += 1
+            half = 10 ** (_half_len(digits) - 1)
+
+    return digits, half
+
+
+def scan_palindromes():
+    """
+    Reference palindrome generator: tests every integer with is_palindrome().
+
+    Cost grows with the gap between palindromes (~10^(d/2) divisions per item for
+    d-digit numbers), so it is only kept for teaching and benchmarking.
+    Supports the same send(jump) protocol as infinite_palindromes().
+    """
+
+    num = 0
+
+    try:
+        while True:
+            if is_palindrome(num):
+                # Parantheses are not required; they are used to emphasize that
+                # 'yield num' is an expression whose result is assigned to 'jump'
+                jump = (yield num)
+
+                # 'jump' is not "num"; it's whatever the caller sent via .send()
+                # - next() / for => jump becomes None
+                # - send(1000) => jump becomes 1000
+                if jump is not None:
+                    # Jump the search: continue scanning from the provided value
+                    num = jump
+
+            # Normal progression (or after a jump): move forward
+            num += 1
+
+    finally:
+        # Runs on close(), or if generator exits due to an exception.
+        print("[cleanup] scan_palindromes is closing (finally block executed).")
+
+
+def infinite_palindromes():
+    """
+    Infinite palindrom generator.
+
+    Key line: jump = (yield num)
+    This line does two things:
+    1) yield num -> outputs a palindrome to the caller and pauses here.
+    2) When resumed:
+        - if resumed by next(gen) / for-loop -> (yield num) evaluates to None
+        - if resumed by gen.send(X)          -> (yield num) evaluates to X
+
+    Therefore jump can be None or and int.
+    If jump is an int, we jump the internal search state to that number which is X in this case.
+
+    Instead of testing every integer (see scan_palindromes()), palindromes are
+    built from their left half: the state is (digits, half) and each step just
+    increments `half` and mirrors it, so every item costs O(digits).
+    A jump keeps the scan semantics: the next value is the first palindrome > X.
+    """
+
+    digits, half = 2, 1
+
+    try:
+        while True:
+            num = mirror_half(half, digits)
+            jump = (yield num)
+
+            if jump is not None:
+                # Resolve the jump in O(digits) instead of scanning towards it
+                digits, half = seek_palindrome(jump + 1)
+                continue
+
+            # Normal progression: next prefix, or first prefix of the next length
+            half += 1
+            if half == 10 ** _half_len(digits):
+                digits += 1
+                half = 10 ** (_half_len(digits) - 1)
+
+    finally:
+        # Runs on close(), or if generator exits due to an exception.
+        print("[cleanup] infinite_palindromes is closing (finally block executed).")
+
+# ----------------------------------------------------------------------
+# RANGE API: bulk / closed-form access without driving the generator
+# ----------------------------------------------------------------------
+# array('Q') holds unsigned 64-bit values, so the range API stops at 2^64.
+MAX_RANGE_VALUE = 2 ** 64
+
+
+def _palindromes_shorter_than(digits: int) -> int:
+    """How many palindromes have fewer than `digits` digits (2-digit ones are the first)."""
+    return sum(9 * 10 ** (_half_len(d) - 1) for d in range(2, digits))
+
+
+def _count_below(n: int) -> int:
+    """Number of palindromes p with p < n, in O(digits)."""
+    digits, half = seek_palindrome(n)
+    # The first palindrome >= n is preceded by every shorter palindrome plus
+    # the prefixes of its own length that come before `half`.
+    return _palindromes_shorter_than(digits) + half - 10 ** (_half_len(digits) - 1)
+
+
+def count_palindromes(lo: int, hi: int) -> int:
+    """
+    Count palindromes in [lo, hi) without generating them.
+
+    count_palindromes(0, 100) -> 9   (11, 22, ..., 99)
+    """
+    if hi <= lo:
+        return 0
+    return _count_below(hi) - _count_below(lo)
+
+
+def nth_palindrome(k: int) -> int:
+    """
+    Return the k-th palindrome (1-based, same order as infinite_palindromes()).
+
+    nth_palindrome(1) -> 11, nth_palindrome(10) -> 101
+    """
+    if k < 1:
+        raise ValueError(f"k must be >= 1, got {k}")
+
+    index = k - 1
+    digits = 2
+    # Skip whole digit lengths; there are 9 * 10^(half_len - 1) palindromes per length
+    while index >= (per_length := 9 * 10 ** (_half_len(digits) - 1)):
+        index -= per_length
+        digits += 1
+    return mirror_half(10 ** (_half_len(digits) - 1) + index, digits)
+
+
+def _mirror_block(first_half: int, stop_half: int, digits: int, use_numpy: bool):
+    """Mirror every prefix in [first_half, stop_half) into a palindrome of `digits` digits."""
+    if use_numpy:
+        halves = np.arange(first_half, stop_half, dtype=np.uint64)
+        # Odd lengths do not repeat the middle digit, so drop it before reversing
+        rest = halves // 10 if digits % 2 else halves.copy()
+        reversed_rest = np.zeros_like(halves)
+        for _ in range(digits // 2):
+            reversed_rest = reversed_rest * 10 + rest % 10
+            rest //= 10
+        return halves * np.uint64(10 ** (digits // 2)) + reversed_rest
+
+    if digits % 2:
+        return array("Q", [int(s + s[-2::-1]) for s in map(str, range(first_half, stop_half))])
+    return array("Q", [int(s + s[::-1]) for s in map(str, range(first_half, stop_half))])
+
+
+def iter_palindrome_chunks(
+    lo: int,
+    hi: int,
+    chunk_size: int = 65536,
+    use_numpy: bool | None = None,
+) -> Iterator:
+    """
+    Yield every palindrome in [lo, hi) in ascending order, `chunk_size` at a time.
+
+    Each chunk is an array('Q') (or a uint64 NumPy array when NumPy is installed and
+    use_numpy is not False), so bulk consumers pay one generator resume per chunk
+    instead of one per palindrome, and memory stays bounded by `chunk_size`.
+    """
+    if chunk_size < 1:
+        raise ValueError(f"chunk_size must be >= 1, got {chunk_size}")
+    if hi > MAX_RANGE_VALUE:
+        raise ValueError(f"hi must be <= 2**64 for 64-bit chunks, got {hi}")
+    if use_numpy is None:
+        use_numpy = np is not None
+    elif use_numpy and np is None:
+        raise ImportError("use_numpy=True requires NumPy")
+    if hi <= lo:
+        return
+
+    digits, half = seek_palindrome(lo)
+    stop_digits, stop_half = seek_palindrome(hi)
+
+    pending = []
+    pending_len = 0
+    while (digits, half) < (stop_digits, stop_half):
+        # Prefixes left in this digit length, cut at the range end and at the chunk size
+        end_half = stop_half if digits == stop_digits else 10 ** _half_len(digits)
+        end_half = min(end_half, half + chunk_size - pending_len)
+
+        pending.append(_mirror_block(half, end_half, digits, use_numpy))
+        pending_len += end_half - half
+
+        half = end_half
+        if half == 10 ** _half_len(digits):
+            digits += 1
+            half = 10 ** (_half_len(digits) - 1)
+
+        if pending_len == chunk_size:
+            yield _join_chunk(pending, use_numpy)
+            pending, pending_len = [], 0
+
+    if pending_len:
+        yield _join_chunk(pending, use_numpy)
+
+
+def _join_chunk(parts: list, use_numpy: bool):
+    # A chunk spans at most a few digit lengths, so this is a handful of copies
+    if len(parts) == 1:
+        return parts[0]
+    if use_numpy:
+        return np.concatenate(parts)
+    joined = array("Q")
+    for part in parts:
+        joined.extend(part)
+    return joined
+
+
+# ----------------------------------------------------------------------
+# DEMO A: next() causes the yield-expression result to become None
+# ----------------------------------------------------------------------
+def demo_next_makes_jump_none():
+    print("\n=== DEMO A: next() resumes -> yield-expression result becomes None ===")
+
+    gen = infinite_palindromes()
+
+    # First palindrome: generator runs until it hits the first 'yield num'
+    p1 = next(gen)
+    print("next(gen) ->", p1)
+
+    # next(gen) resumes the generator WITHOUT sending a value.
+    # Therefore inside the generator: jump = (yield num) becomes jump = None.
+    p2 = next(gen)
+    print("next(gen) ->", p2)
+
+    # Cleanup
+    gen.close()
+
+
+# ----------------------------------------------------------------------
+# DEMO B: send() jump (the "correct" usage pattern)
+# ----------------------------------------------------------------------
+def demo_send_jump_correct():
+    print("\n=== DEMO B: send() can 'jump' the internal search state (correct pattern) ===")
+
+    gen = infinite_palindromes()
+
+    # When generator didn't start, you can not give it a value via send(). Thus, you must start it first via next()
+    p = next(gen)
+    print("First palindrome via next(gen) ->", p)
+
+    # send(X) does two things:
+    # 1) resumes the generator and injects X as the result of (yield num)
+    # 2) returns the NEXT yielded palindrome after the generator continues running
+    jump_to = 100
+    p = gen.send(jump_to)
+    print(f"gen.send({jump_to}) ->", p)
+
+    jump_to = 1000
+    p = gen.send(jump_to)
+    print(f"gen.send({jump_to}) ->", p)
+
+    # Demonstrate that send(None) behaves like next(gen) in terms of injection
+    p = gen.send(None)
+    print("gen.send(None) ->", p)
+
+    gen.close()
+
+
+# ----------------------------------------------------------------------
+# DEMO C: for + send can "skip" values if you ignore send() return
+# ----------------------------------------------------------------------
+def demo_for_plus_send_can_skip():
+    print("\n=== DEMO C: mixing for-loop + send() can skip outputs if send() return is ignored ===")
+
+    gen = infinite_palindromes()
+
+    # for-loop calls next(gen) each iteration.
+    # If inside the loop you ALSO call gen.send(...), that advances the generator again.
+    # If you don't capture the return value of send(), you effectively "skip" a palindrome.
+    for idx, p in enumerate(gen, start=1):
+        print(f"[for] {idx}. palindrome:", p)
+
+        digits = len(str(p))
+        jump_to = 10 ** digits
+
+        # send() returns the next yielded palindrome.
+        # If you ignore this return, you won't see this palindrome printed anywhere.
+        returned_by_send = gen.send(jump_to)
+        print(f"    [send({jump_to}) returned] {returned_by_send}")
+
+        if idx >= 3:
+            gen.close()
+            break
+
+    print("Note: If you use for + send, ALWAYS handle the return of send().")
+
+
+# ----------------------------------------------------------------------
+# DEMO D: throw() and close() behavior (separate from the combined demo)
+# ----------------------------------------------------------------------
+def demo_throw_and_close():
+    print("\n=== DEMO D: throw() and close() behavior ===")
+
+    gen = infinite_palindromes()
+
+    try:
+        p = next(gen)
+        print("next(gen) ->", p)
+
+        # throw() injects an exception at the paused yield point
+        print("Injecting ValueError into generator with throw() ...")
+        gen.throw(ValueError("Stop here via throw()"))
+
+    except ValueError as e:
+        print("Caught outside:", repr(e))
+
+    # Generator may already be terminated; create a fresh one
+    gen2 = infinite_palindromes()
+    print("next(gen2) ->", next(gen2))
+
+    print("Now closing gen2 via close() ...")
+    gen2.close()
+
+    # After close, next/send raises StopIteration
+    try:
+        next(gen2)
+    except StopIteration:
+        print("After close(): next(gen2) -> StopIteration (expected)")
+
+    try:
+        gen2.send(1000)
+    except StopIteration:
+        print("After close(): gen2.send(1000) -> StopIteration (expected)")
+
+
+
+def main():
+    # Run all demos in a sensible order:
+    demo_send_jump_correct()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,290 @@
+"""
+Multi-core palindrome search
+
+The palindrome space is cut into disjoint, contiguous shards of `shard_size`
+palindromes each (shard boundaries come from nth_palindrome(), so every shard
+costs the same). Shards run in an executor and the generator hands results back
+in global ascending order:
+
+- a process pool on the regular (GIL) build
+- a thread pool on free-threaded builds, where threads really run in parallel
+
+Because shards are disjoint ascending ranges, the k-way merge of their sorted
+outputs reduces to popping futures in submission order. Only `max_in_flight`
+shards are submitted at a time, which bounds both memory and wasted work.
+
+The generator keeps the send(jump) protocol of infinite_palindromes():
+gen.send(X) returns the first matching palindrome > X. Shards that end below
+the new floor are cancelled (or dropped if already running), and a jump outside
+the in-flight window re-plans shards from the new floor.
+
+Usage:
+    python -m py_dissection_lab.generators.palindrome_sharded --lo 100000000000 --hi 10000000000000 --predicate prime
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Iterator
+
+from .palindrome_generator_all_demos import (
+    MAX_RANGE_VALUE,
+    count_palindromes,
+    iter_palindrome_chunks,
+    nth_palindrome,
+)
+
+
+@dataclass
+class ShardStats:
+    """Throughput of one finished shard."""
+
+    index: int
+    lo: int
+    hi: int
+    scanned: int
+    matched: int
+    seconds: float
+    worker: str
+
+    @property
+    def items_per_sec(self) -> float:
+        return self.scanned / self.seconds if self.seconds else float("inf")
+
+
+@dataclass
+class _ShardResult:
+    stats: ShardStats
+    values: array
+
+
+def free_threaded() -> bool:
+    """True when running on a free-threaded build with the GIL actually disabled."""
+    is_gil_enabled = getattr(sys, "_is_gil_enabled", None)
+    return is_gil_enabled is not None and not is_gil_enabled()
+
+
+def make_executor(workers: int, kind: str = "auto") -> Executor:
+    """
+    Build the executor used for shards.
+
+    kind="auto" picks threads on free-threaded builds and processes otherwise.
+    """
+    if kind == "auto":
+        kind = "thread" if free_threaded() else "process"
+    if kind == "thread":
+        return ThreadPoolExecutor(max_workers=workers)
+    if kind == "process":
+        return ProcessPoolExecutor(max_workers=workers)
+    raise ValueError(f"unknown executor kind: {kind!r}")
+
+
+def _search_shard(index: int, lo: int, hi: int, predicate: Callable[[int], bool] | None) -> _ShardResult:
+    """Worker: every palindrome in [lo, hi), optionally filtered by `predicate`."""
+    start = time.perf_counter()
+    values = array("Q")
+    scanned = 0
+    for chunk in iter_palindrome_chunks(lo, hi, use_numpy=False):
+        scanned += len(chunk)
+        if predicate is None:
+            values.extend(chunk)
+        else:
+            values.extend(v for v in chunk if predicate(v))
+    elapsed = time.perf_counter() - start
+    worker = f"pid {os.getpid()}/{threading.current_thread().name}"
+    return _ShardResult(ShardStats(index, lo, hi, scanned, len(values), elapsed, worker), values)
+
+
+def sharded_palindromes(
+    lo: int = 0,
+    hi: int | None = None,
+    *,
+    workers: int | None = None,
+    shard_size: int = 1 << 16,
+    max_in_flight: int | None = None,
+    predicate: Callable[[int], bool] | None = None,
+    executor: Executor | None = None,
+    stats: list[ShardStats] | None = None,
+) -> Iterator[int]:
+    """
+    Yield palindromes in [lo, hi) in ascending order, searched in parallel shards.
+
+    - predicate: optional filter run inside the workers (must be picklable for processes)
+    - executor: reuse an existing executor; otherwise one is created and shut down here
+    - stats: if given, a ShardStats is appended for every shard that was consumed
+    """
+    if hi is None or hi > MAX_RANGE_VALUE:
+        hi = MAX_RANGE_VALUE
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = max_in_flight or 2 * workers
+
+    own_executor = executor is None
+    if own_executor:
+        executor = make_executor(workers)
+
+    # 1-based index (as in nth_palindrome) of the first palindrome of the next shard
+    next_index = count_palindromes(0, lo) + 1
+    shard_no = 0
+    window: deque = deque()  # (shard_lo, shard_hi, future), ascending
+    floor: int | None = None
+
+    try:
+        while True:
+            # Keep the window full: at most max_in_flight shards queued or running
+            while len(window) < max_in_flight:
+                shard_lo = nth_palindrome(next_index)
+                if shard_lo >= hi:
+                    break
+                shard_hi = min(nth_palindrome(next_index + shard_size), hi)
+                future = executor.submit(_search_shard, shard_no, shard_lo, shard_hi, predicate)
+                window.append((shard_lo, shard_hi, future))
+                next_index += shard_size
+                shard_no += 1
+
+            if not window:
+                return
+
+            shard_lo, shard_hi, future = window.popleft()
+            if floor is not None and shard_hi <= floor:
+                # Entirely below the floor set by a jump: nobody will read it
+                future.cancel()
+                continue
+
+            result = future.result()
+            if stats is not None:
+                stats.append(result.stats)
+
+            values = result.values
+            i = bisect_left(values, floor) if floor is not None else 0
+            floor = None
+
+            while i < len(values):
+                jump = (yield values[i])
+                if jump is None:
+                    i += 1
+                    continue
+
+                floor = jump + 1
+                if shard_lo <= floor < shard_hi:
+                    # Jump inside the shard we already hold
+                    i = bisect_left(values, floor)
+                    floor = None
+                    continue
+                break
+
+            if floor is None:
+                continue
+
+            planned_end = window[-1][1] if window else shard_hi
+            if shard_hi <= floor < planned_end:
+                # Forward jump inside the window: the loop above drops shards below floor
+                continue
+
+            # Backward jump, or past everything in flight: start over from the floor
+            for _, _, pending in window:
+                pending.cancel()
+            window.clear()
+            next_index = count_palindromes(0, floor) + 1
+
+    finally:
+        for _, _, pending in window:
+            pending.cancel()
+        if own_executor:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+# ----------------------------------------------------------------------
+# Example predicate: palindromic primes
+# ----------------------------------------------------------------------
+_WITNESSES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37)
+
+
+def is_prime(n: int) -> bool:
+    """Deterministic Miller-Rabin for n < 3.3 * 10^24 (covers every 64-bit value)."""
+    if n < 2:
+        return False
+    for p in _WITNESSES:
+        if n % p == 0:
+            return n == p
+
+    d, r = n - 1, 0
+    while d % 2 == 0:
+        d //= 2
+        r += 1
+
+    for a in _WITNESSES:
+        x = pow(a, d, n)
+        if x in (1, n - 1):
+            continue
+        for _ in range(r - 1):
+            x = pow(x, 2, n)
+            if x == n - 1:
+                break
+        else:
+            return False
+    return True
+
+
+PREDICATES: dict[str, Callable[[int], bool] | None] = {"none": None, "prime": is_prime}
+
+
+def run_scaling(lo: int, hi: int, max_workers: int, shard_size: int, predicate, kind: str, verbose: bool) -> None:
+    """Run the same search at 1..max_workers workers and print speedup per worker count."""
+    counts = []
+    w = 1
+    while w < max_workers:
+        counts.append(w)
+        w *= 2
+    counts.append(max_workers)
+
+    print(f"{'workers':>8}{'matched':>12}{'seconds':>10}{'scanned/s':>14}{'speedup':>10}{'efficiency':>12}")
+    baseline = None
+    for workers in counts:
+        stats: list[ShardStats] = []
+        with make_executor(workers, kind) as executor:
+            start = time.perf_counter()
+            matched = sum(1 for _ in sharded_palindromes(
+                lo, hi, workers=workers, shard_size=shard_size,
+                predicate=predicate, executor=executor, stats=stats,
+            ))
+            elapsed = time.perf_counter() - start
+
+        scanned = sum(s.scanned for s in stats)
+        baseline = baseline or elapsed
+        speedup = baseline / elapsed
+        print(f"{workers:>8}{matched:>12,}{elapsed:>10.3f}{scanned / elapsed:>14,.0f}{speedup:>10.2f}{speedup / workers:>12.0%}")
+
+        if verbose:
+            for s in stats:
+                print(f"{'':>8}shard {s.index:<5} [{s.lo}, {s.hi}) {s.scanned:>9,} in {s.seconds:.3f}s "
+                      f"= {s.items_per_sec:>12,.0f}/s  ({s.worker})")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lo", type=int, default=10 ** 10)
+    parser.add_argument("--hi", type=int, default=10 ** 12)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--shard-size", type=int, default=1 << 16)
+    parser.add_argument("--predicate", choices=sorted(PREDICATES), default="prime")
+    parser.add_argument("--executor", choices=("auto", "process", "thread"), default="auto")
+    parser.add_argument("--verbose", action="store_true", help="print per-shard throughput")
+    args = parser.parse_args()
+
+    print(f"range [{args.lo:,}, {args.hi:,}), predicate={args.predicate}, "
+          f"executor={args.executor}, free-threaded={free_threaded()}")
+    run_scaling(args.lo, args.hi, args.workers, args.shard_size,
+                PREDICATES[args.predicate], args.executor, args.verbose)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+"""
+Parallel ERROR scan over many daily log files
+
+yield_from.py reads app-YYYY-MM-DD.log files one after another on a single core:
+
+    iter_error_lines(iter_all_log_lines(log_dir))
+
+Here the same question is answered by a process pool:
+- every file becomes one or more segments; large files are cut at byte offsets
+  that are moved forward to the next line start, so no line is split
+- workers mmap their segment, search it with bytes.find() (see mmap_log_search.py)
+  and only decode matching lines
+- matches stream back segment by segment while the next segments are still running
+
+ordered=True keeps the sequential order (file by file, line by line) with a reorder
+buffer: finished segments wait until every earlier segment has been yielded.
+ordered=False yields each segment as soon as it is done.
+
+workers=1 falls back to the sequential generators from yield_from.py.
+
+Usage:
+    python -m py_dissection_lab.generators.parallel_log_scan logs --workers 4
+    python -m py_dissection_lab.generators.parallel_log_scan /tmp/bench-logs --generate 8 --mb 128 --bench
+"""
+
+from __future__ import annotations
+
+import argparse
+import mmap
+import os
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator
+
+from .mmap_log_search import iter_matching_spans
+from .yield_from import iter_all_log_lines, iter_error_lines, iter_lines, iter_log_files
+
+# Files bigger than this are split into several segments
+DEFAULT_SPLIT_BYTES = 64 * 1024 * 1024
+
+
+@dataclass(frozen=True)
+class Segment:
+    """A newline-aligned byte range [start, end) of one log file."""
+
+    seq: int  # global position in sequential (file, offset) order
+    path: Path
+    start: int
+    end: int
+
+
+def _next_line_start(f, offset: int) -> int:
+    """Smallest line-start offset >= offset (a line starts right after a newline)."""
+    if offset == 0:
+        return 0
+    f.seek(offset - 1)
+    f.readline()  # if byte offset-1 is a newline this reads just that byte
+    return f.tell()
+
+
+def plan_segments(paths: list[Path], split_bytes: int = DEFAULT_SPLIT_BYTES) -> list[Segment]:
+    """Cut every file into newline-aligned segments of about `split_bytes` bytes."""
+    segments = []
+    for path in paths:
+        size = path.stat().st_size
+        if size == 0:
+            continue
+        with open(path, "rb") as f:
+            starts = sorted({_next_line_start(f, cut) for cut in range(0, size, split_bytes)})
+        bounds = [s for s in starts if s < size] + [size]
+        for start, end in zip(bounds, bounds[1:]):
+            segments.append(Segment(len(segments), path, start, end))
+    return segments
+
+
+def scan_segment(segment: Segment, needle: bytes, encoding: str = "utf-8") -> list[str]:
+    """Worker: lines of the segment containing `needle`, decoded like iter_lines() does."""
+    with open(segment.path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        # Search the raw mapping; only matching lines are sliced and decoded
+        return [
+            mm[line_start:line_end].decode(encoding, errors="replace")
+            for line_start, line_end in iter_matching_spans(mm, needle, segment.start, segment.end)
+        ]
+
+
+def iter_error_lines_parallel(
+    log_dir: Path,
+    needle: str = "ERROR",
+    *,
+    workers: int | None = None,
+    ordered: bool = True,
+    split_bytes: int = DEFAULT_SPLIT_BYTES,
+    pattern: str = "*.log",
+    encoding: str = "utf-8",
+    max_in_flight: int | None = None,
+    executor: Executor | None = None,
+) -> Iterator[str]:
+    """
+    Yield lines containing `needle` from every log file in log_dir, scanned in parallel.
+
+    At most `max_in_flight` segments (default 2 * workers) are submitted or waiting in
+    the reorder buffer at once, so memory is bounded by that many segments' worth of
+    matches.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 and executor is None:
+        # Sequential fallback: the plain generator pipeline from yield_from.py
+        lines = (line for path in iter_log_files(log_dir, pattern) for line in iter_lines(path, encoding))
+        if needle == "ERROR":
+            yield from iter_error_lines(lines)
+        else:
+            yield from (line for line in lines if needle in line)
+        return
+
+    segments = deque(plan_segments(list(iter_log_files(log_dir, pattern)), split_bytes))
+    needle_bytes = needle.encode(encoding)
+    max_in_flight = max_in_flight or 2 * workers
+
+    own_executor = executor is None
+    if own_executor:
+        executor = ProcessPoolExecutor(max_workers=workers)
+
+    in_flight: dict[Future, int] = {}
+    done_buffer: dict[int, list[str]] = {}  # reorder buffer: seq -> matches
+    next_seq = 0
+
+    try:
+        while segments or in_flight:
+            # Finished-but-unflushed segments count too: they hold their matches in memory.
+            # next_seq is always in one of the two, so in_flight is never empty here while
+            # the window is full.
+            while segments and len(in_flight) + len(done_buffer) < max_in_flight:
+                segment = segments.popleft()
+                in_flight[executor.submit(scan_segment, segment, needle_bytes, encoding)] = segment.seq
+
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                seq = in_flight.pop(future)
+                if ordered:
+                    done_buffer[seq] = future.result()
+                else:
+                    yield from future.result()
+
+            # Flush every segment whose predecessors have all been yielded
+            while next_seq in done_buffer:
+                yield from done_buffer.pop(next_seq)
+                next_seq += 1
+    finally:
+        for future in in_flight:
+            future.cancel()
+        if own_executor:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+# ----------------------------------------------------------------------
+# Benchmark: sequential generators vs. process pool at 1..N workers
+# ----------------------------------------------------------------------
+def bench(log_dir: Path, max_workers: int, split_bytes: int) -> None:
+    total_bytes = sum(p.stat().st_size for p in iter_log_files(log_dir))
+    print(f"{total_bytes / 2**20:,.0f} MiB in {log_dir}")
+    print(f"{'mode':<22}{'matches':>10}{'seconds':>10}{'MiB/s':>10}{'speedup':>10}")
+
+    start = time.perf_counter()
+    sequential = sum(1 for _ in iter_error_lines(iter_all_log_lines(log_dir)))
+    baseline = time.perf_counter() - start
+    print(f"{'sequential':<22}{sequential:>10,}{baseline:>10.3f}{total_bytes / 2**20 / baseline:>10,.0f}{1:>10.2f}")
+
+    counts = sorted({1, *[w for w in (2, 4, 8, 16, 32, 64) if w < max_workers], max_workers})
+    for workers in counts:
+        for ordered in (True, False):
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                start = time.perf_counter()
+                found = sum(1 for _ in iter_error_lines_parallel(
+                    log_dir, workers=workers, ordered=ordered, split_bytes=split_bytes, executor=executor,
+                ))
+                elapsed = time.perf_counter() - start
+            assert found == sequential, (found, sequential)
+            mode = f"{workers} workers {'ordered' if ordered else 'unordered'}"
+            print(f"{mode:<22}{found:>10,}{elapsed:>10.3f}{total_bytes / 2**20 / elapsed:>10,.0f}"
+                  f"{baseline / elapsed:>10.2f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("log_dir", type=Path)
+    parser.add_argument("--needle", default="ERROR")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--unordered", action="store_true")
+    parser.add_argument("--split-mb", type=float, default=DEFAULT_SPLIT_BYTES / 2**20)
+    parser.add_argument("--bench", action="store_true", help="compare with the sequential pipeline instead of printing")
+    parser.add_argument("--generate", type=int, metavar="FILES", help="write synthetic logs into log_dir first")
+    parser.add_argument("--mb", type=float, default=64, help="size of each generated file in MiB")
+    args = parser.parse_args()
+
+    split_bytes = int(args.split_mb * 2**20)
+    if args.generate:
+        from .synthetic_logs import write_synthetic_logs
+
+        write_synthetic_logs(args.log_dir, args.generate, args.mb)
+
+    if args.bench:
+        bench(args.log_dir, args.workers, split_bytes)
+        return
+
+    for line in iter_error_lines_parallel(
+        args.log_dir, args.needle, workers=args.workers, ordered=not args.unordered, split_bytes=split_bytes,
+    ):
+        print(line, end="")
+
+
+if __name__ == "__main__":
+    main()
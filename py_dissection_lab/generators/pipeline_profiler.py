@@ -0,0 +1,497 @@
+"""
+Per-stage profiler for pull (generator) and push (coroutine) pipelines
+
+In `iter_error_lines(iter_all_log_lines(log_dir))` every next() runs a little of
+each generator frame in turn, so cProfile shows the time smeared over frames and
+builtins, not per stage. PipelineProfiler wraps stages instead and keeps, per
+stage name:
+
+- items in / items out and selectivity (out / in)
+- cumulative time (inside this stage, upstream/downstream stages included)
+- self time (cumulative minus the time spent in the wrapped stages it called)
+
+cum is summed bottom-up over the call stacks, so a stage's cum is never below
+the cum of the stages it called.
+- queue depth, for stages fed through a queue (track_queue)
+
+Nesting is tracked with a per-thread stack of active stages:
+- pull: the consumer calls next() on us -> what we return is an item *into* it
+- push: the producer calls send() on us -> what it sends is an item *out of* it
+
+Counting is exact. Times are corrected for the profiler's own cost, which is
+measured once per process (_calibrate). That cost is around a microsecond per
+item per stage in CPython, far more than a stage like iter_error_lines spends
+per line (~30 ns), and it moves by 10-15% from run to run. A self time smaller
+than that uncertainty (the `noise` column, summed over the stage's calls) is
+printed with a "~": the stage is too cheap for its time to be told apart from
+the profiler's. Such a self time (even a negative one) adds nothing to the
+cum of its callers, so the remaining stages still add up. sample_every=N times only every
+Nth outermost call, with everything nested in it, and scales the times up; item
+counts stay exact.
+
+Three ways to wrap:
+
+    prof = PipelineProfiler()
+    errors = prof.pull("errors", iter_error_lines(prof.pull("lines", iter_all_log_lines(d))))
+
+    out = prof.push("sink", sink_print()); next(out)
+    flt = prof.push("filter", filter_error(out)); next(flt)
+
+    with prof.patch(yield_from, "iter_log_files", "iter_lines", "iter_error_lines"):
+        for line in yield_from.iter_error_lines(yield_from.iter_all_log_lines(d)): ...
+
+When the profiler is disabled (enabled=False, or PIPELINE_PROFILE unset with
+enabled=None) pull()/push() return the stage object itself and patch() patches
+nothing, so a disabled profiler costs nothing per item.
+
+report() prints the table; write_folded(path) writes "a;b;c <microseconds>" lines
+of self time per stack, the input format of flamegraph.pl and speedscope.
+
+Usage:
+    python -m py_dissection_lab.generators.pipeline_profiler /tmp/logs
+    python -m py_dissection_lab.generators.pipeline_profiler /tmp/logs --bench
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import itertools
+import os
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Callable, Iterator
+
+_now = time.perf_counter_ns
+
+
+class StageStats:
+    """Counters for one stage name (all instances of that stage are summed)."""
+
+    __slots__ = ("name", "kind", "paths", "calls", "timed_calls", "items_in", "items_out", "timed_cum_ns",
+                 "timed_self_ns", "queue_max", "queue_sum", "queue_samples")
+
+    def __init__(self, name: str, kind: str):
+        self.name = name
+        self.kind = kind
+        self.paths: dict[str, str] = {}     # parent's folded path -> ours
+        self.calls = 0
+        self.timed_calls = 0            # calls that fell in a sampled tree
+        self.items_in = 0
+        self.items_out = 0
+        self.timed_cum_ns = 0
+        self.timed_self_ns = 0
+        self.queue_max = 0
+        self.queue_sum = 0
+        self.queue_samples = 0
+
+    @property
+    def scale(self) -> float:
+        return self.calls / self.timed_calls if self.timed_calls else 0.0
+
+    @property
+    def cum_ns(self) -> float:
+        """Measured total time inside this stage (timed calls scaled up to all calls), see PipelineProfiler.times()."""
+        return self.timed_cum_ns * self.scale
+
+    @property
+    def self_ns(self) -> float:
+        # Per-call corrections are left unclamped so the noise averages out; can be < 0 for tiny stages
+        return self.timed_self_ns * self.scale
+
+    @property
+    def selectivity(self) -> float | None:
+        return self.items_out / self.items_in if self.items_in else None
+
+    def __repr__(self) -> str:
+        return (f"StageStats({self.name!r}, in={self.items_in}, out={self.items_out}, "
+                f"cum={self.cum_ns / 1e9:.3f}s, self={self.self_ns / 1e9:.3f}s)")
+
+
+class _Frame:
+    __slots__ = ("stats", "path", "start", "child_ns", "child_overhead", "children")
+
+
+class _ThreadState:
+    __slots__ = ("frames", "depth")
+
+    def __init__(self):
+        self.frames: list[_Frame] = []
+        self.depth = 0
+
+
+class _Profiled:
+    """Proxy for one stage instance; counts and times __next__ / send / throw / close."""
+
+    __slots__ = ("_target", "_stats", "_prof", "_queue")
+
+    def __init__(self, target, stats: StageStats, prof: PipelineProfiler, queue: Callable[[], int] | None):
+        self._target = target
+        self._stats = stats
+        self._prof = prof
+        self._queue = queue
+
+    def __iter__(self):
+        return self
+
+    def _call(self, method, *args):
+        prof = self._prof
+        state = prof._thread_state()
+        stats = self._stats
+        if self._queue is not None:
+            depth = self._queue()
+            stats.queue_sum += depth
+            stats.queue_samples += 1
+            if depth > stats.queue_max:
+                stats.queue_max = depth
+        level = state.depth
+        frames = state.frames
+        if level:
+            parent = frames[level - 1]
+            timed = parent.path is not None
+        else:
+            # Sampling is decided per outermost call, so a timed call has timed children
+            parent = None
+            prof._roots += 1
+            timed = prof._roots % prof.sample_every == 0
+        if level == len(frames):
+            frames.append(_Frame())
+        # Frames are reused per depth: no allocation per call, so no GC pauses in the timings
+        frame = frames[level]
+        frame.stats = stats
+        frame.child_ns = frame.child_overhead = frame.children = 0
+        if timed:
+            parent_path = parent.path if parent else ""
+            path = stats.paths.get(parent_path)
+            if path is None:
+                path = stats.paths[parent_path] = f"{parent_path};{stats.name}" if parent else stats.name
+            frame.path = path
+        else:
+            frame.path = None
+        state.depth = level + 1
+        produced = False
+        frame.start = _now()
+        try:
+            result = method(*args)
+            produced = True
+            return result
+        finally:
+            end = _now()
+            state.depth = level
+            stats.calls += 1
+            if timed:
+                # Take the profiler's own cost out: `inner` ran inside this window,
+                # `hidden` inside it once for every timed child (see _calibrate).
+                # (child_ns is the children's raw time, so their own overhead is in it already)
+                raw = end - frame.start
+                overhead = prof._inner_ns + frame.children * prof._hidden_ns
+                own = raw - overhead - frame.child_ns
+                stats.timed_calls += 1
+                stats.timed_cum_ns += raw - overhead - frame.child_overhead
+                stats.timed_self_ns += own
+                prof._folded[frame.path] += own
+                prof._corrected[frame.path] += overhead
+                if parent is not None:
+                    parent.child_ns += raw
+                    parent.child_overhead += overhead + frame.child_overhead
+                    parent.children += 1
+            if stats.kind == "pull":
+                if produced:
+                    stats.items_out += 1
+                    if parent is not None:
+                        parent.stats.items_in += 1
+            elif args and args[0] is not None:     # push: a real send(), not priming
+                stats.items_in += 1
+                if parent is not None:
+                    parent.stats.items_out += 1
+
+    def __next__(self):
+        return self._call(self._target.__next__)
+
+    def send(self, value):
+        return self._call(self._target.send, value)
+
+    def throw(self, *args):
+        return self._call(self._target.throw, *args)
+
+    def close(self):
+        close = getattr(self._target, "close", None)
+        if close is not None:
+            # Closing cascades downstream (filter_error closes its target): time it too
+            self._call(close)
+
+    def __getattr__(self, name):
+        return getattr(self._target, name)
+
+
+_calibration: tuple[float, float, float] | None = None
+_MIN_NOISE = 0.15       # run-to-run drift of the per-call cost, seen across processes
+
+
+def _calibrate(calls: int = 20_000, rounds: int = 5) -> tuple[float, float, float]:
+    """
+    Measure the profiler's own cost per timed call, once per process (median of rounds):
+    - inner: what a timed call records around a next() that does nothing
+    - hidden: what the parent sees on top of the child's recorded time
+    - noise: relative uncertainty of those corrections (spread of the rounds, at least _MIN_NOISE)
+    """
+    global _calibration
+    if _calibration is None:
+        import statistics
+
+        _calibration = (0.0, 0.0, 0.0)
+        inners, hiddens = [], []
+        for _ in range(rounds):
+            prof = PipelineProfiler(enabled=True)
+            leaf = prof.pull("leaf", itertools.repeat(None))
+            for _ in itertools.islice(leaf, calls):
+                pass
+            inners.append(prof.stages["leaf"].timed_cum_ns / calls)
+            prof = PipelineProfiler(enabled=True)
+            prof._inner_ns = inners[-1]
+            outer = prof.pull("outer", prof.pull("leaf", itertools.repeat(None)))
+            for _ in itertools.islice(outer, calls):
+                pass
+            # outer does nothing itself, so what is left of its self time is the leaf's hidden cost
+            hiddens.append(prof.stages["outer"].timed_self_ns / calls)
+        hidden = statistics.median(hiddens)
+        spread = (max(hiddens) - min(hiddens)) / hidden if hidden > 0 else 0.0
+        _calibration = (statistics.median(inners), hidden, max(_MIN_NOISE, spread))
+    return _calibration
+
+
+class PipelineProfiler:
+    def __init__(self, enabled: bool | None = None, sample_every: int = 1):
+        if enabled is None:
+            enabled = os.environ.get("PIPELINE_PROFILE", "") not in ("", "0")
+        if sample_every < 1:
+            raise ValueError("sample_every must be >= 1")
+        self.enabled = enabled
+        self.sample_every = sample_every
+        self._roots = 0
+        self.stages: dict[str, StageStats] = {}
+        self._folded: dict[str, int] = defaultdict(int)        # stack -> measured self ns
+        self._corrected: dict[str, float] = defaultdict(float)  # stack -> overhead ns taken out
+        self._queues: dict[str, Callable[[], int]] = {}
+        self._local = threading.local()
+        self._inner_ns = self._hidden_ns = self._noise = 0.0
+        if enabled:
+            self._inner_ns, self._hidden_ns, self._noise = _calibrate()
+        self._started = _now()
+
+    def _thread_state(self):
+        try:
+            return self._local.state
+        except AttributeError:
+            state = self._local.state = _ThreadState()
+            return state
+
+    def _stats(self, name: str, kind: str) -> StageStats:
+        stats = self.stages.get(name)
+        if stats is None:
+            stats = self.stages[name] = StageStats(name, kind)
+        return stats
+
+    # ------------------------------------------------------------------
+    # Wrapping
+    # ------------------------------------------------------------------
+    def pull(self, name: str, stage):
+        """Wrap an iterator/generator whose items are taken with next()."""
+        if not self.enabled:
+            return stage
+        return _Profiled(iter(stage), self._stats(name, "pull"), self, self._queues.get(name))
+
+    def push(self, name: str, stage):
+        """Wrap a coroutine stage whose items arrive with send()."""
+        if not self.enabled:
+            return stage
+        return _Profiled(stage, self._stats(name, "push"), self, self._queues.get(name))
+
+    def wrap(self, name: str, factory: Callable, kind: str = "pull") -> Callable:
+        """Return factory' so that every stage factory'(...) creates is wrapped."""
+        if not self.enabled:
+            return factory
+        wrap_one = self.pull if kind == "pull" else self.push
+
+        def profiled(*args, **kwargs):
+            return wrap_one(name, factory(*args, **kwargs))
+
+        profiled.__wrapped__ = factory
+        return profiled
+
+    @contextlib.contextmanager
+    def patch(self, module, *names: str, kind: str = "pull") -> Iterator[None]:
+        """Temporarily replace module.<name> stage factories with wrapped ones."""
+        if not self.enabled:
+            yield
+            return
+        originals = {name: getattr(module, name) for name in names}
+        try:
+            for name, factory in originals.items():
+                setattr(module, name, self.wrap(name, factory, kind))
+            yield
+        finally:
+            for name, factory in originals.items():
+                setattr(module, name, factory)
+
+    def track_queue(self, name: str, depth: Callable[[], int]) -> None:
+        """Sample depth() (e.g. queue.qsize) every time stage `name` is entered."""
+        self._queues[name] = depth
+
+    # ------------------------------------------------------------------
+    # Output
+    # ------------------------------------------------------------------
+    def times(self) -> dict[str, tuple[float, float, float]]:
+        """
+        Per stage: (self ns, cum ns, noise ns), scaled up to all calls.
+
+        Built from the call stacks, deepest first: a stack's cum is its own self
+        time plus the cum of the stacks it called, where a self time within the
+        noise (or below 0) counts as 0. So cum never drops below the callees' cum.
+        """
+        out = {name: [0.0, 0.0, 0.0] for name in self.stages}
+        cum: dict[str, float] = defaultdict(float)
+        for path in sorted(self._folded, key=lambda p: p.count(";"), reverse=True):
+            parent, _, name = path.rpartition(";")
+            scale = self.stages[name].scale
+            own = self._folded[path] * scale
+            noise = self._corrected[path] * scale * self._noise
+            total = (own if own > noise else 0.0) + cum[path]
+            if parent:
+                cum[parent] += total
+            row = out[name]
+            row[0] += own
+            row[2] += noise
+            if name not in parent.split(";"):     # recursion: the outer frame counts it already
+                row[1] += total
+        return {name: (own, total, noise) for name, (own, total, noise) in out.items()}
+
+    def report(self, stream=None) -> str:
+        wall = (_now() - self._started) / 1e9
+        lines = [f"{'stage':<22}{'kind':<6}{'in':>11}{'out':>11}{'sel':>7}{'cum s':>9}{'self s':>10}"
+                 f"{'noise s':>9}{'self %':>8}{'ns/call':>9}{'queue max/avg':>15}"]
+        times = self.times()
+        counted = {name: own if own > noise else 0.0 for name, (own, _, noise) in times.items()}
+        total_self = sum(counted.values()) or 1
+        for s in sorted(self.stages.values(), key=lambda s: times[s.name][0], reverse=True):
+            own, total, noise = times[s.name]
+            sel = f"{s.selectivity:.3f}" if s.selectivity is not None else "-"
+            per_call = own / max(1, s.calls)
+            queue = (f"{s.queue_max}/{s.queue_sum / s.queue_samples:.1f}" if s.queue_samples else "-")
+            mark = "~" if own <= noise else " "
+            lines.append(f"{s.name:<22}{s.kind:<6}{s.items_in:>11,}{s.items_out:>11,}{sel:>7}"
+                         f"{total / 1e9:>9.3f}{mark:>2}{own / 1e9:.3f}{noise / 1e9:>9.3f}"
+                         f"{counted[s.name] / total_self * 100:>7.1f}%{per_call:>9.0f}{queue:>15}")
+        sampled = f", timing 1 in {self.sample_every} outermost calls" if self.sample_every > 1 else ""
+        if any(own <= noise for own, _, noise in times.values()):
+            lines.append("~ self time within the profiler's own per-call cost: not attributable, counted as 0")
+        lines.append(f"(wall time since profiler start: {wall:.3f}s{sampled})")
+        text = "\n".join(lines)
+        if stream is not None:
+            print(text, file=stream)
+        return text
+
+    def folded(self) -> str:
+        """Self time per stack in folded-stack format (microseconds, scaled like the report)."""
+        out = []
+        for path, ns in sorted(self._folded.items()):
+            us = max(0, int(ns * self.stages[path.rpartition(";")[2]].scale) // 1000)
+            if us:
+                out.append(f"{path} {us}\n")
+        return "".join(out)
+
+    def write_folded(self, path: Path) -> None:
+        Path(path).write_text(self.folded(), encoding="utf-8")
+
+
+# ----------------------------------------------------------------------
+# Demo / benchmark over the log pipelines
+# ----------------------------------------------------------------------
+def _pull_run(log_dir: Path, prof: PipelineProfiler) -> int:
+    from . import yield_from
+
+    with prof.patch(yield_from, "iter_log_files", "iter_lines", "iter_all_log_lines", "iter_error_lines"):
+        return sum(1 for _ in yield_from.iter_error_lines(yield_from.iter_all_log_lines(log_dir)))
+
+
+def _push_run(log_dir: Path, prof: PipelineProfiler) -> int:
+    from .push_based_pipeline import filter_error, source_push
+    from .push_graph import count_sink
+    from .yield_from import iter_all_log_lines
+
+    counts: dict = {}
+    sink = prof.push("count_sink", count_sink(counts, "errors"))
+    next(sink)
+    flt = prof.push("filter_error", filter_error(sink))
+    next(flt)
+    source_push(iter_all_log_lines(log_dir), flt)
+    return counts.get("errors", 0)
+
+
+def _bare_pull(log_dir: Path) -> int:
+    from .yield_from import iter_all_log_lines, iter_error_lines
+
+    return sum(1 for _ in iter_error_lines(iter_all_log_lines(log_dir)))
+
+
+def _bare_push(log_dir: Path) -> int:
+    from .push_based_pipeline import filter_error, source_push
+    from .push_graph import count_sink
+    from .yield_from import iter_all_log_lines
+
+    counts: dict = {}
+    sink = count_sink(counts, "errors")
+    next(sink)
+    flt = filter_error(sink)
+    next(flt)
+    source_push(iter_all_log_lines(log_dir), flt)
+    return counts.get("errors", 0)
+
+
+def bench(log_dir: Path, repeat: int = 5) -> None:
+    for label, bare, run in (("pull", _bare_pull, _pull_run), ("push", _bare_push, _push_run)):
+        modes = {
+            "bare": lambda: bare(log_dir),
+            "disabled": lambda: run(log_dir, PipelineProfiler(enabled=False)),
+            "sample 1/1": lambda: run(log_dir, PipelineProfiler(enabled=True)),
+            "sample 1/64": lambda: run(log_dir, PipelineProfiler(enabled=True, sample_every=64)),
+        }
+        best = dict.fromkeys(modes, float("inf"))
+        for _ in range(repeat):          # interleaved, so drift hits every mode alike
+            for mode, fn in modes.items():
+                start = time.perf_counter()
+                fn()
+                best[mode] = min(best[mode], time.perf_counter() - start)
+        base = best["bare"]
+        print(f"{label}: bare {base:.3f}s" + "".join(
+            f" | {mode} {(best[mode] / base - 1) * 100:+.1f}%" for mode in list(modes)[1:]))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("log_dir", type=Path, nargs="?", default=Path("logs"))
+    parser.add_argument("--bench", action="store_true", help="overhead: bare vs disabled vs enabled")
+    parser.add_argument("--folded", type=Path, help="write a flame graph input file")
+    parser.add_argument("--sample-every", type=int, default=1, help="time 1 in N outermost calls")
+    args = parser.parse_args()
+
+    if args.bench:
+        bench(args.log_dir)
+        return
+
+    folded = []
+    for label, run in (("pull", _pull_run), ("push", _push_run)):
+        prof = PipelineProfiler(enabled=True, sample_every=args.sample_every)
+        errors = run(args.log_dir, prof)
+        print(f"{label}: {errors:,} error lines")
+        print(prof.report(), end="\n\n")
+        folded.append(prof.folded())
+    if args.folded:
+        args.folded.write_text("".join(folded), encoding="utf-8")
+        print(f"folded stacks -> {args.folded}")
+
+
+if __name__ == "__main__":
+    main()
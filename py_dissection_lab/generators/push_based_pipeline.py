@@ -41,14 +41,16 @@ def source_push(lines, target):
 
 
 # Wiring ve çalıştırma
-out = sink_print()
-next(out)       # prime: ilk yield'e kadar getirir
+def run_push_pipeline(lines):
+    """source_push -> filter_error -> sink_print"""
+    out = sink_print()
+    next(out)       # prime: ilk yield'e kadar getirir
 
-flt = filter_error(out)
-next(flt)       # prime
-
-lines = ["INFO ok", "ERROR boom", "INFO ok2", "ERROR AGAIN"]
-source_push(lines, flt)
+    flt = filter_error(out)
+    next(flt)       # prime
 
+    source_push(lines, flt)
 
 
+if __name__ == "__main__":
+    run_push_pipeline(["INFO ok", "ERROR boom", "INFO ok2", "ERROR AGAIN"])
@@ -0,0 +1,363 @@
+"""
+Fan-out / fan-in push pipelines with bounded queues and backpressure
+
+filter_error(target) pushes to exactly one downstream coroutine. To feed an ERROR
+sink, a metrics sink and an archive sink from one source you would need three
+sources. This module adds the missing pieces, built from the same kind of
+coroutine stages:
+
+fan-out (one upstream, many downstreams)
+- broadcast(targets)                every item goes to every target
+- partition(key, targets)           hash(key(item)) picks one target (stable per key)
+- round_robin(targets)              targets take turns
+
+fan-in (many upstreams, one downstream)
+- merge(target, n)                  returns n input ports; the target is closed only
+                                    after the last port is closed
+
+bounded edges
+- queued(target, maxsize)           a worker thread drives `target` from a bounded
+                                    queue; when the queue is full, send() blocks, so
+                                    a slow sink slows the source down (backpressure)
+
+PipelineGraph wires named stages together with these combinators:
+
+    g = PipelineGraph()
+    g.add("errors", filter_error)
+    g.add("print", sink_print)
+    g.add("count", lambda: count_sink(counts, "errors"))
+    g.connect("errors", "print", queue_size=1000)
+    g.connect("errors", "count")
+    g.run(lines)
+
+close() cascades the same way filter_error closes its target: each stage closes
+its downstreams, queued edges drain first, merges wait for all their inputs.
+
+Usage:
+    python -m py_dissection_lab.generators.push_graph
+"""
+
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from collections import defaultdict
+from itertools import cycle
+from typing import Callable, Hashable, Iterable
+
+from .push_based_pipeline import filter_error, sink_print, source_push
+
+
+# ----------------------------------------------------------------------
+# Fan-out
+# ----------------------------------------------------------------------
+def broadcast(targets):
+    """Sends every item to every target"""
+    try:
+        while True:
+            item = yield
+            for target in targets:
+                target.send(item)
+    except GeneratorExit:
+        for target in targets:
+            target.close()
+        return
+
+
+def partition(key: Callable[[object], Hashable], targets):
+    """Sends each item to targets[hash(key(item)) % len(targets)]"""
+    n = len(targets)
+    try:
+        while True:
+            item = yield
+            targets[hash(key(item)) % n].send(item)
+    except GeneratorExit:
+        for target in targets:
+            target.close()
+        return
+
+
+def round_robin(targets):
+    """Sends items to the targets in turn"""
+    turn = cycle(targets)
+    try:
+        while True:
+            item = yield
+            next(turn).send(item)
+    except GeneratorExit:
+        for target in targets:
+            target.close()
+        return
+
+
+# ----------------------------------------------------------------------
+# Fan-in
+# ----------------------------------------------------------------------
+def merge(target, inputs: int) -> list:
+    """
+    Create `inputs` primed ports that all feed `target`.
+
+    Ports may be driven from different threads (e.g. behind queued() edges), so
+    sends into the shared target are serialized with a lock.
+    """
+    lock = threading.Lock()
+    open_ports = [inputs]
+
+    def port():
+        try:
+            while True:
+                item = yield
+                with lock:
+                    target.send(item)
+        except GeneratorExit:
+            with lock:
+                open_ports[0] -= 1
+                if open_ports[0] == 0:
+                    target.close()      # son giriş de kapandı: zinciri kapat
+            return
+
+    ports = [port() for _ in range(inputs)]
+    for p in ports:
+        next(p)
+    return ports
+
+
+# ----------------------------------------------------------------------
+# Bounded edge with backpressure
+# ----------------------------------------------------------------------
+_CLOSE = object()
+
+
+class EdgeStats:
+    """Counters for one queued edge."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.items = 0
+        self.high_water = 0
+        self.blocked_seconds = 0.0  # time the upstream spent waiting on a full queue
+
+    def __repr__(self) -> str:
+        return (f"EdgeStats(items={self.items}, high_water={self.high_water}/{self.maxsize}, "
+                f"blocked={self.blocked_seconds:.3f}s)")
+
+
+def queued(target, maxsize: int = 1024, stats: EdgeStats | None = None, name: str = "push-edge"):
+    """
+    Decouple `target` from its upstream with a bounded queue and a worker thread.
+
+    send() blocks while the queue is full, which is how backpressure reaches the
+    source. close() waits until the worker has drained the queue and closed
+    `target`. An exception raised downstream is re-raised in the upstream on the
+    next send() or on close().
+    """
+    q: queue.Queue = queue.Queue(maxsize)
+    failure: list[BaseException] = []
+    stats = stats if stats is not None else EdgeStats(maxsize)
+
+    def drive():
+        try:
+            while (item := q.get()) is not _CLOSE:
+                target.send(item)
+            target.close()
+        except BaseException as exc:
+            failure.append(exc)
+            # Keep draining so the upstream never blocks forever on a dead edge
+            while q.get() is not _CLOSE:
+                pass
+
+    worker = threading.Thread(target=drive, name=name, daemon=True)
+    worker.start()
+
+    try:
+        while True:
+            item = yield
+            if failure:
+                raise RuntimeError("downstream of queued edge failed") from failure[0]
+            try:
+                q.put_nowait(item)
+            except queue.Full:
+                start = time.perf_counter()
+                q.put(item)
+                stats.blocked_seconds += time.perf_counter() - start
+            stats.items += 1
+            stats.high_water = max(stats.high_water, q.qsize())
+    except GeneratorExit:
+        q.put(_CLOSE)
+        worker.join()
+        if failure:
+            raise RuntimeError("downstream of queued edge failed") from failure[0]
+        return
+
+
+# ----------------------------------------------------------------------
+# Graph builder
+# ----------------------------------------------------------------------
+FANOUTS = {"broadcast", "partition", "round_robin"}
+
+
+class PipelineGraph:
+    """
+    Named coroutine stages connected into a DAG.
+
+    - add(name, factory): factory(target) for stages with one downstream (like
+      filter_error), factory() for sinks (like sink_print)
+    - connect(src, dst, queue_size=None): queue_size puts a bounded queued() edge
+      in between
+    - build(): wires everything sinks-first and returns the entry coroutine
+    """
+
+    def __init__(self):
+        self._factories: dict[str, Callable] = {}
+        self._fanout: dict[str, tuple[str, Callable | None]] = {}
+        self._edges: dict[str, list[tuple[str, int | None]]] = defaultdict(list)
+        self.edge_stats: dict[tuple[str, str], EdgeStats] = {}
+
+    def add(self, name: str, factory: Callable, fanout: str = "broadcast", key: Callable | None = None) -> PipelineGraph:
+        if name in self._factories:
+            raise ValueError(f"stage {name!r} already exists")
+        if fanout not in FANOUTS:
+            raise ValueError(f"fanout must be one of {sorted(FANOUTS)}, got {fanout!r}")
+        if fanout == "partition" and key is None:
+            raise ValueError("fanout='partition' needs a key function")
+        self._factories[name] = factory
+        self._fanout[name] = (fanout, key)
+        return self
+
+    def connect(self, src: str, dst: str, queue_size: int | None = None) -> PipelineGraph:
+        for name in (src, dst):
+            if name not in self._factories:
+                raise KeyError(f"unknown stage {name!r}")
+        self._edges[src].append((dst, queue_size))
+        return self
+
+    def build(self):
+        """Instantiate and prime every stage; returns the single entry coroutine."""
+        inbound: dict[str, int] = defaultdict(int)
+        for edges in self._edges.values():
+            for dst, _ in edges:
+                inbound[dst] += 1
+
+        entries = [name for name in self._factories if inbound[name] == 0]
+        if len(entries) != 1:
+            raise ValueError(f"graph needs exactly one entry stage, found {entries}")
+
+        built: dict[str, object] = {}      # name -> primed coroutine
+        ports: dict[str, list] = {}        # name -> unused merge ports
+        visiting: set[str] = set()
+
+        def input_of(name: str):
+            """A primed coroutine that feeds `name` (a merge port if it has several inputs)."""
+            if name not in built:
+                if name in visiting:
+                    raise ValueError(f"cycle detected at stage {name!r}")
+                visiting.add(name)
+                built[name] = self._instantiate(name, input_of)
+                visiting.discard(name)
+                if inbound[name] > 1:
+                    ports[name] = merge(built[name], inbound[name])
+            if inbound[name] > 1:
+                return ports[name].pop()
+            return built[name]
+
+        self.edge_stats.clear()
+        return input_of(entries[0])
+
+    def _instantiate(self, name: str, input_of: Callable):
+        downstream = []
+        for dst, queue_size in self._edges.get(name, []):
+            target = input_of(dst)
+            if queue_size is not None:
+                stats = self.edge_stats[(name, dst)] = EdgeStats(queue_size)
+                target = queued(target, queue_size, stats, name=f"{name}->{dst}")
+                next(target)
+            downstream.append(target)
+
+        factory = self._factories[name]
+        if not downstream:
+            stage = factory()
+        else:
+            if len(downstream) == 1:
+                fan = downstream[0]
+            else:
+                kind, key = self._fanout[name]
+                fan = {
+                    "broadcast": lambda: broadcast(downstream),
+                    "partition": lambda: partition(key, downstream),
+                    "round_robin": lambda: round_robin(downstream),
+                }[kind]()
+                next(fan)
+            stage = factory(fan)
+        next(stage)
+        return stage
+
+    def run(self, items: Iterable) -> None:
+        """Build the graph and push every item through it, then close it."""
+        source_push(items, self.build())
+
+
+def passthrough(target):
+    """Pass-through stage; handy as a fan-out point"""
+    try:
+        while True:
+            target.send((yield))
+    except GeneratorExit:
+        target.close()
+        return
+
+
+def count_sink(counts: dict, name: str):
+    """Counts the items it receives under counts[name]"""
+    try:
+        while True:
+            yield
+            counts[name] = counts.get(name, 0) + 1
+    except GeneratorExit:
+        return
+
+
+def slow_sink(delay: float, collected: list):
+    """Simulates a slow consumer (e.g. an archive upload)"""
+    try:
+        while True:
+            item = yield
+            time.sleep(delay)
+            collected.append(item)
+    except GeneratorExit:
+        return
+
+
+def demo() -> None:
+    lines = [f"{'ERROR' if i % 3 == 0 else 'INFO'} event {i} customer=C{i % 4}" for i in range(30)]
+    counts: dict = {}
+    archive: list = []
+
+    g = PipelineGraph()
+    g.add("source", passthrough)                      # broadcast point
+    g.add("errors", filter_error)
+    g.add("print", sink_print)
+    g.add("metrics", lambda: count_sink(counts, "all"))
+    g.add("by_customer", passthrough, fanout="partition", key=lambda line: line.rsplit("=", 1)[1])
+    g.add("archive", lambda: slow_sink(0.001, archive))
+    g.add("audit", lambda: count_sink(counts, "audit"))     # fan-in: fed by two stages
+    for shard in range(2):
+        g.add(f"shard{shard}", lambda shard=shard: count_sink(counts, f"shard{shard}"))
+        g.connect("by_customer", f"shard{shard}")
+
+    g.connect("source", "errors")
+    g.connect("source", "metrics")
+    g.connect("source", "by_customer")
+    g.connect("source", "archive", queue_size=4)    # slow sink behind a small queue
+    g.connect("errors", "print")
+    g.connect("errors", "audit")
+    g.connect("source", "audit", queue_size=8)
+
+    start = time.perf_counter()
+    g.run(lines)
+    print(f"counts={counts} archived={len(archive)} in {time.perf_counter() - start:.3f}s")
+    print("edges:", g.edge_stats)
+
+
+if __name__ == "__main__":
+    demo()
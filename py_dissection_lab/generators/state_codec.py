@@ -0,0 +1,123 @@
+"""
+Compact bytes format for iterator checkpoints
+
+A checkpointable iterator implements:
+- snapshot() -> bytes          its full position, small enough to write often
+- Cls.restore(data) -> Cls     a new iterator that continues exactly there
+
+The bytes are:  b"CK" | version | kind | fields...
+- kind is a short ASCII name ("countdown", "counter", ...) so restoring a
+  checkpoint into the wrong iterator type fails loudly instead of silently
+- every field is a tag byte followed by
+    i  a zigzag LEB128 varint (any Python int, negatives and > 64-bit included)
+    s  a varint length + UTF-8 bytes
+
+No pickle: a checkpoint file never executes code when it is loaded.
+
+save_checkpoint() / load_checkpoint() write and read one checkpoint file
+atomically, the same tmp + os.replace approach as log_checkpoint.OffsetIndex.
+"""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import Protocol, Self
+
+MAGIC = b"CK"
+VERSION = 1
+
+
+class Checkpointable(Protocol):
+    def snapshot(self) -> bytes: ...
+
+    @classmethod
+    def restore(cls, data: bytes) -> Self: ...
+
+
+def _write_varint(out: bytearray, n: int) -> None:
+    while True:
+        byte = n & 0x7F
+        n >>= 7
+        if n:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return
+
+
+def _read_varint(data: bytes, pos: int) -> tuple[int, int]:
+    n = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        n |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return n, pos
+        shift += 7
+
+
+def pack_state(kind: str, *fields: int | str | bool) -> bytes:
+    """Encode `fields` as a checkpoint of iterator type `kind`."""
+    out = bytearray(MAGIC)
+    out.append(VERSION)
+    name = kind.encode("ascii")
+    out.append(len(name))
+    out += name
+    for value in fields:
+        if isinstance(value, int):      # bool is an int too
+            out += b"i"
+            _write_varint(out, value * 2 if value >= 0 else -value * 2 - 1)
+        elif isinstance(value, str):
+            raw = value.encode("utf-8")
+            out += b"s"
+            _write_varint(out, len(raw))
+            out += raw
+        else:
+            raise TypeError(f"cannot checkpoint {type(value).__name__} field")
+    return bytes(out)
+
+
+def unpack_state(data: bytes, kind: str) -> tuple:
+    """Decode a checkpoint written by pack_state(kind, ...); ValueError on anything else."""
+    if data[:2] != MAGIC:
+        raise ValueError("not a checkpoint")
+    if data[2] != VERSION:
+        raise ValueError(f"unsupported checkpoint version {data[2]}")
+    size = data[3]
+    found = data[4:4 + size].decode("ascii")
+    if found != kind:
+        raise ValueError(f"checkpoint is for {found!r}, not {kind!r}")
+    pos = 4 + size
+    fields: list[int | str] = []
+    while pos < len(data):
+        tag = data[pos]
+        pos += 1
+        n, pos = _read_varint(data, pos)
+        if tag == ord("i"):
+            fields.append(n >> 1 if not n & 1 else -((n + 1) >> 1))
+        elif tag == ord("s"):
+            fields.append(data[pos:pos + n].decode("utf-8"))
+            pos += n
+        else:
+            raise ValueError(f"bad field tag {tag!r}")
+    return tuple(fields)
+
+
+def save_checkpoint(path: Path, data: bytes, *, fsync: bool = False) -> None:
+    """Replace the checkpoint file atomically; a crash mid-write keeps the previous one."""
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(data)
+        if fsync:
+            f.flush()
+            os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def load_checkpoint(path: Path) -> bytes | None:
+    """The saved checkpoint, or None if there is none yet."""
+    try:
+        return Path(path).read_bytes()
+    except FileNotFoundError:
+        return None
@@ -0,0 +1,402 @@
+"""
+Streaming statistics: running_average() grown up
+
+running_average() in generator_iterator_diff.py takes one float per send() and
+only knows the mean. StreamingStats keeps, in bounded memory per stream:
+- count, mean, variance / stddev (Welford; batches merged with Chan's formula)
+- min / max
+- approximate quantiles with a KLL sketch (rank error ~1/k, a few KB)
+
+The moments alone are RunningMoments, the base class; market/scenario_runner.py
+builds its MetricSummary on it with a different quantile sketch.
+
+Values can come one at a time (add) or as a whole buffer per call (update):
+a list, an array('d'), a memoryview or a NumPy array. A buffer is folded into
+the running moments in one step, so the Python-level cost is per buffer, not
+per value.
+
+States are mergeable: per-thread or per-process partial stats combine with
+merge() (or a + b), and the result is the same as if one stream had seen
+everything (exactly for count/mean/variance/min/max, within the sketch error for
+quantiles). StreamingStats pickles, so it can be returned from a process pool.
+
+running_stats() keeps the coroutine interface:
+
+    coro = running_stats()
+    next(coro)                  # prime
+    coro.send(10)               # single value
+    coro.send(array("d", ...))  # or a whole buffer
+    stats = coro.send(30)       # yields the live StreamingStats
+    stats.mean, stats.quantile(0.99)
+
+Usage:
+    python -m py_dissection_lab.generators.streaming_stats
+    python -m py_dissection_lab.generators.streaming_stats --bench --values 2000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import math
+import random
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Iterable
+
+from .._lazy import optional_module
+from .generator_iterator_diff import running_average
+
+# optional, imported on first use: buffers are folded with math.fsum instead
+np = optional_module("numpy")
+
+
+class RunningMoments:
+    """count / mean / variance / min / max: Welford per value, Chan's formula per batch or merge."""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0                  # sum of squared deviations from the mean
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, x: float) -> None:
+        """Add a single value (Welford update)."""
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (x - self.mean)
+        if x < self.min:
+            self.min = x
+        if x > self.max:
+            self.max = x
+
+    def merge(self, other: RunningMoments) -> RunningMoments:
+        """Fold another partial state into this one (in place) and return self."""
+        if other.count:
+            self._merge_moments(other.count, other.mean, other._m2, other.min, other.max)
+        return self
+
+    def _merge_moments(self, n: int, mean: float, m2: float, lo: float, hi: float) -> None:
+        # Chan et al. parallel variance: combine (count, mean, M2) pairs
+        total = self.count + n
+        delta = mean - self.mean
+        self.mean += delta * n / total
+        self._m2 += m2 + delta * delta * self.count * n / total
+        self.count = total
+        self.min = min(self.min, lo)
+        self.max = max(self.max, hi)
+
+    @property
+    def variance(self) -> float:
+        """Sample variance (n - 1), like statistics.variance()."""
+        return self._m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def stddev(self) -> float:
+        return math.sqrt(self.variance)
+
+
+class StreamingStats(RunningMoments):
+    """count / mean / variance / min / max plus KLL quantiles, mergeable."""
+
+    def __init__(self, k: int = 200, seed: int | None = None):
+        if k < 8:
+            raise ValueError("k must be at least 8")
+        super().__init__()
+        self.k = k
+        # KLL sketch: levels[h] holds items that each stand for 2**h values
+        self._levels: list[list[float]] = [[]]
+        self._size = 0                  # items held across all levels
+        self._limit = self._capacity_total()
+        self._rng = random.Random(seed)
+
+    # ------------------------------------------------------------------
+    # Ingestion
+    # ------------------------------------------------------------------
+    def add(self, x: float) -> None:
+        """Add a single value (Welford update)."""
+        x = float(x)
+        RunningMoments.add(self, x)
+        self._levels[0].append(x)
+        self._size += 1
+        if self._size > self._limit:
+            self._compress()
+
+    def update(self, values: Iterable[float]) -> StreamingStats:
+        """Add a whole buffer in one step: list, array('d'), memoryview or NumPy array."""
+        if np is not None:
+            arr = np.asarray(values, dtype=np.float64).ravel()
+            n = arr.size
+            if n == 0:
+                return self
+            mean = float(arr.mean())
+            m2 = float(np.square(arr - mean).sum())
+            lo, hi = float(arr.min()), float(arr.max())
+        else:
+            arr = values if isinstance(values, (list, array)) else list(values)
+            n = len(arr)
+            if n == 0:
+                return self
+            mean = math.fsum(arr) / n
+            m2 = math.fsum((x - mean) ** 2 for x in arr)
+            lo, hi = min(arr), max(arr)
+            arr = [float(x) for x in arr]
+        self._merge_moments(n, mean, m2, lo, hi)
+        self._push(arr, 0)
+        self._compress()
+        return self
+
+    def merge(self, other: StreamingStats) -> StreamingStats:
+        """Fold another partial state into this one (in place) and return self."""
+        if other.count == 0:
+            return self
+        self._merge_moments(other.count, other.mean, other._m2, other.min, other.max)
+        while len(self._levels) < len(other._levels):
+            self._add_level()
+        for h, items in enumerate(other._levels):
+            self._levels[h].extend(items)
+            self._size += len(items)
+        self._compress()
+        return self
+
+    def __add__(self, other: StreamingStats) -> StreamingStats:
+        result = StreamingStats(self.k)
+        return result.merge(self).merge(other)
+
+    # ------------------------------------------------------------------
+    # KLL compaction
+    # ------------------------------------------------------------------
+    def _capacity(self, h: int) -> int:
+        # Top level holds k items, each level below 2/3 of the one above
+        depth = len(self._levels) - 1 - h
+        return max(2, int(self.k * (2 / 3) ** depth) + 1)
+
+    def _capacity_total(self) -> int:
+        return sum(self._capacity(h) for h in range(len(self._levels)))
+
+    def _add_level(self) -> None:
+        self._levels.append([])
+        self._limit = self._capacity_total()     # capacities shift when the sketch grows
+
+    def _halve(self, items):
+        # Sort, keep every other item starting at a random offset; survivors double in weight
+        offset = self._rng.getrandbits(1)
+        if np is not None and np.loaded and isinstance(items, np.ndarray):
+            return np.sort(items)[offset::2]
+        return sorted(items)[offset::2]
+
+    def _push(self, items, h: int) -> None:
+        """Insert a (possibly huge) batch at level h, halving it on the way up until it fits."""
+        while len(items) > self._capacity(h):
+            items = self._halve(items)
+            h += 1
+            if h == len(self._levels):
+                self._add_level()
+        if np is not None and np.loaded and isinstance(items, np.ndarray):
+            items = items.tolist()
+        self._levels[h].extend(items)
+        self._size += len(items)
+
+    def _compress(self) -> None:
+        while self._size > self._limit:
+            for h, items in enumerate(self._levels):
+                if len(items) > self._capacity(h):
+                    if h + 1 == len(self._levels):
+                        self._add_level()
+                    survivors = self._halve(items)
+                    self._levels[h] = []
+                    self._levels[h + 1].extend(survivors)
+                    self._size += len(survivors) - len(items)
+                    break
+            else:
+                return
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+    def _weighted(self) -> tuple[list[float], list[int]]:
+        pairs = sorted((x, 1 << h) for h, items in enumerate(self._levels) for x in items)
+        return [x for x, _ in pairs], [w for _, w in pairs]
+
+    def quantile(self, q: float) -> float:
+        """Approximate q-quantile, 0 <= q <= 1; quantile(0) / quantile(1) are exact."""
+        return self.quantiles([q])[0]
+
+    def quantiles(self, qs: Iterable[float]) -> list[float]:
+        """Several quantiles from one sort of the sketch."""
+        if self.count == 0:
+            raise ValueError("no values")
+        values, weights = self._weighted()
+        total = sum(weights)
+        out = []
+        for q in qs:
+            if not 0.0 <= q <= 1.0:
+                raise ValueError(f"quantile must be in [0, 1], got {q}")
+            if q == 0.0:
+                out.append(self.min)
+                continue
+            if q == 1.0:
+                out.append(self.max)
+                continue
+            target = q * total
+            seen = 0
+            for x, w in zip(values, weights):
+                seen += w
+                if seen >= target:
+                    out.append(x)
+                    break
+            else:
+                out.append(self.max)
+        return out
+
+    def rank(self, x: float) -> float:
+        """Approximate fraction of values <= x."""
+        if self.count == 0:
+            return 0.0
+        below = sum(1 << h for h, items in enumerate(self._levels) for v in items if v <= x)
+        return below / sum(len(items) << h for h, items in enumerate(self._levels))
+
+    def summary(self) -> dict:
+        p50, p90, p99 = self.quantiles([0.5, 0.9, 0.99]) if self.count else (math.nan,) * 3
+        return {
+            "count": self.count, "mean": self.mean, "stddev": self.stddev,
+            "min": self.min, "max": self.max, "p50": p50, "p90": p90, "p99": p99,
+        }
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __repr__(self) -> str:
+        if not self.count:
+            return "StreamingStats(count=0)"
+        return (f"StreamingStats(count={self.count}, mean={self.mean:.6g}, stddev={self.stddev:.6g}, "
+                f"min={self.min:.6g}, max={self.max:.6g}, sketch={self._size} items)")
+
+    def __getstate__(self) -> dict:
+        # random.Random pickles fine, but a fresh one keeps the payload small
+        state = self.__dict__.copy()
+        del state["_rng"]
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._rng = random.Random()
+
+
+# ----------------------------------------------------------------------
+# Coroutine wrapper
+# ----------------------------------------------------------------------
+def running_stats(k: int = 200):
+    """
+    send() a number or a buffer; yields the live StreamingStats after each send.
+
+    Like running_average(), prime it with next() first (that yields None).
+    """
+    stats = StreamingStats(k)
+    snapshot = None
+    while True:
+        x = yield snapshot      # dışarı stats ver sonra dışarıdan x (ya da buffer) al
+        if isinstance(x, (int, float)):
+            stats.add(x)
+        else:
+            stats.update(x)
+        snapshot = stats
+
+
+# ----------------------------------------------------------------------
+# Benchmark: per-value send() vs batched ingestion
+# ----------------------------------------------------------------------
+def _rank_error(stats: StreamingStats, exact_sorted, qs) -> float:
+    n = len(exact_sorted)
+    worst = 0.0
+    for q, est in zip(qs, stats.quantiles(qs)):
+        lo = bisect_left(exact_sorted, est) / n
+        hi = bisect_right(exact_sorted, est) / n
+        worst = max(worst, 0.0 if lo <= q <= hi else min(abs(q - lo), abs(q - hi)))
+    return worst
+
+
+def bench(n: int, batch_size: int, k: int) -> None:
+    rng = random.Random(42)
+    data = array("d", (rng.lognormvariate(3.0, 0.8) for _ in range(n)))   # latency-like
+    exact = sorted(data)
+    qs = [0.5, 0.9, 0.99, 0.999]
+    print(f"{n:,} values, k={k}, batch={batch_size}, numpy={'yes' if np is not None else 'no'}")
+    print(f"{'mode':<22}{'seconds':>9}{'Mvalues/s':>11}{'mean err':>11}{'max rank err':>14}")
+
+    def report(name, seconds, stats):
+        mean_err = abs(stats.mean - math.fsum(data) / n)
+        print(f"{name:<22}{seconds:>9.3f}{n / seconds / 1e6:>11.2f}{mean_err:>11.2e}"
+              f"{_rank_error(stats, exact, qs):>14.4f}")
+
+    start = time.perf_counter()
+    coro = running_average()
+    next(coro)
+    for x in data:
+        coro.send(x)
+    elapsed = time.perf_counter() - start
+    print(f"{'running_average send':<22}{elapsed:>9.3f}{n / elapsed / 1e6:>11.2f}{'(mean only)':>25}")
+
+    coro = running_stats(k)
+    next(coro)
+    start = time.perf_counter()
+    for x in data:
+        stats = coro.send(x)
+    report("running_stats send(x)", time.perf_counter() - start, stats)
+
+    stats = StreamingStats(k)
+    start = time.perf_counter()
+    for x in data:
+        stats.add(x)
+    report("add(x)", time.perf_counter() - start, stats)
+
+    view = memoryview(data)
+    coro = running_stats(k)
+    next(coro)
+    start = time.perf_counter()
+    for i in range(0, n, batch_size):
+        stats = coro.send(view[i:i + batch_size])
+    report("send(buffer)", time.perf_counter() - start, stats)
+
+    # Four partial streams (e.g. one per worker), merged at the end
+    parts = [StreamingStats(k) for _ in range(4)]
+    start = time.perf_counter()
+    for j, i in enumerate(range(0, n, batch_size)):
+        parts[j % 4].update(view[i:i + batch_size])
+    merged = parts[0] + parts[1] + parts[2] + parts[3]
+    report("4 partials + merge", time.perf_counter() - start, merged)
+    print(f"variance: merged={merged.variance:.6g} exact={_exact_variance(data):.6g}")
+
+
+def _exact_variance(data) -> float:
+    mean = math.fsum(data) / len(data)
+    return math.fsum((x - mean) ** 2 for x in data) / (len(data) - 1)
+
+
+def demo() -> None:
+    coro = running_stats()
+    print(next(coro))                               # None, same as running_average
+    print(coro.send(10).mean)                       # 10.0
+    print(coro.send(20).mean)                       # 15.0
+    stats = coro.send(array("d", [30, 40, 50]))     # a whole buffer in one send
+    print(stats)
+    print(stats.summary())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--bench", action="store_true")
+    parser.add_argument("--values", type=int, default=1_000_000)
+    parser.add_argument("--batch", type=int, default=4096)
+    parser.add_argument("-k", type=int, default=200, help="KLL sketch size (rank error ~1/k)")
+    args = parser.parse_args()
+    if args.bench:
+        bench(args.values, args.batch, args.k)
+    else:
+        demo()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Synthetic daily log files for the log pipeline benchmarks
+
+Writes app-YYYY-MM-DD.log files shaped like the ones yield_from.py expects:
+
+2026-02-10 00:00:01.234 INFO  app.http - request handled customer=C0042 latency_ms=12
+
+Only a small fraction of lines are ERROR (error_rate), like real logs where
+almost everything a filter sees is discarded.
+
+Usage:
+    python -m py_dissection_lab.generators.synthetic_logs logs --files 7 --mb 256
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+from datetime import date, timedelta
+from pathlib import Path
+
+LEVELS = ("DEBUG", "INFO", "INFO", "INFO", "WARN")
+LOGGERS = ("app.http", "app.db", "app.cache", "app.auth", "app.billing", "app.worker")
+MESSAGES = (
+    "request handled",
+    "cache miss",
+    "query finished",
+    "token refreshed",
+    "job scheduled",
+    "retrying upstream call",
+)
+ERROR_MESSAGES = (
+    "upstream timeout",
+    "connection reset by peer",
+    "Traceback (most recent call last)",
+    "payment declined",
+    "FATAL disk quota exceeded",
+)
+
+
+def make_line(rng: random.Random, day: date, second: int, error_rate: float) -> str:
+    """One log line (with newline) at `second` seconds into `day`."""
+    millis = rng.randrange(1000)
+    hh, rem = divmod(second % 86400, 3600)
+    mm, ss = divmod(rem, 60)
+    if rng.random() < error_rate:
+        level, message = "ERROR", rng.choice(ERROR_MESSAGES)
+    else:
+        level, message = rng.choice(LEVELS), rng.choice(MESSAGES)
+    customer = rng.randrange(10000)
+    latency = rng.randrange(1, 2000)
+    return (
+        f"{day.isoformat()} {hh:02d}:{mm:02d}:{ss:02d}.{millis:03d} {level:<5} {rng.choice(LOGGERS)} - "
+        f"{message} customer=C{customer:04d} latency_ms={latency}\n"
+    )
+
+
+def write_synthetic_logs(
+    log_dir: Path,
+    files: int = 3,
+    mb_per_file: float = 16,
+    error_rate: float = 0.005,
+    start: date = date(2026, 2, 10),
+    seed: int = 0,
+    suffix: str = ".log",
+) -> list[Path]:
+    """
+    Write `files` daily logs of roughly `mb_per_file` MiB each and return their paths.
+
+    Output is deterministic for a given seed.
+    """
+    log_dir.mkdir(parents=True, exist_ok=True)
+    rng = random.Random(seed)
+    target = int(mb_per_file * 1024 * 1024)
+    paths = []
+
+    for i in range(files):
+        day = start + timedelta(days=i)
+        path = log_dir / f"app-{day.isoformat()}{suffix}"
+        written = 0
+        second = 0
+        with open(path, "w", encoding="utf-8") as f:
+            while written < target:
+                # Write in blocks of lines; one write() per line would dominate
+                block = "".join(make_line(rng, day, second + k // 20, error_rate) for k in range(2000))
+                second += 100
+                f.write(block)
+                written += len(block)
+        paths.append(path)
+
+    return paths
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("log_dir", type=Path)
+    parser.add_argument("--files", type=int, default=3)
+    parser.add_argument("--mb", type=float, default=16, help="approximate size of each file in MiB")
+    parser.add_argument("--error-rate", type=float, default=0.005)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    for path in write_synthetic_logs(args.log_dir, args.files, args.mb, args.error_rate, seed=args.seed):
+        print(path, f"{path.stat().st_size / 2**20:.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,288 @@
+"""
+TypedBag: the Bag from example_class.py for homogeneous numbers
+
+Bag(items) copies its input into a list: one pointer per slot plus one boxed
+Python object per item (24 bytes for an int, 24 for a float, on top of the 8-byte
+pointer), and all it can do is iterate.
+
+TypedBag stores the items in an array.array of one typecode instead:
+- 8 bytes per float64 / int64 item, no per-item objects, __slots__ on the class
+- O(1) len(), indexing, iteration like Bag (items are boxed only when handed out)
+- zero-copy export: memoryview(bag), numpy.asarray(bag), bytes(bag) ...
+  (Python 3.12+ buffer protocol via __buffer__)
+- multiset behaviour: count(x), counts(), remove(x)
+- membership: `x in bag` scans the array (vectorized with NumPy when it is
+  installed); build_index() adds a
+  value -> count dict so membership and count() are O(1). The index costs a dict
+  entry per *distinct* value, so it pays off for repetitive data (codes, ids,
+  bucketed latencies), not for 10^8 distinct floats.
+
+While a memoryview of the bag is alive the array can not be resized; add() /
+extend() / remove() raise BufferError until the view is released, the same rule
+as for array.array itself.
+
+Usage:
+    python -m py_dissection_lab.generators.typed_bag
+    python -m py_dissection_lab.generators.typed_bag --bench --sizes 1000000 10000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import sys
+import time
+from array import array
+from collections import Counter
+from typing import Iterable, Iterator
+
+from .._lazy import optional_module
+from .example_class import Bag
+
+# optional, imported on first use: vectorized scans for `in` / count() on unindexed bags
+np = optional_module("numpy")
+
+_SCAN_MIN = 256     # below this the plain array scan is cheaper than building a NumPy view
+_NATIVE = "@=<" if sys.byteorder == "little" else "@=>"
+_KINDS = {**dict.fromkeys("bhilq", "int"), **dict.fromkeys("BHILQ", "uint"), **dict.fromkeys("fd", "float")}
+
+
+def _same_layout(fmt: str, itemsize: int, typecode: str, typecode_size: int) -> bool:
+    # "<d" / "@d" / "d" are all a native double; "l" and "q" are the same int64 on Linux
+    if len(fmt) == 2 and fmt[0] in _NATIVE:
+        fmt = fmt[1]
+    return itemsize == typecode_size and fmt in _KINDS and _KINDS[fmt] == _KINDS.get(typecode)
+
+
+class TypedBag:
+    """Array-backed multiset of numbers of a single array typecode."""
+
+    __slots__ = ("_data", "_index")
+
+    def __init__(self, items: Iterable = (), typecode: str = "d", *, index: bool = False):
+        self._data = array(typecode)
+        self._index: Counter | None = None
+        self.extend(items)
+        if index:
+            self.build_index()
+
+    @classmethod
+    def from_buffer(cls, buffer, typecode: str = "d", *, index: bool = False) -> TypedBag:
+        """Build from anything exporting raw bytes (array, NumPy array, mmap ...) with one memcpy."""
+        bag = cls(typecode=typecode)
+        bag._data.frombytes(memoryview(buffer).cast("B"))
+        if index:
+            bag.build_index()
+        return bag
+
+    # ------------------------------------------------------------------
+    # Bag protocol
+    # ------------------------------------------------------------------
+    def __iter__(self) -> Iterator:
+        # Bag gibi: dizinin kendi iterator'ü; elemanlar ancak okunurken kutulanır
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            bag = TypedBag(typecode=self.typecode)
+            bag._data = self._data[i]
+            return bag
+        return self._data[i]
+
+    def __contains__(self, x) -> bool:
+        if self._index is not None:
+            return x in self._index
+        if (matches := self._scan(x)) is not None:
+            return bool(matches.any())
+        return x in self._data
+
+    def _scan(self, x):
+        # array's own `in` / count() box every item to compare it; NumPy compares in place
+        if np is None or len(self._data) < _SCAN_MIN or not isinstance(x, (int, float)):
+            return None
+        return np.frombuffer(self._data, dtype=self._data.typecode) == x
+
+    def __buffer__(self, flags: int) -> memoryview:
+        return memoryview(self._data)
+
+    def __release_buffer__(self, view: memoryview) -> None:
+        view.release()
+
+    def __eq__(self, other) -> bool:
+        # Multiset equality: same items, order ignored
+        if not isinstance(other, TypedBag):
+            return NotImplemented
+        return len(self) == len(other) and self.counts() == other.counts()
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        head = ", ".join(map(repr, self._data[:5]))
+        more = ", ..." if len(self._data) > 5 else ""
+        return f"TypedBag([{head}{more}], typecode={self.typecode!r}, len={len(self)})"
+
+    # ------------------------------------------------------------------
+    # Mutation
+    # ------------------------------------------------------------------
+    def add(self, x) -> None:
+        self._data.append(x)
+        if self._index is not None:
+            self._index[self._data[-1]] += 1
+
+    def extend(self, items: Iterable) -> None:
+        start = len(self._data)
+        if isinstance(items, array) and items.typecode == self._data.typecode:
+            self._data.extend(items)
+        elif isinstance(items, (TypedBag, memoryview)) or hasattr(items, "__array_interface__"):
+            # Buffer exporters with the same layout are copied in one go instead of
+            # item by item; any other format goes through the values, so a float64
+            # buffer is never reinterpreted as int64 bits
+            with memoryview(items) as view:
+                if _same_layout(view.format, view.itemsize, self._data.typecode, self._data.itemsize):
+                    self._data.frombytes(view.cast("B"))
+                elif view.ndim <= 1 and view.format.lstrip("@=") in _KINDS:
+                    self._data.extend(view.tolist())
+                else:
+                    raise TypeError(f"buffer format {view.format!r} does not match typecode {self.typecode!r}")
+        else:
+            self._data.extend(items)
+        if self._index is not None:
+            self._index.update(self._data[start:])
+
+    def remove(self, x) -> None:
+        """Remove one occurrence of x; ValueError if absent."""
+        if self._index is not None and not self._index.get(x):
+            raise ValueError(f"{x!r} not in bag")
+        self._data.remove(x)
+        if self._index is not None:
+            self._index[x] -= 1
+            if not self._index[x]:
+                del self._index[x]
+
+    # ------------------------------------------------------------------
+    # Multiset queries
+    # ------------------------------------------------------------------
+    def count(self, x) -> int:
+        if self._index is not None:
+            return self._index.get(x, 0)
+        if (matches := self._scan(x)) is not None:
+            return int(np.count_nonzero(matches))
+        return self._data.count(x)
+
+    def counts(self) -> Counter:
+        """value -> multiplicity (the index itself, copied, when there is one)."""
+        return Counter(self._index) if self._index is not None else Counter(self._data)
+
+    def build_index(self) -> None:
+        self._index = Counter(self._data)
+
+    def drop_index(self) -> None:
+        self._index = None
+
+    @property
+    def indexed(self) -> bool:
+        return self._index is not None
+
+    @property
+    def typecode(self) -> str:
+        return self._data.typecode
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes of item storage (not counting the optional index)."""
+        return self._data.itemsize * len(self._data)
+
+    def tobytes(self) -> bytes:
+        return self._data.tobytes()
+
+
+# ----------------------------------------------------------------------
+# Benchmark
+# ----------------------------------------------------------------------
+def _measure(build):
+    import tracemalloc
+
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    obj = build()
+    elapsed = time.perf_counter() - start
+    used = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return obj, used, elapsed
+
+
+def _timed(fn) -> tuple[object, float]:
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def bench(sizes: list[int]) -> None:
+    print(f"{'n':>12} {'container':<20}{'build s':>9}{'B/item':>8}{'iter sum s':>12}{'x in s':>9}{'count s':>9}")
+    for n in sizes:
+        distinct = 1000
+        make_items = lambda: (float(i % distinct) for i in range(n))     # repetitive values
+        missing = -1.0
+
+        rows = []
+        bag, used, build_s = _measure(lambda: Bag(make_items()))
+        _, iter_s = _timed(lambda: sum(bag))
+        _, in_s = _timed(lambda: missing in bag._items)
+        _, count_s = _timed(lambda: bag._items.count(0.0))
+        rows.append(("Bag (list)", build_s, used, iter_s, in_s, count_s))
+        del bag
+
+        tbag, used, build_s = _measure(lambda: TypedBag(make_items()))
+        _, iter_s = _timed(lambda: sum(tbag))
+        _, in_s = _timed(lambda: missing in tbag)
+        _, count_s = _timed(lambda: tbag.count(0.0))
+        rows.append(("TypedBag", build_s, used, iter_s, in_s, count_s))
+
+        _, index_s = _timed(tbag.build_index)
+        _, in_s = _timed(lambda: missing in tbag)
+        _, count_s = _timed(lambda: tbag.count(0.0))
+        rows.append((f"  + index ({index_s:.2f}s)", 0.0, used, iter_s, in_s, count_s))
+
+        if np is not None:
+            view = np.asarray(tbag)                 # zero copy: shares the array's memory
+            _, iter_s = _timed(lambda: float(view.sum()))
+            rows.append(("  numpy view", 0.0, 0, iter_s, float("nan"), float("nan")))
+            del view
+        del tbag
+
+        for name, build_s, used, iter_s, in_s, count_s in rows:
+            print(f"{n:>12,} {name:<20}{build_s:>9.2f}{used / n:>8.1f}{iter_s:>12.3f}{in_s:>9.4f}{count_s:>9.4f}")
+
+
+def demo() -> None:
+    b = TypedBag([3, 1, 3, 2], typecode="q")
+    for item in b:                  # Bag ile aynı kullanım
+        print(item)
+    print(len(b), 3 in b, b.count(3), b.counts())
+    view = memoryview(b)            # kopyasız
+    print(view.format, view.nbytes, view.tolist())
+    view.release()
+    b.build_index()
+    b.add(7)
+    b.remove(3)
+    print(b, b.counts())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--bench", action="store_true")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10**6, 10**7],
+                        help="10**8 needs ~4 GB for the list-backed Bag")
+    args = parser.parse_args()
+    if args.bench:
+        bench(args.sizes)
+    else:
+        demo()
+
+
+if __name__ == "__main__":
+    main()
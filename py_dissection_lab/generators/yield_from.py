@@ -0,0 +1,106 @@
+"""
+Diyelim ki logs klasöründe gün gün log dosyaları var:
+app-2026-02-10.log
+app-2026-02-11.log
+app-2026-02-12.log gibi..
+Amaç:
+- Dosyaları tek tek belleğe almdan
+- satır satır akıtarak
+- ERROR geçen satırları yakalamak
+Bu tarz akış + zincirleme işlerde yield from cuk diye oturur
+"""
+
+
+from pathlib import Path
+from typing import Iterator, Iterable
+
+from .compressed_logs import CODECS, PARALLEL, is_compressed, open_log
+
+
+# Firdt yield the log files in the given directory
+def iter_log_files(log_dir: Path, pattern: str = "*.log", compressed: bool = False) -> Iterator[Path]:
+    """
+    Yield log file paths in a deterministic order which is sorted by name
+
+    compressed=True also lists rotated files: pattern + ".gz" / ".bz2" / ".xz" / ".zst".
+    A compressed copy whose plain file is still there (rotation caught halfway)
+    is skipped, so no day is read twice.
+    """
+    paths = set(log_dir.glob(pattern))
+    if compressed:
+        for suffix in CODECS:
+            paths.update(p for p in log_dir.glob(pattern + suffix) if p.with_suffix("") not in paths)
+    yield from sorted(paths)
+
+
+# We are gonna use the func below in order to yield the lines without giving a fuck if it's error or not
+def iter_lines(path: Path, encoding: str ="utf-8") -> Iterator[str]:
+    """Yield lines from a file lazily (line by line); .gz/.bz2/.xz/.zst are decompressed on the fly"""
+    # düz dosyada open(path, "r", errors="replace") ile aynı; sıkıştırılmışta arka planda bir thread açar
+    with open_log(path, encoding) as f:
+        # f itself is an iterable over lines; yield from streams it outward.
+        yield from f
+
+
+# şimdi iter_log_files fonksiyonu ile verilen bir klasördeki log file'larını lazy şekilde
+# for döngüsü ile üreteceğiz. ardından da o file içindeki satırları da iter_log_lines ile
+# yine aynı şekilde lazyily üreteceğiz
+def iter_all_log_lines(log_dir: Path, compressed: bool = False, prefetch: int = 2 if PARALLEL else 0) -> Iterator[str]:
+    """
+    Treat many log files as a single continuous line stream
+
+    Only *.log by default, the same files the parallel, mmap and index scanners
+    see. compressed=True adds the rotated .gz/.bz2/.xz/.zst ones; while one file
+    is being read, the next `prefetch` compressed ones are already decompressing
+    in their own threads.
+    """
+    files = list(iter_log_files(log_dir, compressed=compressed))
+    ahead = {}  # path -> stream opened early, its thread already decompressing
+    try:
+        for i, file in enumerate(files):
+            for upcoming in files[i + 1:i + 1 + prefetch]:
+                if is_compressed(upcoming) and upcoming not in ahead:
+                    ahead[upcoming] = open_log(upcoming, threaded=True)
+            stream = ahead.pop(file, None)
+            if stream is None:
+                yield from iter_lines(file)
+            else:
+                with stream:
+                    yield from stream
+    finally:
+        for stream in ahead.values():
+            stream.close()
+
+def iter_error_lines(lines: Iterable[str]) -> Iterator[str]:
+    """Filter only error lines"""
+    for line in lines:
+        if "ERROR" in line:
+            yield line
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("log_dir", type=Path, nargs="?", default=Path("logs"))
+    parser.add_argument("--index", type=Path, help="only read what previous runs have not (see log_checkpoint.py)")
+    parser.add_argument("--follow", action="store_true", help="keep tailing new lines (needs --index)")
+    parser.add_argument("--compressed", action="store_true", help="also read rotated .gz/.bz2/.xz/.zst files")
+    args = parser.parse_args()
+    log_dir = args.log_dir
+
+    if args.index:
+        from .log_checkpoint import OffsetIndex, follow_lines, iter_new_lines
+
+        index = OffsetIndex(args.index)
+        lines = follow_lines(log_dir, index) if args.follow else iter_new_lines(log_dir, index)
+    else:
+        lines = iter_all_log_lines(log_dir, compressed=args.compressed)
+
+    # Pipeline: many files -> all lines -> error lines
+    error_stream = iter_error_lines(lines)
+
+    for line in error_stream:
+        print(line, end="", flush=args.follow)
+
+# Generator = iterable + iterator + lazy stream (tek kullanımlık akış)
\ No newline at end of file
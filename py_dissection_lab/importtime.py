@@ -0,0 +1,170 @@
+"""
+Cold-start budget: what importing the package costs a fresh interpreter
+
+Each CLI command's import path (COMMAND_PATHS: the cli plus the modules the
+command imports when it runs) is imported in a new `python -X importtime`
+process and the report is parsed. Only modules that the interpreter had not
+already loaded at startup show up there, so the sum of the top-level entries
+is the marginal cost of our imports (stdlib modules they pull in included).
+The fastest of `repeat` runs is compared to that command's own budget, so a
+slow import in one module can not hide in the headroom of the others.
+Bytecode is cached in a temporary PYTHONPYCACHEPREFIX, so only the first run
+compiles sources, as for an installed package, even where
+PYTHONDONTWRITEBYTECODE is set.
+
+A command path also fails when asyncio shows up in it (only async_pipelines
+needs it), and every public module, found by walking the package, is imported
+once to check that NumPy and zstd stay lazy: if one of them appears in the
+report, some module imports it at import time again, see _lazy.py.
+
+Usage:
+    python -m py_dissection_lab importtime
+    python -m py_dissection_lab importtime --module py_dissection_lab.generators.yield_from --budget-ms 25
+"""
+
+from __future__ import annotations
+
+import importlib
+import os
+import pkgutil
+import subprocess
+import sys
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+
+DEFAULT_BUDGET_MS = 60.0       # for --module lists
+MUST_STAY_LAZY = ("numpy", "zstandard", "compression.zstd")
+OFF_COMMAND_PATHS = ("asyncio",)
+
+_CLI = "py_dissection_lab.cli"
+_GEN = "py_dissection_lab.generators."
+# command: (modules it imports on a cold start, budget in ms). Best of 5 measured
+# on one core, Python 3.13: 3-7 ms each, 8-12 for --index and importtime, 28-35
+# for --workers (concurrent.futures.process and multiprocessing)
+COMMAND_PATHS: dict[str, tuple[tuple[str, ...], float]] = {
+    "--help": ((_CLI,), 10.0),
+    "palindromes": ((_CLI, _GEN + "palindrome_generator_all_demos"), 10.0),
+    "logscan": ((_CLI, _GEN + "yield_from"), 15.0),
+    "logscan --index": ((_CLI, _GEN + "log_checkpoint", _GEN + "yield_from"), 25.0),
+    "logscan --workers": ((_CLI, _GEN + "parallel_log_scan"), 60.0),
+    "push": ((_CLI, _GEN + "push_based_pipeline", _GEN + "yield_from"), 15.0),
+    "threading-demo": ((_CLI, "py_dissection_lab.threads.threading_event_wait_original"), 10.0),
+    "threading-demo --annotated": ((_CLI, "py_dissection_lab.threads.threading_event_wait_annotated"), 10.0),
+    "importtime": ((_CLI, "py_dissection_lab.importtime"), 25.0),
+}
+_MARK = "--- py_dissection_lab imports ---"
+
+
+def public_modules(package: str = "py_dissection_lab") -> list[str]:
+    """Every module and subpackage of `package`, minus the _private ones and __main__."""
+    path = importlib.import_module(package).__path__
+    return sorted(
+        info.name for info in pkgutil.walk_packages(path, package + ".")
+        if not any(part.startswith("_") for part in info.name.split(".")[1:])
+    )
+
+
+@dataclass(frozen=True)
+class ImportRecord:
+    name: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def measure(modules: list[str], python: str = sys.executable, env: dict | None = None) -> list[ImportRecord]:
+    """-X importtime records of importing `modules` into a fresh interpreter."""
+    code = f"import sys; print({_MARK!r}, file=sys.stderr, flush=True); import {', '.join(modules)}"
+    root = Path(__file__).resolve().parent.parent
+    done = subprocess.run(
+        [python, "-X", "importtime", "-c", code], cwd=root, env=env, capture_output=True, text=True
+    )
+    if done.returncode:
+        raise RuntimeError(f"importing {modules} failed:\n{done.stderr}")
+    records = []
+    lines = done.stderr.splitlines()
+    for line in lines[lines.index(_MARK) + 1:]:
+        if not line.startswith("import time:"):
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        records.append(ImportRecord(name.strip(), int(self_us), int(cumulative_us), depth))
+    return records
+
+
+def total_ms(records: list[ImportRecord]) -> float:
+    return sum(r.cumulative_us for r in records if r.depth == 0) / 1000
+
+
+def _bytecode_env() -> tuple[tempfile.TemporaryDirectory, dict]:
+    cache = tempfile.TemporaryDirectory()
+    env = {k: v for k, v in os.environ.items() if k != "PYTHONDONTWRITEBYTECODE"}
+    env["PYTHONPYCACHEPREFIX"] = cache.name
+    return cache, env
+
+
+def _runs(modules: list[str], repeat: int, python: str, env: dict) -> list[list[ImportRecord]]:
+    measure(modules, python, env)           # compiles and caches the bytecode
+    return [measure(modules, python, env) for _ in range(max(1, repeat))]
+
+
+def _found(records: list[ImportRecord], names: tuple[str, ...]) -> list[str]:
+    """Which of `names` (top-level packages or dotted modules) were imported."""
+    return sorted({r.name for r in records if r.name.split(".")[0] in names or r.name in names})
+
+
+def _print_slowest(records: list[ImportRecord], n: int = 12) -> None:
+    print(f"\n{'slowest (self)':<52}{'self ms':>9}{'cumul. ms':>11}")
+    for r in sorted(records, key=lambda r: r.self_us, reverse=True)[:n]:
+        print(f"{'  ' * r.depth + r.name:<52}{r.self_us / 1000:>9.2f}{r.cumulative_us / 1000:>11.2f}")
+
+
+def check(modules: list[str], budget_ms: float | None = None, repeat: int = 5, python: str = sys.executable) -> bool:
+    """Print the cost of importing `modules` and whether it fits `budget_ms`."""
+    budget_ms = DEFAULT_BUDGET_MS if budget_ms is None else budget_ms
+    cache, env = _bytecode_env()
+    with cache:
+        runs = _runs(modules, repeat, python, env)
+    best = min(runs, key=total_ms)
+    totals = sorted(total_ms(run) for run in runs)
+
+    print(f"{len(modules)} modules, {len(best)} imports, best of {len(runs)}: {totals[0]:.1f} ms "
+          f"(median {totals[len(totals) // 2]:.1f} ms), budget {budget_ms:.0f} ms")
+    _print_slowest(best)
+
+    eager = _found(best, MUST_STAY_LAZY)
+    ok = totals[0] <= budget_ms and not eager
+    if eager:
+        print(f"\nimported eagerly, should be lazy: {', '.join(eager)}")
+    print(f"\n{'OK' if ok else 'FAIL'}: {totals[0]:.1f} ms {'<=' if totals[0] <= budget_ms else '>'} {budget_ms:.0f} ms")
+    return ok
+
+
+def check_commands(repeat: int = 5, python: str = sys.executable) -> bool:
+    """Check every COMMAND_PATHS entry against its own budget, then laziness across the package."""
+    ok = True
+    cache, env = _bytecode_env()
+    with cache:
+        print(f"{'command':<28}{'imports':>8}{'best ms':>9}{'median':>8}{'budget':>8}")
+        for command, (modules, budget_ms) in COMMAND_PATHS.items():
+            runs = _runs(list(modules), repeat, python, env)
+            best = min(runs, key=total_ms)
+            totals = sorted(total_ms(run) for run in runs)
+            unwanted = _found(best, MUST_STAY_LAZY + OFF_COMMAND_PATHS)
+            fits = totals[0] <= budget_ms and not unwanted
+            ok = ok and fits
+            print(f"{command:<28}{len(best):>8}{totals[0]:>9.1f}{totals[len(totals) // 2]:>8.1f}"
+                  f"{budget_ms:>8.0f}  {'ok' if fits else 'FAIL'}"
+                  + (f"  imports {', '.join(sorted({n.split('.')[0] for n in unwanted}))}" if unwanted else ""))
+            if totals[0] > budget_ms:
+                _print_slowest(best, 6)
+
+        # Not a budget: async_pipelines legitimately pays for asyncio. Only laziness counts here
+        eager = _found(measure(public_modules(), python, env), MUST_STAY_LAZY)
+    if eager:
+        print(f"\nimported eagerly, should be lazy: {', '.join(eager)}")
+    ok = ok and not eager
+    print(f"\n{'OK' if ok else 'FAIL'}: {len(COMMAND_PATHS)} command paths"
+          f"{'' if eager else ', NumPy and zstd stay lazy in all modules'}")
+    return ok
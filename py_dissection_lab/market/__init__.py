@@ -0,0 +1 @@
+"""Limit order book, agent-based market simulation and its scenario runner."""
@@ -0,0 +1,847 @@
+"""
+Event-driven market simulation with an array-backed limit-order book
+
+Pieces:
+- Instrument   symbol, tick size and the price band (in ticks) the book covers
+- OrderBook    price-time priority matching engine, no per-order objects:
+    * every order lives in a slot of a struct-of-arrays pool
+      (qty, price, side, owner, next, prev, generation)
+    * every price level is a FIFO threaded through the pool by next/prev
+      (an intrusive doubly linked list), with head / tail / total qty per level
+      kept in flat per-side arrays indexed by price tick
+    * add() matches against the opposite side level by level, cancel() unlinks
+      in O(1); best bid / ask move by scanning the level arrays
+    * replay() applies a whole event stream (parallel arrays of kind, side,
+      price, qty, cancel reference) in one loop with the book state in locals;
+      this is the fast path, ~1M events/s on one core in CPython
+- Ledger       per-agent position and cash, updated by the book on every fill
+- Agents       NoiseTrader, MarketMaker, MomentumTrader; each wakes up at
+               exponentially distributed intervals and sends orders / cancels
+- Simulation   the event loop: a heap of (time, seq, agent) wake-ups
+
+Order handles returned by add() carry the slot generation, so cancelling an
+order that already filled (and whose slot was reused) is a no-op, not a bug.
+
+The benchmark (--bench) replays a seeded stream through replay() and through
+add() / cancel() / market(), then reports events/s, per-event latency
+percentiles for matching and non-matching events, and bytes per resting order
+next to a dict-per-order book.
+
+Usage:
+    python -m py_dissection_lab.market.market_simulation                     # run a small simulation
+    python -m py_dissection_lab.market.market_simulation --bench             # seeded benchmark
+    python -m py_dissection_lab.market.market_simulation --bench --events 2000000 --seed 7
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import heapq
+import math
+import random
+import time
+from array import array
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Sequence
+
+BUY, SELL = 0, 1
+ADD, CANCEL, MARKET = 0, 1, 2         # event kinds for OrderBook.replay()
+_NIL = -1
+_SLOT_BITS = 32
+_SLOT_MASK = (1 << _SLOT_BITS) - 1
+
+
+@dataclass(frozen=True)
+class Instrument:
+    symbol: str
+    tick_size: float = 0.01
+    min_tick: int = 1               # lowest price the book accepts, in ticks
+    max_tick: int = 20_000          # highest price the book accepts, in ticks
+
+    def to_ticks(self, price: float) -> int:
+        return round(price / self.tick_size)
+
+    def to_price(self, ticks: int) -> float:
+        return ticks * self.tick_size
+
+
+class Ledger:
+    """Position and cash (in ticks x qty) per agent id, kept in flat arrays."""
+
+    def __init__(self, agents: int):
+        self.position = array("q", bytes(8 * agents))
+        self.cash = array("q", bytes(8 * agents))
+
+    def equity(self, agent: int, mark: int) -> int:
+        return self.cash[agent] + self.position[agent] * mark
+
+
+class OrderBook:
+    """Limit-order book for one instrument; prices and quantities are integers."""
+
+    def __init__(self, instrument: Instrument, capacity: int = 1 << 14, ledger: Ledger | None = None):
+        self.instrument = instrument
+        self.lo = instrument.min_tick
+        self.hi = instrument.max_tick
+        levels = self.hi - self.lo + 1
+        self.ledger = ledger
+
+        # Per-level FIFO heads/tails and resting quantity, one set per side
+        self.bid_head = [_NIL] * levels
+        self.bid_tail = [_NIL] * levels
+        self.bid_qty = [0] * levels
+        self.ask_head = [_NIL] * levels
+        self.ask_tail = [_NIL] * levels
+        self.ask_qty = [0] * levels
+        self.best_bid = self.lo - 1     # below the band: no bids
+        self.best_ask = self.hi + 1     # above the band: no asks
+
+        # Order pool (struct of arrays) + free list threaded through `nxt`
+        self.qty = array("q")
+        self.price = array("i")
+        self.side = array("b")
+        self.owner = array("i")
+        self.nxt = array("i")
+        self.prv = array("i")
+        self.gen = array("i")
+        self.free = _NIL
+        self._grow(capacity)
+
+        self.resting = 0
+        self.trades = 0
+        self.volume = 0
+        self.last_price = 0
+
+    # ------------------------------------------------------------------
+    # Pool
+    # ------------------------------------------------------------------
+    def _grow(self, new_capacity: int) -> None:
+        old = len(self.qty)
+        added = new_capacity - old
+        self.qty.extend(array("q", [0]) * added)
+        self.price.extend(array("i", [0]) * added)
+        self.side.extend(array("b", [0]) * added)
+        self.owner.extend(array("i", [0]) * added)
+        self.prv.extend(array("i", [_NIL]) * added)
+        self.gen.extend(array("i", [0]) * added)
+        # New slots go on the free list in order: old, old + 1, ..., then the previous free list
+        self.nxt.extend(array("i", range(old + 1, new_capacity + 1)))
+        self.nxt[new_capacity - 1] = self.free
+        self.free = old
+
+    @property
+    def capacity(self) -> int:
+        return len(self.qty)
+
+    # ------------------------------------------------------------------
+    # Order entry
+    # ------------------------------------------------------------------
+    def add(self, side: int, price: int, qty: int, owner: int = 0) -> int:
+        """
+        Submit a limit order. Matches what it can, rests the remainder.
+
+        Returns a handle for cancel(), or -1 if nothing rests (fully filled).
+        """
+        if not self.lo <= price <= self.hi or qty <= 0:
+            raise ValueError(f"bad order: price {price} (band {self.lo}..{self.hi}), qty {qty}")
+        if side == BUY:
+            if price >= self.best_ask:
+                qty = self._match(BUY, price, qty, owner)
+                if not qty:
+                    return _NIL
+            tail, level_qty = self.bid_tail, self.bid_qty
+            if price > self.best_bid:
+                self.best_bid = price
+        else:
+            if price <= self.best_bid:
+                qty = self._match(SELL, price, qty, owner)
+                if not qty:
+                    return _NIL
+            tail, level_qty = self.ask_tail, self.ask_qty
+            if price < self.best_ask:
+                self.best_ask = price
+        slot = self.free
+        if slot == _NIL:
+            self._grow(2 * len(self.qty))
+            slot = self.free
+        nxt = self.nxt
+        self.free = nxt[slot]
+        self.qty[slot] = qty
+        self.price[slot] = price
+        self.side[slot] = side
+        self.owner[slot] = owner
+        # Kuyruğun sonuna ekle: seviyedeki FIFO, havuzdaki next/prev ile örülü
+        lvl = price - self.lo
+        last = tail[lvl]
+        self.prv[slot] = last
+        nxt[slot] = _NIL
+        if last == _NIL:
+            (self.bid_head if side == BUY else self.ask_head)[lvl] = slot
+        else:
+            nxt[last] = slot
+        tail[lvl] = slot
+        level_qty[lvl] += qty
+        self.resting += 1
+        return self.gen[slot] << _SLOT_BITS | slot
+
+    def market(self, side: int, qty: int, owner: int = 0) -> int:
+        """Immediate-or-cancel at any price; returns the filled quantity."""
+        if side == BUY:
+            left = self._match(BUY, self.hi, qty, owner) if self.best_ask <= self.hi else qty
+        else:
+            left = self._match(SELL, self.lo, qty, owner) if self.best_bid >= self.lo else qty
+        return qty - left
+
+    def _match(self, side: int, limit: int, qty: int, owner: int) -> int:
+        """Take liquidity from the opposite side up to `limit`; returns the unfilled qty."""
+        lo = self.lo
+        oqty, nxt, prv, gen = self.qty, self.nxt, self.prv, self.gen
+        ledger = self.ledger
+        if side == BUY:
+            head, tail, level_qty = self.ask_head, self.ask_tail, self.ask_qty
+            best, sign = self.best_ask, 1
+        else:
+            head, tail, level_qty = self.bid_head, self.bid_tail, self.bid_qty
+            best, sign = self.best_bid, -1
+        free = self.free
+        trades = volume = filled = 0
+        while qty and (best <= limit if sign > 0 else best >= limit):
+            lvl = best - lo
+            slot = head[lvl]
+            taken = 0
+            while qty and slot != _NIL:
+                resting = oqty[slot]
+                fill = resting if resting < qty else qty
+                qty -= fill
+                taken += fill
+                trades += 1
+                if ledger is not None:
+                    ledger.position[owner] += sign * fill
+                    ledger.position[self.owner[slot]] -= sign * fill
+                    ledger.cash[owner] -= sign * fill * best
+                    ledger.cash[self.owner[slot]] += sign * fill * best
+                if fill == resting:
+                    # Pop the head order; its slot goes back on the free list
+                    following = nxt[slot]
+                    nxt[slot] = free
+                    free = slot
+                    gen[slot] += 1
+                    filled += 1
+                    slot = following
+                else:
+                    oqty[slot] = resting - fill
+            level_qty[lvl] -= taken
+            volume += taken
+            self.last_price = best
+            head[lvl] = slot
+            if slot == _NIL:
+                tail[lvl] = _NIL
+                best = self._next_level(side, best)
+            else:
+                prv[slot] = _NIL
+        self.free = free
+        self.resting -= filled
+        self.trades += trades
+        self.volume += volume
+        if sign > 0:
+            self.best_ask = best
+        else:
+            self.best_bid = best
+        return qty
+
+    def _next_level(self, side: int, best: int) -> int:
+        """The next non-empty level on the side being taken (ask: up, bid: down)."""
+        lo = self.lo
+        if side == BUY:
+            head, hi = self.ask_head, self.hi
+            best += 1
+            while best <= hi and head[best - lo] == _NIL:
+                best += 1
+            return best
+        head = self.bid_head
+        best -= 1
+        while best >= lo and head[best - lo] == _NIL:
+            best -= 1
+        return best
+
+    # ------------------------------------------------------------------
+    # Cancel
+    # ------------------------------------------------------------------
+    def cancel(self, handle: int) -> bool:
+        """Remove a resting order; False if it already filled or was cancelled."""
+        slot = handle & _SLOT_MASK
+        if handle < 0 or slot >= len(self.gen) or self.gen[slot] != handle >> _SLOT_BITS:
+            return False
+        price = self.price[slot]
+        lvl = price - self.lo
+        if self.side[slot] == BUY:
+            head, tail, level_qty = self.bid_head, self.bid_tail, self.bid_qty
+        else:
+            head, tail, level_qty = self.ask_head, self.ask_tail, self.ask_qty
+        nxt, prv = self.nxt, self.prv
+        before, after = prv[slot], nxt[slot]
+        if before == _NIL:
+            head[lvl] = after
+        else:
+            nxt[before] = after
+        if after == _NIL:
+            tail[lvl] = before
+        else:
+            prv[after] = before
+        level_qty[lvl] -= self.qty[slot]
+        nxt[slot] = self.free
+        self.free = slot
+        self.gen[slot] += 1
+        self.resting -= 1
+        if head[lvl] == _NIL:
+            if self.side[slot] == BUY and price == self.best_bid:
+                self.best_bid = self._next_level(SELL, price)
+            elif self.side[slot] == SELL and price == self.best_ask:
+                self.best_ask = self._next_level(BUY, price)
+        return True
+
+    # ------------------------------------------------------------------
+    # Batched entry
+    # ------------------------------------------------------------------
+    def replay(self, kinds, sides, prices, qtys, refs, owners=None) -> array:
+        """
+        Apply a whole event stream in one call, the way a feed handler would.
+
+        Event i is kinds[i]: ADD (limit order), CANCEL or MARKET. A cancel names
+        the order it removes by the index of the ADD event that created it
+        (refs[i]), like exchange order reference numbers. Returns the handle of
+        every event (-1 if the event left nothing resting).
+
+        Same semantics as calling add() / cancel() / market() one by one, but the
+        book's state lives in local variables for the whole batch, so the
+        per-event cost is the bookkeeping itself, not attribute and method
+        lookups. Crossing orders still go through _match().
+        """
+        n = len(kinds)
+        out = array("q", [_NIL]) * n
+        lo, hi = self.lo, self.hi
+        oqty, oprice, oside, oowner = self.qty, self.price, self.side, self.owner
+        nxt, prv, gen = self.nxt, self.prv, self.gen
+        bid_head, bid_tail, bid_qty = self.bid_head, self.bid_tail, self.bid_qty
+        ask_head, ask_tail, ask_qty = self.ask_head, self.ask_tail, self.ask_qty
+        match, next_level = self._match, self._next_level
+        free, resting = self.free, self.resting
+        best_bid, best_ask = self.best_bid, self.best_ask
+        if owners is None:
+            owners = bytes(n)               # everything from agent 0
+        for i in range(n):
+            kind = kinds[i]
+            if kind == ADD:
+                side, price, qty, owner = sides[i], prices[i], qtys[i], owners[i]
+                if not lo <= price <= hi or qty <= 0:
+                    raise ValueError(f"event {i}: bad order: price {price}, qty {qty}")
+                if side == BUY:
+                    if price >= best_ask:
+                        self.free, self.resting, self.best_bid, self.best_ask = free, resting, best_bid, best_ask
+                        qty = match(BUY, price, qty, owner)
+                        free, resting, best_ask = self.free, self.resting, self.best_ask
+                        if not qty:
+                            continue
+                    head, tail, level_qty = bid_head, bid_tail, bid_qty
+                    if price > best_bid:
+                        best_bid = price
+                else:
+                    if price <= best_bid:
+                        self.free, self.resting, self.best_bid, self.best_ask = free, resting, best_bid, best_ask
+                        qty = match(SELL, price, qty, owner)
+                        free, resting, best_bid = self.free, self.resting, self.best_bid
+                        if not qty:
+                            continue
+                    head, tail, level_qty = ask_head, ask_tail, ask_qty
+                    if price < best_ask:
+                        best_ask = price
+                slot = free
+                if slot == _NIL:
+                    self.free = free
+                    self._grow(2 * len(oqty))
+                    slot = self.free
+                free = nxt[slot]
+                oqty[slot] = qty
+                oprice[slot] = price
+                oside[slot] = side
+                oowner[slot] = owner
+                lvl = price - lo
+                last = tail[lvl]
+                prv[slot] = last
+                nxt[slot] = _NIL
+                if last == _NIL:
+                    head[lvl] = slot
+                else:
+                    nxt[last] = slot
+                tail[lvl] = slot
+                level_qty[lvl] += qty
+                resting += 1
+                out[i] = gen[slot] << _SLOT_BITS | slot
+            elif kind == CANCEL:
+                handle = out[refs[i]]
+                slot = handle & _SLOT_MASK
+                if handle < 0 or gen[slot] != handle >> _SLOT_BITS:
+                    continue                    # already filled or cancelled
+                price = oprice[slot]
+                lvl = price - lo
+                if oside[slot] == BUY:
+                    head, tail, level_qty = bid_head, bid_tail, bid_qty
+                else:
+                    head, tail, level_qty = ask_head, ask_tail, ask_qty
+                before, after = prv[slot], nxt[slot]
+                if before == _NIL:
+                    head[lvl] = after
+                else:
+                    nxt[before] = after
+                if after == _NIL:
+                    tail[lvl] = before
+                else:
+                    prv[after] = before
+                level_qty[lvl] -= oqty[slot]
+                nxt[slot] = free
+                free = slot
+                gen[slot] += 1
+                resting -= 1
+                if head[lvl] == _NIL:
+                    if price == best_bid:
+                        best_bid = next_level(SELL, price)
+                    elif price == best_ask:
+                        best_ask = next_level(BUY, price)
+            else:
+                side = sides[i]
+                if (best_ask <= hi) if side == BUY else (best_bid >= lo):
+                    self.free, self.resting, self.best_bid, self.best_ask = free, resting, best_bid, best_ask
+                    match(side, hi if side == BUY else lo, qtys[i], owners[i])
+                    free, resting, best_bid, best_ask = self.free, self.resting, self.best_bid, self.best_ask
+        self.free, self.resting, self.best_bid, self.best_ask = free, resting, best_bid, best_ask
+        return out
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+    def mid(self) -> float | None:
+        if self.best_bid < self.lo or self.best_ask > self.hi:
+            return None
+        return (self.best_bid + self.best_ask) / 2
+
+    def depth(self, side: int, levels: int = 5) -> list[tuple[int, int]]:
+        """[(price, total qty)] for the best `levels` non-empty levels of one side."""
+        out = []
+        lo = self.lo
+        if side == BUY:
+            price, step, stop, level_qty = self.best_bid, -1, lo - 1, self.bid_qty
+        else:
+            price, step, stop, level_qty = self.best_ask, 1, self.hi + 1, self.ask_qty
+        while price != stop and len(out) < levels:
+            if level_qty[price - lo]:
+                out.append((price, level_qty[price - lo]))
+            price += step
+        return out
+
+    def memory_bytes(self) -> int:
+        pool = sum(a.itemsize * len(a) for a in (self.qty, self.price, self.side, self.owner,
+                                                   self.nxt, self.prv, self.gen))
+        return pool
+
+    def __repr__(self) -> str:
+        return (f"OrderBook({self.instrument.symbol}, bid={self.best_bid}, ask={self.best_ask}, "
+                f"resting={self.resting}, trades={self.trades})")
+
+
+# ----------------------------------------------------------------------
+# Agents
+# ----------------------------------------------------------------------
+class Agent:
+    """Something that wakes up now and then and sends orders to one instrument."""
+
+    def __init__(self, agent_id: int, symbol: str, rate: float = 1.0):
+        self.agent_id = agent_id
+        self.symbol = symbol
+        self.rate = rate                # mean wake-ups per unit of simulated time
+        self.live: deque[int] = deque() # handles of this agent's resting orders
+
+    def act(self, sim: Simulation, book: OrderBook, rng: random.Random) -> None:
+        raise NotImplementedError
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(id={self.agent_id}, {self.symbol})"
+
+
+class NoiseTrader(Agent):
+    """Limit orders scattered around a fair value, cancels its oldest order now and then."""
+
+    def __init__(self, agent_id: int, symbol: str, rate: float = 1.0,
+                 spread: float = 5.0, max_qty: int = 10, cancel_prob: float = 0.4, max_live: int = 20):
+        super().__init__(agent_id, symbol, rate)
+        self.spread = spread
+        self.max_qty = max_qty
+        self.cancel_prob = cancel_prob
+        self.max_live = max_live
+
+    def act(self, sim, book, rng):
+        if self.live and (rng.random() < self.cancel_prob or len(self.live) >= self.max_live):
+            sim.cancel(book, self.live.popleft())
+            return
+        side = rng.getrandbits(1)
+        fair = sim.fair_value(book)
+        # Çoğunlukla pasif emir; küçük bir kısmı karşı tarafa geçer ve eşleşir
+        offset = round(rng.gauss(0.0, self.spread))
+        price = fair - offset if side == BUY else fair + offset
+        price = min(max(price, book.lo), book.hi)
+        handle = sim.limit(book, side, price, 1 + rng.randrange(self.max_qty), self.agent_id)
+        if handle >= 0:
+            self.live.append(handle)
+
+
+class MarketMaker(Agent):
+    """Re-quotes both sides around the mid, skewing the quotes against its inventory."""
+
+    def __init__(self, agent_id: int, symbol: str, rate: float = 5.0,
+                 half_spread: int = 2, size: int = 20, skew: float = 0.05):
+        super().__init__(agent_id, symbol, rate)
+        self.half_spread = half_spread
+        self.size = size
+        self.skew = skew
+
+    def act(self, sim, book, rng):
+        while self.live:
+            sim.cancel(book, self.live.pop())
+        centre = sim.fair_value(book) - round(self.skew * sim.ledger.position[self.agent_id])
+        for side, price in ((BUY, centre - self.half_spread), (SELL, centre + self.half_spread)):
+            if book.lo <= price <= book.hi:
+                handle = sim.limit(book, side, price, self.size, self.agent_id)
+                if handle >= 0:
+                    self.live.append(handle)
+
+
+class MomentumTrader(Agent):
+    """Market orders in the direction the last trade price moved since its last look."""
+
+    def __init__(self, agent_id: int, symbol: str, rate: float = 0.5, threshold: int = 2, qty: int = 5):
+        super().__init__(agent_id, symbol, rate)
+        self.threshold = threshold
+        self.qty = qty
+        self.seen = 0
+
+    def act(self, sim, book, rng):
+        last = book.last_price
+        if self.seen and abs(last - self.seen) >= self.threshold:
+            sim.market(book, BUY if last > self.seen else SELL, self.qty, self.agent_id)
+        self.seen = last
+
+
+# ----------------------------------------------------------------------
+# Event loop
+# ----------------------------------------------------------------------
+@dataclass
+class SimResult:
+    events: int
+    trades: int
+    volume: int
+    seconds: float
+    mids: dict[str, array] = field(repr=False)         # mid (ticks) at every whole time unit
+    equity: array = field(repr=False)                  # per agent, marked at the last trade price
+
+    @property
+    def events_per_sec(self) -> float:
+        return self.events / self.seconds if self.seconds else 0.0
+
+
+class Simulation:
+    """
+    Discrete-event loop: every agent wakes up at exponential intervals
+    (a Poisson process with its own rate), in time order, from one heap.
+
+    `reference` optionally gives a fair-value path per symbol, one tick price
+    per whole time unit (read-only input, e.g. a historical series); without
+    it agents anchor on the current mid.
+    """
+
+    def __init__(self, instruments: Sequence[Instrument], agents: Sequence[Agent], seed: int = 0,
+                 reference: dict[str, Sequence[int]] | None = None):
+        self.rng = random.Random(seed)
+        self.ledger = Ledger(max((a.agent_id for a in agents), default=-1) + 1)
+        self.books = {inst.symbol: OrderBook(inst, ledger=self.ledger) for inst in instruments}
+        self.agents = list(agents)
+        self.reference = reference or {}
+        self.now = 0.0
+        self.events = 0
+
+    # Agents go through these so every order event is counted
+    def limit(self, book: OrderBook, side: int, price: int, qty: int, owner: int) -> int:
+        self.events += 1
+        return book.add(side, price, qty, owner)
+
+    def cancel(self, book: OrderBook, handle: int) -> bool:
+        self.events += 1
+        return book.cancel(handle)
+
+    def market(self, book: OrderBook, side: int, qty: int, owner: int) -> int:
+        self.events += 1
+        return book.market(side, qty, owner)
+
+    def fair_value(self, book: OrderBook) -> int:
+        path = self.reference.get(book.instrument.symbol)
+        if path:
+            return path[min(int(self.now), len(path) - 1)]
+        mid = book.mid()
+        if mid is not None:
+            return round(mid)
+        if book.last_price:
+            return book.last_price
+        return (book.lo + book.hi) // 2
+
+    def run(self, until: float) -> SimResult:
+        rng, books = self.rng, self.books
+        heap = [(rng.expovariate(a.rate), i) for i, a in enumerate(self.agents)]
+        heapq.heapify(heap)
+        mids = {symbol: array("d") for symbol in books}
+        next_sample = 0
+        start = time.perf_counter()
+        while heap and heap[0][0] < until:
+            now, i = heap[0]
+            while next_sample <= now:
+                for symbol, book in books.items():
+                    mid = book.mid()
+                    mids[symbol].append(mid if mid is not None else math.nan)
+                next_sample += 1
+            self.now = now
+            agent = self.agents[i]
+            agent.act(self, books[agent.symbol], rng)
+            heapq.heapreplace(heap, (now + rng.expovariate(agent.rate), i))
+        seconds = time.perf_counter() - start
+        equity = array("q", (self.ledger.equity(a.agent_id, books[a.symbol].last_price) for a in self.agents))
+        return SimResult(
+            events=self.events,
+            trades=sum(b.trades for b in books.values()),
+            volume=sum(b.volume for b in books.values()),
+            seconds=seconds,
+            mids=mids,
+            equity=equity,
+        )
+
+
+def build_simulation(seed: int = 0, symbols: Sequence[str] = ("AAA", "BBB"), noise: int = 200,
+                     makers: int = 4, momentum: int = 20, start_tick: int = 10_000,
+                     reference: dict[str, Sequence[int]] | None = None) -> Simulation:
+    """A ready-made market: the same agent mix on every symbol."""
+    instruments = [Instrument(s) for s in symbols]
+    agents: list[Agent] = []
+    for symbol in symbols:
+        for _ in range(makers):
+            agents.append(MarketMaker(len(agents), symbol))
+        for _ in range(noise):
+            agents.append(NoiseTrader(len(agents), symbol))
+        for _ in range(momentum):
+            agents.append(MomentumTrader(len(agents), symbol))
+    sim = Simulation(instruments, agents, seed, reference)
+    for book in sim.books.values():
+        book.last_price = start_tick
+        # Seed both sides so the first agents have a mid to anchor on
+        book.add(BUY, start_tick - 1, 1)
+        book.add(SELL, start_tick + 1, 1)
+    return sim
+
+
+# ----------------------------------------------------------------------
+# Benchmark
+# ----------------------------------------------------------------------
+def make_order_stream(n: int, seed: int, instrument: Instrument, target_depth: int = 5_000):
+    """
+    A deterministic event stream (kinds, sides, prices, qtys, refs) for replay().
+
+    Prices are chosen against a shadow book that is fed the same events, so
+    orders land around the real touch: mostly passive adds near the spread, a
+    few marketable ones, market orders, and cancels of random live orders,
+    with the cancel rate keeping roughly `target_depth` orders resting.
+    """
+    rng = random.Random(seed)
+    shadow = OrderBook(instrument)
+    centre = (instrument.min_tick + instrument.max_tick) // 2
+    kinds, sides = array("b", bytes(n)), array("b", bytes(n))
+    prices, qtys, refs = (array("i", bytes(4 * n)) for _ in range(3))
+    handles = array("q", [_NIL]) * n
+    live: list[int] = []
+    for i in range(n):
+        side = rng.getrandbits(1)
+        qty = 1 + rng.randrange(10)
+        u = rng.random()
+        add_share = 0.60 if len(live) < target_depth else 0.45
+        if u < add_share or not live:
+            bid = shadow.best_bid if shadow.best_bid >= shadow.lo else centre - 1
+            ask = shadow.best_ask if shadow.best_ask <= shadow.hi else bid + 2
+            if rng.random() < 0.04:
+                price = ask if side == BUY else bid            # marketable limit
+            else:
+                away = int(rng.expovariate(0.3))
+                price = min(ask - 1, bid - away + 1) if side == BUY else max(bid + 1, ask + away - 1)
+            kinds[i], prices[i] = ADD, price
+            handles[i] = shadow.add(side, price, qty)
+            if handles[i] >= 0:
+                live.append(i)
+        elif u < 0.93:
+            j = rng.randrange(len(live))
+            live[j], live[-1] = live[-1], live[j]
+            kinds[i], refs[i] = CANCEL, live.pop()
+            shadow.cancel(handles[refs[i]])
+        else:
+            kinds[i] = MARKET
+            shadow.market(side, qty)
+        sides[i], qtys[i] = side, qty
+    return kinds, sides, prices, qtys, refs
+
+
+def _per_call(book: OrderBook, stream) -> None:
+    """The same stream through add() / cancel() / market(), one call per event."""
+    add, cancel, market = book.add, book.cancel, book.market
+    handles = array("q", [_NIL]) * len(stream[0])
+    for i, (kind, side, price, qty, ref) in enumerate(zip(*stream)):
+        if kind == ADD:
+            handles[i] = add(side, price, qty)
+        elif kind == CANCEL:
+            cancel(handles[ref])
+        else:
+            market(side, qty)
+
+
+def _latencies(instrument: Instrument, stream) -> tuple[list[int], list[int], int]:
+    """Per-event ns, split into events that traded and events that did not, and the timer's own cost."""
+    clock = time.perf_counter_ns
+    timer = min(-(clock() - clock()) for _ in range(10_000))
+    book = OrderBook(instrument)
+    add, cancel, market = book.add, book.cancel, book.market
+    handles = array("q", [_NIL]) * len(stream[0])
+    matched, passive = [], []
+    for i, (kind, side, price, qty, ref) in enumerate(zip(*stream)):
+        trades = book.trades
+        if kind == ADD:
+            t0 = clock()
+            handles[i] = add(side, price, qty)
+            t1 = clock()
+        elif kind == CANCEL:
+            handle = handles[ref]
+            t0 = clock()
+            cancel(handle)
+            t1 = clock()
+        else:
+            t0 = clock()
+            market(side, qty)
+            t1 = clock()
+        (matched if book.trades != trades else passive).append(t1 - t0 - timer)
+    return matched, passive, timer
+
+
+def _percentiles(values: list[int]) -> str:
+    values.sort()
+    pick = lambda q: values[min(len(values) - 1, int(q * len(values)))]
+    return "  ".join(f"p{q * 100:g}={pick(q):>6,}" for q in (0.5, 0.9, 0.99, 0.999)) + f"  max={values[-1]:,}"
+
+
+def _memory_per_order(instrument: Instrument, orders: int) -> tuple[float, float]:
+    """(bytes per resting order in the array book, same for a dict-per-order book) via tracemalloc."""
+    import tracemalloc
+
+    rng = random.Random(0)
+    centre = (instrument.min_tick + instrument.max_tick) // 2
+    sides = [rng.getrandbits(1) for _ in range(orders)]
+    offsets = [1 + rng.randrange(500) for _ in range(orders)]
+
+    gc.collect()
+    tracemalloc.start()
+    book = OrderBook(instrument, capacity=1)
+    base = tracemalloc.get_traced_memory()[0]
+    for side, off in zip(sides, offsets):
+        book.add(side, centre - off if side == BUY else centre + off, 10)
+    array_bytes = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+    del book
+
+    # The textbook layout: an order dict per order, id -> order, a deque per price level
+    gc.collect()
+    tracemalloc.start()
+    by_id, levels = {}, {}
+    for oid, (side, off) in enumerate(zip(sides, offsets)):
+        price = centre - off if side == BUY else centre + off
+        order = {"id": oid, "side": side, "price": price, "qty": 10, "owner": 0}
+        by_id[oid] = order
+        levels.setdefault((side, price), deque()).append(order)
+    dict_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return array_bytes / orders, dict_bytes / orders
+
+
+def bench(events: int, seed: int, repeat: int = 5, resting: int = 1_000_000) -> None:
+    instrument = Instrument("BENCH")
+    start = time.perf_counter()
+    stream = make_order_stream(events, seed, instrument)
+    print(f"stream: {events:,} events (seed {seed}), generated in {time.perf_counter() - start:.1f}s;"
+          f" {sum(k == ADD for k in stream[0]):,} add / {sum(k == CANCEL for k in stream[0]):,} cancel"
+          f" / {sum(k == MARKET for k in stream[0]):,} market")
+
+    # Throughput: best of `repeat`, the two entry points interleaved against machine noise
+    best = {"replay()": math.inf, "add/cancel/market": math.inf}
+    for _ in range(repeat):
+        book = OrderBook(instrument)
+        t = time.perf_counter()
+        book.replay(*stream)
+        best["replay()"] = min(best["replay()"], time.perf_counter() - t)
+        other = OrderBook(instrument)
+        t = time.perf_counter()
+        _per_call(other, stream)
+        best["add/cancel/market"] = min(best["add/cancel/market"], time.perf_counter() - t)
+    assert (book.trades, book.volume, book.resting) == (other.trades, other.volume, other.resting)
+    print(f"book after replay: {book.trades:,} trades, {book.volume:,} volume, {book.resting:,} resting")
+    for name, seconds in best.items():
+        print(f"  {name:<20}{events / seconds:>12,.0f} events/s  ({seconds * 1e9 / events:.0f} ns/event)")
+
+    matched, passive, timer = _latencies(instrument, stream)
+    print(f"latency per event, ns (per-call API, timer cost {timer} ns subtracted):")
+    print(f"  matching ({len(matched):,}): {_percentiles(matched)}")
+    print(f"  resting/cancel ({len(passive):,}): {_percentiles(passive)}")
+
+    array_bytes, dict_bytes = _memory_per_order(instrument, resting)
+    print(f"memory per resting order ({resting:,} orders): {array_bytes:.1f} B array book"
+          f" (pool {OrderBook(instrument, capacity=1).memory_bytes()} B/slot),"
+          f" {dict_bytes:.1f} B dict-per-order book")
+
+    sim = build_simulation(seed)
+    result = sim.run(until=500)
+    print(f"agent simulation: {result.events:,} order events in {result.seconds:.2f}s"
+          f" = {result.events_per_sec:,.0f} events/s, {result.trades:,} trades")
+
+
+def demo() -> None:
+    book = OrderBook(Instrument("DEMO", min_tick=90, max_tick=110))
+    a = book.add(SELL, 101, 5, owner=1)
+    book.add(SELL, 101, 3, owner=2)                 # aynı seviyede, a'nın arkasında
+    book.add(SELL, 103, 4, owner=3)
+    book.add(BUY, 99, 6, owner=4)
+    print(book, book.depth(BUY), book.depth(SELL))
+    print("filled", book.market(BUY, 7, owner=5))    # önce a (5), sonra 2'nin 2'si: FIFO
+    print(book, book.depth(SELL), "cancel a again:", book.cancel(a))
+
+    sim = build_simulation(seed=1, noise=50, momentum=5)
+    result = sim.run(until=100)
+    print(result, f"{result.events_per_sec:,.0f} events/s")
+    for symbol, book in sim.books.items():
+        print(book, "mid path:", [m for m in result.mids[symbol][::20]])
+    print("equity sums to zero:", sum(result.equity) == 0)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--bench", action="store_true")
+    parser.add_argument("--events", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    if args.bench:
+        bench(args.events, args.seed, args.repeat)
+    else:
+        demo()
+
+
+if __name__ == "__main__":
+    main()
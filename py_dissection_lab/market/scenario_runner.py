@@ -0,0 +1,451 @@
+"""
+Monte-Carlo scenario runner for market_simulation.py
+
+A scenario is one seeded Simulation.run(): a reference price path per symbol
+(the fair value the agents anchor on) plus one row of an agent-config table
+(how many noise traders / makers / momentum traders, and their parameters).
+Thousands of them run per night, so:
+
+- read-only inputs (paths, config table) are written once into a
+  multiprocessing.shared_memory block; every worker attaches to it in the pool
+  initializer and reads the arrays in place, so a task is only
+  (first scenario, count, base seed) - a few dozen pickled bytes instead of
+  the whole input set per task
+- scenarios go out in chunks, at most `max_in_flight` chunks at a time, and
+  results stream back chunk by chunk as they finish (unordered), the same
+  bounded-window pattern as parallel_log_scan.py
+- every chunk also returns a partial ScenarioSummary; the parent merges the
+  partials, so aggregation is never a pass over all results. The summaries
+  are mergeable: count / mean / stddev / min / max (Chan) plus quantiles from
+  a relative-error log-bucket sketch whose buckets simply add up
+
+Scenario i uses path i % paths and config row i % configs, seed base_seed + i,
+so a run is reproducible whatever the worker count or chunk size.
+
+Usage:
+    python -m py_dissection_lab.market.scenario_runner --scenarios 200
+    python -m py_dissection_lab.market.scenario_runner --bench --scenarios 10000
+"""
+
+from __future__ import annotations
+
+import argparse
+import math
+import os
+import pickle
+import random
+import time
+from array import array
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Iterator, NamedTuple, Sequence
+
+from ..generators.streaming_stats import RunningMoments
+from .market_simulation import (
+    Agent,
+    Instrument,
+    MarketMaker,
+    MomentumTrader,
+    NoiseTrader,
+    Simulation,
+)
+
+# Columns of the agent-config table (one float64 row per config)
+CONFIG_COLUMNS = (
+    "noise", "makers", "momentum",
+    "noise_spread", "cancel_prob", "half_spread", "maker_size", "momentum_threshold",
+)
+_HEADER = 4     # int64 words: symbols, path length, paths, configs
+
+
+# ----------------------------------------------------------------------
+# Mergeable summaries
+# ----------------------------------------------------------------------
+class QuantileSketch:
+    """
+    Quantiles with relative error `alpha` from log-spaced buckets.
+
+    x > 0 goes to bucket ceil(log_gamma(x)), gamma = (1 + alpha) / (1 - alpha),
+    negatives to a mirrored set, zeros to their own counter. Two sketches with
+    the same alpha merge by adding bucket counts, so merging is exact.
+    """
+
+    def __init__(self, alpha: float = 0.01):
+        self.alpha = alpha
+        self._log_gamma = math.log((1 + alpha) / (1 - alpha))
+        self.pos: dict[int, int] = {}
+        self.neg: dict[int, int] = {}
+        self.zeros = 0
+        self.count = 0
+
+    def add(self, x: float) -> None:
+        self.count += 1
+        if x > 0:
+            key = math.ceil(math.log(x) / self._log_gamma)
+            self.pos[key] = self.pos.get(key, 0) + 1
+        elif x < 0:
+            key = math.ceil(math.log(-x) / self._log_gamma)
+            self.neg[key] = self.neg.get(key, 0) + 1
+        else:
+            self.zeros += 1
+
+    def merge(self, other: QuantileSketch) -> QuantileSketch:
+        if other.alpha != self.alpha:
+            raise ValueError("cannot merge sketches with different alpha")
+        for mine, theirs in ((self.pos, other.pos), (self.neg, other.neg)):
+            for key, n in theirs.items():
+                mine[key] = mine.get(key, 0) + n
+        self.zeros += other.zeros
+        self.count += other.count
+        return self
+
+    def _value(self, key: int) -> float:
+        # Bucket (gamma^(key-1), gamma^key]: this point is within alpha of all of it
+        return 2 * math.exp(key * self._log_gamma) / (1 + math.exp(self._log_gamma))
+
+    def quantile(self, q: float) -> float:
+        if not self.count:
+            return math.nan
+        rank = q * (self.count - 1)
+        seen = 0
+        for key in sorted(self.neg, reverse=True):      # most negative first
+            seen += self.neg[key]
+            if seen > rank:
+                return -self._value(key)
+        seen += self.zeros
+        if seen > rank:
+            return 0.0
+        for key in sorted(self.pos):
+            seen += self.pos[key]
+            if seen > rank:
+                return self._value(key)
+        return self._value(max(self.pos))
+
+
+class MetricSummary(RunningMoments):
+    """
+    count / mean / stddev / min / max (RunningMoments, Chan-mergeable) plus a
+    QuantileSketch. NaN values (a metric a scenario could not compute) are skipped.
+    """
+
+    def __init__(self, alpha: float = 0.01):
+        super().__init__()
+        self.sketch = QuantileSketch(alpha)
+
+    def add(self, x: float) -> None:
+        if math.isnan(x):
+            return
+        super().add(x)
+        self.sketch.add(x)
+
+    def merge(self, other: MetricSummary) -> MetricSummary:
+        if other.count:
+            super().merge(other)
+            self.sketch.merge(other.sketch)
+        return self
+
+    def quantile(self, q: float) -> float:
+        return self.sketch.quantile(q)
+
+
+class ScenarioResult(NamedTuple):
+    scenario: int
+    seed: int
+    path: int
+    config: int
+    events: int
+    trades: int
+    volume: int
+    ret: float          # last mid / first mid - 1, averaged over symbols
+    vol: float          # stddev of per-step mid returns, averaged over symbols
+    maker_pnl: float    # market makers' equity at the end, in ticks x qty
+
+
+METRICS = ("events", "trades", "volume", "ret", "vol", "maker_pnl")
+
+
+class ScenarioSummary:
+    """One MetricSummary per result field in METRICS."""
+
+    def __init__(self, alpha: float = 0.01):
+        self.metrics = {name: MetricSummary(alpha) for name in METRICS}
+
+    def add(self, result: ScenarioResult) -> None:
+        for name, summary in self.metrics.items():
+            summary.add(getattr(result, name))
+
+    def merge(self, other: ScenarioSummary) -> ScenarioSummary:
+        for name, summary in self.metrics.items():
+            summary.merge(other.metrics[name])
+        return self
+
+    @property
+    def count(self) -> int:
+        return self.metrics["events"].count
+
+    def report(self) -> str:
+        lines = [f"{'metric':<11}{'mean':>12}{'stddev':>12}{'min':>12}{'p5':>12}{'p50':>12}{'p95':>12}{'max':>12}"]
+        for name, s in self.metrics.items():
+            cells = (s.mean, s.stddev, s.min, s.quantile(0.05), s.quantile(0.5), s.quantile(0.95), s.max)
+            lines.append(f"{name:<11}" + "".join(f"{v:>12.4g}" for v in cells))
+        return "\n".join(lines)
+
+
+# ----------------------------------------------------------------------
+# Read-only inputs in shared memory
+# ----------------------------------------------------------------------
+@dataclass
+class ScenarioInputs:
+    """Reference paths (int ticks, paths x symbols x steps) and the agent-config table."""
+
+    symbols: tuple[str, ...]
+    steps: int
+    paths: array                    # "i", flattened [path][symbol][step]
+    configs: array                  # "d", flattened [config][column]
+
+    @property
+    def n_paths(self) -> int:
+        return len(self.paths) // (len(self.symbols) * self.steps)
+
+    @property
+    def n_configs(self) -> int:
+        return len(self.configs) // len(CONFIG_COLUMNS)
+
+    def path(self, index: int, symbol: int) -> Sequence[int]:
+        start = (index * len(self.symbols) + symbol) * self.steps
+        return self.paths[start:start + self.steps]
+
+    def config(self, index: int) -> dict[str, float]:
+        width = len(CONFIG_COLUMNS)
+        return dict(zip(CONFIG_COLUMNS, self.configs[index * width:(index + 1) * width]))
+
+    def nbytes(self) -> int:
+        return _HEADER * 8 + self.paths.itemsize * len(self.paths) + self.configs.itemsize * len(self.configs)
+
+    def to_shared(self) -> shared_memory.SharedMemory:
+        """Copy into a new shared-memory block; the caller closes and unlinks it."""
+        shm = shared_memory.SharedMemory(create=True, size=self.nbytes())
+        header = array("q", [len(self.symbols), self.steps, self.n_paths, self.n_configs])
+        at = 0
+        for part in (header, self.paths, self.configs):
+            raw = memoryview(part).cast("B")
+            shm.buf[at:at + len(raw)] = raw
+            at += len(raw)
+        return shm
+
+    @classmethod
+    def attach(cls, buf: memoryview, symbols: tuple[str, ...]) -> ScenarioInputs:
+        """Views straight into a shared-memory buffer (no copy)."""
+        n_symbols, steps, n_paths, n_configs = buf[:_HEADER * 8].cast("q")
+        if n_symbols != len(symbols):
+            raise ValueError(f"shared inputs have {n_symbols} symbols, got {len(symbols)} names")
+        at = _HEADER * 8
+        size = n_paths * n_symbols * steps * 4
+        paths = buf[at:at + size].cast("i")
+        configs = buf[at + size:at + size + n_configs * len(CONFIG_COLUMNS) * 8].cast("d")
+        return cls(symbols, steps, paths, configs)
+
+
+def synthetic_inputs(paths: int = 64, configs: int = 16, steps: int = 50,
+                     symbols: Sequence[str] = ("AAA", "BBB"), seed: int = 0) -> ScenarioInputs:
+    """Random-walk reference paths and a grid of agent configs, for demos and benchmarks."""
+    rng = random.Random(seed)
+    flat = array("i")
+    for _ in range(paths * len(symbols)):
+        price, drift = 10_000.0, rng.gauss(0.0, 0.0005)
+        for _ in range(steps):
+            flat.append(round(price))
+            price *= math.exp(drift + rng.gauss(0.0, 0.002))
+    table = array("d")
+    for _ in range(configs):
+        table.extend((
+            rng.choice((10, 20, 30)), rng.choice((1, 2, 3)), rng.choice((2, 5, 8)),
+            rng.uniform(3.0, 8.0), rng.uniform(0.2, 0.5), rng.choice((1, 2, 3)), rng.choice((10, 20)),
+            rng.choice((1, 2, 4)),
+        ))
+    return ScenarioInputs(tuple(symbols), steps, flat, table)
+
+
+# ----------------------------------------------------------------------
+# Scenarios
+# ----------------------------------------------------------------------
+def run_scenario(inputs: ScenarioInputs, scenario: int, base_seed: int = 0) -> ScenarioResult:
+    path_index, config_index = scenario % inputs.n_paths, scenario % inputs.n_configs
+    cfg = inputs.config(config_index)
+    agents: list[Agent] = []
+    makers: list[int] = []
+    for symbol in inputs.symbols:
+        for _ in range(int(cfg["makers"])):
+            makers.append(len(agents))
+            agents.append(MarketMaker(len(agents), symbol, half_spread=int(cfg["half_spread"]),
+                                      size=int(cfg["maker_size"])))
+        for _ in range(int(cfg["noise"])):
+            agents.append(NoiseTrader(len(agents), symbol, spread=cfg["noise_spread"],
+                                      cancel_prob=cfg["cancel_prob"]))
+        for _ in range(int(cfg["momentum"])):
+            agents.append(MomentumTrader(len(agents), symbol, threshold=int(cfg["momentum_threshold"])))
+    reference = {symbol: inputs.path(path_index, i) for i, symbol in enumerate(inputs.symbols)}
+    seed = base_seed + scenario
+    sim = Simulation([Instrument(s) for s in inputs.symbols], agents, seed, reference)
+    result = sim.run(until=inputs.steps)
+
+    rets, vols = [], []
+    for mids in result.mids.values():
+        valid = [m for m in mids if not math.isnan(m)]
+        if len(valid) > 2:
+            steps = [b / a - 1 for a, b in zip(valid, valid[1:])]
+            rets.append(valid[-1] / valid[0] - 1)
+            mean = sum(steps) / len(steps)
+            vols.append(math.sqrt(sum((s - mean) ** 2 for s in steps) / (len(steps) - 1)))
+    return ScenarioResult(
+        scenario, seed, path_index, config_index, result.events, result.trades, result.volume,
+        sum(rets) / len(rets) if rets else math.nan,
+        sum(vols) / len(vols) if vols else math.nan,
+        float(sum(result.equity[i] for i in makers)),
+    )
+
+
+# Worker-side state, set once per process by _attach()
+_worker_shm: shared_memory.SharedMemory | None = None
+_worker_inputs: ScenarioInputs | None = None
+
+
+def _attach(name: str, symbols: tuple[str, ...]) -> None:
+    global _worker_shm, _worker_inputs
+    # track=False: the parent owns the block, a worker exiting must not unlink it
+    _worker_shm = shared_memory.SharedMemory(name=name, track=False)
+    _worker_inputs = ScenarioInputs.attach(_worker_shm.buf, symbols)
+
+
+def _run_chunk(first: int, count: int, base_seed: int) -> tuple[list[ScenarioResult], ScenarioSummary]:
+    """Worker: scenarios [first, first + count) plus their partial summary."""
+    summary = ScenarioSummary()
+    results = []
+    for scenario in range(first, first + count):
+        result = run_scenario(_worker_inputs, scenario, base_seed)
+        summary.add(result)
+        results.append(result)
+    return results, summary
+
+
+def iter_scenarios(
+    inputs: ScenarioInputs,
+    scenarios: int,
+    *,
+    workers: int | None = None,
+    base_seed: int = 0,
+    chunk: int = 8,
+    max_in_flight: int | None = None,
+    summary: ScenarioSummary | None = None,
+) -> Iterator[ScenarioResult]:
+    """
+    Yield every scenario's result as its chunk finishes (completion order).
+
+    If `summary` is given, each chunk's partial summary is merged into it, so
+    once the generator is exhausted it describes all scenarios.
+    """
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = max_in_flight or 2 * workers
+    shm = inputs.to_shared()
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_attach,
+                                 initargs=(shm.name, inputs.symbols)) as executor:
+            starts = iter(range(0, scenarios, chunk))
+            in_flight: set[Future] = set()
+            try:
+                while True:
+                    while len(in_flight) < max_in_flight and (first := next(starts, None)) is not None:
+                        in_flight.add(executor.submit(_run_chunk, first, min(chunk, scenarios - first), base_seed))
+                    if not in_flight:
+                        break
+                    done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        results, partial = future.result()
+                        if summary is not None:
+                            summary.merge(partial)
+                        yield from results
+            finally:
+                for future in in_flight:
+                    future.cancel()
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def run_sequential(inputs: ScenarioInputs, scenarios: int, base_seed: int = 0) -> ScenarioSummary:
+    """The same scenarios in this process, for checking the pool's results."""
+    summary = ScenarioSummary()
+    for scenario in range(scenarios):
+        summary.add(run_scenario(inputs, scenario, base_seed))
+    return summary
+
+
+# ----------------------------------------------------------------------
+# Benchmark: scaling over worker counts, then the full run
+# ----------------------------------------------------------------------
+def bench(scenarios: int, scaling_scenarios: int, max_workers: int, chunk: int) -> None:
+    inputs = synthetic_inputs()
+    task = pickle.dumps((_run_chunk, 0, chunk, 0))
+    print(f"inputs: {inputs.nbytes():,} B in shared memory ({inputs.n_paths} paths x {len(inputs.symbols)}"
+          f" symbols x {inputs.steps} steps, {inputs.n_configs} configs); {len(task)} B pickled per task"
+          f" instead of {len(pickle.dumps(inputs)):,} B")
+
+    counts = sorted({1, *[w for w in (2, 4, 8, 16, 32, 64) if w < max_workers], max_workers})
+    print(f"scaling over {scaling_scenarios:,} scenarios (os.cpu_count() = {os.cpu_count()}):")
+    print(f"{'workers':>8}{'seconds':>10}{'scen/s':>10}{'speedup':>10}{'efficiency':>12}")
+    base = None
+    reference = None
+    for workers in counts:
+        summary = ScenarioSummary()
+        start = time.perf_counter()
+        for _ in iter_scenarios(inputs, scaling_scenarios, workers=workers, chunk=chunk, summary=summary):
+            pass
+        elapsed = time.perf_counter() - start
+        # Same seeds on every run: the merged summaries must agree whatever the worker count
+        key = (summary.count, summary.metrics["trades"].mean, summary.metrics["volume"].max)
+        assert reference is None or key[0] == reference[0] and math.isclose(key[1], reference[1]), (key, reference)
+        reference = key
+        base = base or elapsed
+        print(f"{workers:>8}{elapsed:>10.2f}{scaling_scenarios / elapsed:>10.1f}{base / elapsed:>10.2f}"
+              f"{base / elapsed / workers:>11.0%}")
+
+    summary = ScenarioSummary()
+    start = time.perf_counter()
+    first = None
+    for _ in iter_scenarios(inputs, scenarios, workers=max_workers, chunk=chunk, summary=summary):
+        first = first or time.perf_counter() - start
+    elapsed = time.perf_counter() - start
+    print(f"{scenarios:,} scenarios on {max_workers} workers: {elapsed:.1f}s wall"
+          f" ({scenarios / elapsed:.1f}/s, first result after {first:.2f}s)")
+    print(summary.report())
+
+
+def demo(scenarios: int, workers: int | None) -> None:
+    inputs = synthetic_inputs(paths=8, configs=4)
+    summary = ScenarioSummary()
+    for result in iter_scenarios(inputs, scenarios, workers=workers, summary=summary):
+        if result.scenario < 5:
+            print(result)
+    print(f"{summary.count} scenarios")
+    print(summary.report())
+    check = run_sequential(inputs, min(scenarios, 20))
+    print("sequential check, first 20:", check.metrics["trades"].mean)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--bench", action="store_true")
+    parser.add_argument("--scenarios", type=int, default=200)
+    parser.add_argument("--scaling-scenarios", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk", type=int, default=8)
+    args = parser.parse_args()
+    if args.bench:
+        bench(args.scenarios, args.scaling_scenarios, args.workers, args.chunk)
+    else:
+        demo(args.scenarios, args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+"""threading.Event coordination, wake-up primitives and an Event-driven worker pool."""
@@ -0,0 +1,400 @@
+"""
+Goal:
+----
+Grow the one-worker / one-waiter threading.Event demo into a worker pool that a
+long-running service can actually use: many workers, a bounded work queue,
+cooperative cancellation and a shutdown that respects a deadline.
+
+Key Idea
+--------
+- Events still do the signalling, exactly as in threading_event_wait_annotated.py:
+    - pool.stop_event      : pool-wide "please stop" flag
+    - handle.cancel_event  : per-task "please stop" flag, also set by the pool on shutdown
+    - handle.done_event    : set when the task finished (result, exception or cancelled)
+- A task is fn(cancel_event, *args, **kwargs). Like the demo's worker, it decides
+  itself what to do when the event is set (return early, clean up...).
+  set() never kills a thread.
+- The queue is bounded, so submit() blocks (or times out) when producers are
+  faster than the workers, instead of buffering without limit.
+- Pool size is fixed (min_workers == max_workers) or elastic: extra workers are
+  started while the queue has work and retire after idle_timeout seconds.
+- join(timeout) drains gracefully; if the deadline passes, it cancels what is
+  left and reports what could not be stopped instead of hanging.
+
+Usage:
+    python -m py_dissection_lab.threads.event_worker_pool            # demo
+    python -m py_dissection_lab.threads.event_worker_pool --bench    # dispatch latency / throughput at 1..64 threads
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import queue
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+_SHUTDOWN = object()   # queue sentinel: one per worker on shutdown
+
+
+class TaskCancelled(Exception):
+    """Raised by TaskHandle.result() for a task that was cancelled before it started."""
+
+
+class TaskHandle:
+    """What submit() returns: the task's events and, once done, its outcome."""
+
+    _ids = itertools.count(1)
+
+    def __init__(self, fn: Callable, args: tuple, kwargs: dict, name: str | None):
+        self.fn, self.args, self.kwargs = fn, args, kwargs
+        self.name = name or f"task-{next(self._ids)}"
+        self.cancel_event = threading.Event()
+        self.done_event = threading.Event()
+        self.submitted_at = time.perf_counter()
+        self.started_at: float | None = None
+        self._result: Any = None
+        self._exception: BaseException | None = None
+        self.cancelled = False
+
+    def cancel(self) -> None:
+        """Ask the task to stop; a task that has not started yet will be skipped."""
+        self.cancel_event.set()
+
+    def done(self) -> bool:
+        return self.done_event.is_set()
+
+    def result(self, timeout: float | None = None) -> Any:
+        if not self.done_event.wait(timeout):
+            raise TimeoutError(f"{self.name} did not finish within {timeout}s")
+        if self.cancelled:
+            raise TaskCancelled(self.name)
+        if self._exception is not None:
+            raise self._exception
+        return self._result
+
+
+@dataclass
+class ShutdownReport:
+    """Outcome of WorkerPool.join()."""
+
+    clean: bool                                         # every worker exited before the deadline
+    elapsed: float
+    completed: int
+    failed: int
+    cancelled: int
+    dropped_pending: list[str] = field(default_factory=list)   # queued tasks that never ran
+    still_running: list[str] = field(default_factory=list)     # tasks that ignored cancellation
+
+
+class WorkerPool:
+    """
+    Thread pool built around threading.Event signalling.
+
+    - min_workers / max_workers : fixed size if equal, elastic otherwise
+    - queue_size                : bound of the work queue (submit() blocks when full)
+    - idle_timeout              : seconds before an extra (elastic) worker retires
+    """
+
+    def __init__(self, min_workers: int = 4, max_workers: int | None = None,
+                 queue_size: int = 1024, idle_timeout: float = 5.0, name: str = "pool"):
+        max_workers = max_workers or min_workers
+        if not 1 <= min_workers <= max_workers:
+            raise ValueError(f"need 1 <= min_workers <= max_workers, got {min_workers}, {max_workers}")
+        self.min_workers, self.max_workers = min_workers, max_workers
+        self.idle_timeout = idle_timeout
+        self.name = name
+
+        self.stop_event = threading.Event()
+        self._queue: queue.Queue = queue.Queue(queue_size)
+        self._lock = threading.Lock()
+        self._workers: set[threading.Thread] = set()
+        self._idle = 0
+        self._running: set[TaskHandle] = set()
+        self._closing = False
+        self._worker_ids = itertools.count(1)
+
+        self.completed = self.failed = self.cancelled = 0
+
+        for _ in range(min_workers):
+            self._spawn()
+
+    # ------------------------------------------------------------------
+    def submit(self, fn: Callable, *args, name: str | None = None, timeout: float | None = None, **kwargs) -> TaskHandle:
+        """
+        Queue fn(cancel_event, *args, **kwargs). Blocks while the queue is full;
+        raises queue.Full if `timeout` seconds pass first.
+        """
+        if self._closing:
+            raise RuntimeError(f"{self.name} is shutting down")
+        handle = TaskHandle(fn, args, kwargs, name)
+        self._queue.put(handle, timeout=timeout)
+        self._maybe_grow()
+        return handle
+
+    def _maybe_grow(self) -> None:
+        # Elastic mode: start another worker if work is waiting and nobody is idle
+        if self.max_workers == self.min_workers:
+            return
+        with self._lock:
+            if self._idle == 0 and len(self._workers) < self.max_workers and not self._queue.empty():
+                self._spawn()
+
+    def _spawn(self) -> None:
+        t = threading.Thread(target=self._worker, name=f"{self.name}-worker-{next(self._worker_ids)}", daemon=True)
+        self._workers.add(t)
+        t.start()
+
+    # ------------------------------------------------------------------
+    def _worker(self) -> None:
+        me = threading.current_thread()
+        elastic = self.max_workers > self.min_workers
+        try:
+            while True:
+                with self._lock:
+                    self._idle += 1
+                try:
+                    handle = self._queue.get(timeout=self.idle_timeout if elastic else None)
+                except queue.Empty:
+                    with self._lock:
+                        # Extra workers retire when idle; the core stays
+                        if len(self._workers) > self.min_workers:
+                            self._workers.discard(me)
+                            return
+                    continue
+                finally:
+                    with self._lock:
+                        self._idle -= 1
+
+                if handle is _SHUTDOWN:
+                    return
+                self._run(handle)
+        finally:
+            with self._lock:
+                self._workers.discard(me)
+
+    def _run(self, handle: TaskHandle) -> None:
+        # Check and register in one step: a forced drain sets stop_event and then
+        # reads _running under the lock, so it either sees this task or we see stop_event
+        with self._lock:
+            skip = handle.cancel_event.is_set() or self.stop_event.is_set()
+            if not skip:
+                self._running.add(handle)
+        if skip:
+            self._finish(handle, cancelled=True)
+            return
+
+        handle.started_at = time.perf_counter()
+        try:
+            handle._result = handle.fn(handle.cancel_event, *handle.args, **handle.kwargs)
+        except BaseException as exc:
+            handle._exception = exc
+        finally:
+            with self._lock:
+                self._running.discard(handle)
+        # A task that saw its cancel_event and returned early still returns its own value
+        self._finish(handle, cancelled=False)
+
+    def _finish(self, handle: TaskHandle, cancelled: bool) -> None:
+        handle.cancelled = cancelled
+        with self._lock:
+            if cancelled:
+                self.cancelled += 1
+            elif handle._exception is not None:
+                self.failed += 1
+            else:
+                self.completed += 1
+        handle.done_event.set()
+
+    # ------------------------------------------------------------------
+    def join(self, timeout: float | None = None, cancel_pending: bool = False) -> ShutdownReport:
+        """
+        Stop accepting work and shut the pool down.
+
+        - Graceful phase: queued tasks still run (unless cancel_pending) and the
+          workers exit after the queue is empty.
+        - If `timeout` expires first: stop_event and every running task's
+          cancel_event are set, queued tasks are dropped, and the report lists the
+          tasks that were still running at the deadline.
+        """
+        start = time.perf_counter()
+        deadline = None if timeout is None else start + timeout
+        self._closing = True
+
+        dropped: list[str] = []
+        if cancel_pending:
+            dropped += self._drain_queue()
+
+        with self._lock:
+            workers = list(self._workers)
+        # One sentinel per worker, behind all queued work
+        for _ in workers:
+            if not self._put_before(deadline):
+                break
+
+        for t in workers:
+            t.join(None if deadline is None else max(0.0, deadline - time.perf_counter()))
+
+        clean = not any(t.is_alive() for t in workers)
+        if not clean:
+            # Forced drain: ask everything to stop, throw away what never started
+            self.stop_event.set()
+            with self._lock:
+                running = list(self._running)
+            for handle in running:
+                handle.cancel()
+            dropped += self._drain_queue()
+            # The drain took the sentinels too: give every live worker one back,
+            # or it blocks in get() forever once its task returns
+            for t in workers:
+                if t.is_alive():
+                    try:
+                        self._queue.put_nowait(_SHUTDOWN)
+                    except queue.Full:
+                        break
+            for t in workers:
+                t.join(0.05)   # short grace period for tasks that check their event
+        else:
+            self.stop_event.set()
+
+        with self._lock:
+            still_running = [h.name for h in self._running]
+        return ShutdownReport(
+            clean=clean,
+            elapsed=time.perf_counter() - start,
+            completed=self.completed,
+            failed=self.failed,
+            cancelled=self.cancelled,
+            dropped_pending=dropped,
+            still_running=still_running,
+        )
+
+    def _put_before(self, deadline: float | None) -> bool:
+        try:
+            self._queue.put(_SHUTDOWN, timeout=None if deadline is None else max(0.0, deadline - time.perf_counter()))
+            return True
+        except queue.Full:
+            return False
+
+    def _drain_queue(self) -> list[str]:
+        dropped = []
+        while True:
+            try:
+                handle = self._queue.get_nowait()
+            except queue.Empty:
+                return dropped
+            if handle is not _SHUTDOWN:
+                self._finish(handle, cancelled=True)
+                dropped.append(handle.name)
+
+    def __enter__(self) -> WorkerPool:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.join()
+
+
+# ----------------------------------------------------------------------
+# Demo
+# ----------------------------------------------------------------------
+def polite_task(cancel_event: threading.Event, seconds: float) -> str:
+    """Works in small steps and checks its event between them, like the demo's worker."""
+    # wait() returns True as soon as the event is set, False on timeout
+    if cancel_event.wait(seconds):
+        return "stopped early"
+    return f"slept {seconds}s"
+
+
+def stubborn_task(cancel_event: threading.Event, seconds: float) -> str:
+    """Ignores its event; join() can only report it."""
+    time.sleep(seconds)
+    return "done"
+
+
+def demo() -> None:
+    pool = WorkerPool(min_workers=2, max_workers=6, queue_size=16, idle_timeout=0.5)
+    handles = [pool.submit(polite_task, 0.2, name=f"polite-{i}") for i in range(8)]
+    handles.append(pool.submit(stubborn_task, 1.5, name="stubborn"))
+    handles.append(pool.submit(polite_task, 10, name="long-polite"))
+    handles[0].cancel()
+
+    time.sleep(0.5)
+    report = pool.join(timeout=0.5)
+    print(report)
+    for h in handles:
+        try:
+            print(f"{h.name:<12} ->", h.result(timeout=0))
+        except TaskCancelled:
+            print(f"{h.name:<12} -> cancelled")
+        except TimeoutError:
+            print(f"{h.name:<12} -> still running")
+
+
+# ----------------------------------------------------------------------
+# Benchmark
+# ----------------------------------------------------------------------
+def _noop(cancel_event: threading.Event) -> None:
+    return None
+
+
+def _cpu(cancel_event: threading.Event, n: int) -> int:
+    total = 0
+    for i in range(n):
+        total += i * i
+    return total
+
+
+def bench(tasks: int, thread_counts: list[int], cpu_n: int) -> None:
+    import statistics
+
+    is_gil_enabled = getattr(sys, "_is_gil_enabled", lambda: True)()
+    print(f"Python {sys.version.split()[0]}, GIL {'enabled' if is_gil_enabled else 'disabled'}, {tasks:,} tasks per run")
+    print(f"{'threads':>8}{'dispatch p50 us':>17}{'p99 us':>10}{'noop tasks/s':>15}{'cpu tasks/s':>14}")
+
+    for threads in thread_counts:
+        with WorkerPool(threads, queue_size=4096) as pool:
+            # Dispatch latency: one task in flight at a time, so it is the
+            # queue hand-off + worker wake-up, not time spent waiting in line
+            latencies = []
+            for _ in range(min(tasks, 2000)):
+                h = pool.submit(_noop)
+                h.done_event.wait()
+                latencies.append((h.started_at - h.submitted_at) * 1e6)
+            latencies.sort()
+
+            start = time.perf_counter()
+            handles = [pool.submit(_noop) for _ in range(tasks)]
+            for h in handles:
+                h.done_event.wait()
+            noop_rate = tasks / (time.perf_counter() - start)
+
+            start = time.perf_counter()
+            cpu_handles = [pool.submit(_cpu, cpu_n) for _ in range(tasks // 10)]
+            for h in cpu_handles:
+                h.done_event.wait()
+            cpu_rate = len(cpu_handles) / (time.perf_counter() - start)
+
+        p50 = statistics.median(latencies)
+        p99 = latencies[int(len(latencies) * 0.99) - 1]
+        print(f"{threads:>8}{p50:>17,.1f}{p99:>10,.1f}{noop_rate:>15,.0f}{cpu_rate:>14,.0f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--bench", action="store_true")
+    parser.add_argument("--tasks", type=int, default=20_000)
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32, 64])
+    parser.add_argument("--cpu-n", type=int, default=20_000, help="loop length of the CPU-bound task")
+    args = parser.parse_args()
+
+    if args.bench:
+        bench(args.tasks, args.threads, args.cpu_n)
+    else:
+        demo()
+
+
+if __name__ == "__main__":
+    main()
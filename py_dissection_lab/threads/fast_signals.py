@@ -0,0 +1,193 @@
+"""
+Goal:
+----
+A drop-in alternative to threading.Event for hot signalling paths, which can
+also be awaited from asyncio.
+
+Key Idea
+--------
+- FdEvent keeps the Event API: set(), clear(), is_set(), wait(timeout)
+- The "set" state lives in a plain Python flag, so is_set() is just an attribute read
+- A file descriptor (eventfd on Linux, a pipe elsewhere) is only written when
+  somebody is actually waiting. A set()/clear() cycle with no waiters costs one
+  lock round trip and no system call.
+- While the event is set the fd stays readable (level triggered), so every waiter
+  wakes up, like Event.set() waking all threads blocked in wait()
+- Because it is an fd, an asyncio loop can watch it: `await ev.wait_async()`
+  works even when set() is called from another thread, with no
+  call_soon_threadsafe plumbing.
+
+The waiter counter is the only subtle part. Both wait() and set() look at it
+under the same lock:
+- a waiter that registered before set() -> set() writes to the fd -> waiter wakes
+- a waiter that arrives after set()     -> it sees the flag and never sleeps
+so a wake-up can not be lost.
+
+Where it wins (see signal_benchmark.py): set()/clear() with nobody waiting is
+several times cheaper than Event's, and a single waiter is woken about as fast.
+With dozens of waiters Event/Condition wake them faster (every FdEvent waiter
+is a separate select() call), so keep threading.Event for wide fan-out.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import select
+import threading
+import time
+
+
+class FdEvent:
+    """threading.Event-compatible event backed by an eventfd (Linux) or a pipe."""
+
+    def __init__(self, backend: str = "auto"):
+        if backend == "auto":
+            backend = "eventfd" if hasattr(os, "eventfd") else "pipe"
+        if backend == "eventfd":
+            self._rfd = self._wfd = os.eventfd(0, os.EFD_NONBLOCK | os.EFD_CLOEXEC)
+        elif backend == "pipe":
+            self._rfd, self._wfd = os.pipe()
+            os.set_blocking(self._rfd, False)
+            os.set_blocking(self._wfd, False)
+        else:
+            raise ValueError(f"unknown backend {backend!r}")
+        self.backend = backend
+
+        self._lock = threading.Lock()
+        self._flag = False
+        self._waiters = 0
+        self._signalled = False         # fd currently holds a token
+        self._async_waiters: dict[asyncio.AbstractEventLoop, list[asyncio.Future]] = {}
+
+    # ------------------------------------------------------------------
+    def is_set(self) -> bool:
+        return self._flag
+
+    def set(self) -> None:
+        with self._lock:
+            if self._flag:
+                return
+            self._flag = True
+            if self._waiters and not self._signalled:
+                self._write_token()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._flag = False
+            if self._signalled:
+                self._drain()
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """Block until the event is set; returns the flag like Event.wait()."""
+        if self._flag:
+            return True
+        with self._lock:
+            if self._flag:
+                return True
+            self._waiters += 1
+        try:
+            deadline = None if timeout is None else time.monotonic() + timeout
+            while not self._flag:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    break
+                # select() releases the GIL while blocked
+                select.select([self._rfd], [], [], remaining)
+            return self._flag
+        finally:
+            with self._lock:
+                self._waiters -= 1
+
+    async def wait_async(self) -> bool:
+        """Await the event from asyncio; set() may be called from any thread."""
+        if self._flag:
+            return True
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        with self._lock:
+            if self._flag:
+                return True
+            self._waiters += 1
+            waiters = self._async_waiters.setdefault(loop, [])
+            if not waiters:
+                # One reader per loop: add_reader() would replace an earlier callback
+                loop.add_reader(self._rfd, self._on_readable, loop)
+            waiters.append(future)
+        try:
+            return await future
+        finally:
+            with self._lock:
+                self._waiters -= 1
+                waiters = self._async_waiters.get(loop)
+                if waiters and future in waiters:
+                    waiters.remove(future)
+                    if not waiters:
+                        loop.remove_reader(self._rfd)
+                        del self._async_waiters[loop]
+
+    def _on_readable(self, loop: asyncio.AbstractEventLoop) -> None:
+        with self._lock:
+            if not self._flag:
+                return  # cleared again before we got here; keep waiting
+            waiters = self._async_waiters.pop(loop, [])
+            loop.remove_reader(self._rfd)
+        for future in waiters:
+            if not future.done():
+                future.set_result(True)
+
+    # ------------------------------------------------------------------
+    def _write_token(self) -> None:
+        if self.backend == "eventfd":
+            os.eventfd_write(self._wfd, 1)
+        else:
+            os.write(self._wfd, b"\x01")
+        self._signalled = True
+
+    def _drain(self) -> None:
+        try:
+            if self.backend == "eventfd":
+                os.eventfd_read(self._rfd)
+            else:
+                while os.read(self._rfd, 4096):
+                    pass
+        except BlockingIOError:
+            pass
+        self._signalled = False
+
+    def fileno(self) -> int:
+        """Readable while the event is set and somebody waits; usable with select()."""
+        return self._rfd
+
+    def close(self) -> None:
+        os.close(self._rfd)
+        if self._wfd != self._rfd:
+            os.close(self._wfd)
+
+    def __enter__(self) -> FdEvent:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+if __name__ == "__main__":
+    # Same story as threading_event_wait_annotated.py, plus an asyncio waiter
+    stop_event = FdEvent()
+
+    def worker():
+        print("Worker started, will be stopped 1 sec later...")
+        time.sleep(1)
+        stop_event.set()
+        print("Worker executed stop_event.set()")
+
+    async def async_waiter():
+        await stop_event.wait_async()
+        print("asyncio waiter: stop_event got set")
+
+    t = threading.Thread(target=worker)
+    t.start()
+    asyncio.run(async_waiter())
+    print("Main: wait() ->", stop_event.wait())
+    t.join()
+    stop_event.close()
@@ -0,0 +1,212 @@
+"""
+Goal:
+----
+Measure what threading.Event.wait() actually costs compared to the other ways a
+thread can wake another one up.
+
+Key Idea
+--------
+Every primitive is wrapped in the same three operations:
+- wait()   : block until signalled (called by every waiter thread)
+- signal() : wake all waiters (called by the main thread)
+- reset()  : go back to "not signalled" for the next round
+
+Primitives:
+- event      threading.Event
+- condition  threading.Condition + a flag (what Event does internally)
+- queue      queue.Queue, one token per waiter
+- eventfd    FdEvent(backend="eventfd") from fast_signals.py
+- pipe       FdEvent(backend="pipe")
+
+Three measurements, with 1, 8 and 64 waiter threads:
+1) wake-up latency: main takes a timestamp, calls signal(); each waiter takes a
+   timestamp when wait() returns. Waiters are given time to really block first,
+   so this is the sleeping -> running path. Reported as p50 / p99 / p99.9.
+2) round throughput: signal -> all waiters woke -> reset, as fast as possible
+3) set/clear cycles per second with nobody waiting (the hot path in our code)
+
+Usage:
+    python -m py_dissection_lab.threads.signal_benchmark
+    python -m py_dissection_lab.threads.signal_benchmark --waiters 1 8 --rounds 500
+"""
+
+from __future__ import annotations
+
+import argparse
+import queue
+import sys
+import threading
+import time
+
+from .fast_signals import FdEvent
+
+
+class EventSignal:
+    def __init__(self, waiters: int):
+        self.ev = threading.Event()
+        self.wait, self.signal, self.reset = self.ev.wait, self.ev.set, self.ev.clear
+
+
+class ConditionSignal:
+    def __init__(self, waiters: int):
+        self.cond = threading.Condition()
+        self.flag = False
+
+    def wait(self):
+        with self.cond:
+            while not self.flag:
+                self.cond.wait()
+
+    def signal(self):
+        with self.cond:
+            self.flag = True
+            self.cond.notify_all()
+
+    def reset(self):
+        with self.cond:
+            self.flag = False
+
+
+class QueueSignal:
+    def __init__(self, waiters: int):
+        self.q: queue.Queue = queue.Queue()
+        self.waiters = waiters
+
+    def wait(self):
+        self.q.get()
+
+    def signal(self):
+        for _ in range(self.waiters):
+            self.q.put(None)
+
+    def reset(self):
+        pass  # every token was consumed by a waiter
+
+
+class FdSignal:
+    backend = "eventfd"
+
+    def __init__(self, waiters: int):
+        self.ev = FdEvent(self.backend)
+        self.wait, self.signal, self.reset = self.ev.wait, self.ev.set, self.ev.clear
+
+
+class PipeSignal(FdSignal):
+    backend = "pipe"
+
+
+PRIMITIVES = {
+    "event": EventSignal,
+    "condition": ConditionSignal,
+    "queue": QueueSignal,
+    "eventfd": FdSignal,
+    "pipe": PipeSignal,
+}
+
+
+def _percentile(sorted_values: list[float], q: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * q))]
+
+
+def measure_latency(factory, waiters: int, rounds: int, settle: float) -> list[float]:
+    """Wake-up latencies in microseconds, one sample per waiter per round."""
+    prim = factory(waiters)
+    start_barrier = threading.Barrier(waiters + 1)
+    done_barrier = threading.Barrier(waiters + 1)
+    signalled_at = [0]
+    samples: list[float] = []
+    lock = threading.Lock()
+
+    def waiter():
+        local = []
+        for _ in range(rounds):
+            start_barrier.wait()
+            prim.wait()
+            local.append(time.perf_counter_ns() - signalled_at[0])
+            done_barrier.wait()
+        with lock:
+            samples.extend(local)
+
+    threads = [threading.Thread(target=waiter) for _ in range(waiters)]
+    for t in threads:
+        t.start()
+    for _ in range(rounds):
+        start_barrier.wait()
+        time.sleep(settle)          # let every waiter block inside wait()
+        signalled_at[0] = time.perf_counter_ns()
+        prim.signal()
+        done_barrier.wait()
+        prim.reset()
+    for t in threads:
+        t.join()
+    return sorted(ns / 1000 for ns in samples)
+
+
+def measure_rounds_per_sec(factory, waiters: int, rounds: int) -> float:
+    prim = factory(waiters)
+    done_barrier = threading.Barrier(waiters + 1)
+    go = threading.Barrier(waiters + 1)
+
+    def waiter():
+        for _ in range(rounds):
+            go.wait()
+            prim.wait()
+            done_barrier.wait()
+
+    threads = [threading.Thread(target=waiter) for _ in range(waiters)]
+    for t in threads:
+        t.start()
+    start = time.perf_counter()
+    for _ in range(rounds):
+        go.wait()
+        prim.signal()
+        done_barrier.wait()
+        prim.reset()
+    elapsed = time.perf_counter() - start
+    for t in threads:
+        t.join()
+    return rounds / elapsed
+
+
+def measure_set_clear(factory, cycles: int) -> float | None:
+    prim = factory(1)
+    if isinstance(prim, QueueSignal):
+        return None                 # no set/clear state to toggle
+    signal, reset = prim.signal, prim.reset
+    start = time.perf_counter()
+    for _ in range(cycles):
+        signal()
+        reset()
+    return cycles / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--waiters", type=int, nargs="+", default=[1, 8, 64])
+    parser.add_argument("--rounds", type=int, default=2000, help="latency rounds (divided by waiters, min 100)")
+    parser.add_argument("--settle", type=float, default=0.0005, help="seconds waiters get to block before signal()")
+    parser.add_argument("--cycles", type=int, default=1_000_000, help="set/clear cycles with no waiters")
+    parser.add_argument("--only", nargs="+", choices=sorted(PRIMITIVES), default=list(PRIMITIVES))
+    args = parser.parse_args()
+
+    is_gil_enabled = getattr(sys, "_is_gil_enabled", lambda: True)()
+    print(f"Python {sys.version.split()[0]}, GIL {'enabled' if is_gil_enabled else 'disabled'}")
+
+    print(f"\nset()+clear() with no waiters, {args.cycles:,} cycles")
+    for name in args.only:
+        rate = measure_set_clear(PRIMITIVES[name], args.cycles)
+        print(f"  {name:<10}" + ("     (n/a)" if rate is None else f"{rate:>14,.0f} cycles/s"))
+
+    for waiters in args.waiters:
+        rounds = max(100, args.rounds // waiters)
+        print(f"\n{waiters} waiter(s), {rounds} rounds")
+        print(f"  {'primitive':<10}{'p50 us':>10}{'p99 us':>10}{'p99.9 us':>10}{'rounds/s':>12}")
+        for name in args.only:
+            lat = measure_latency(PRIMITIVES[name], waiters, rounds, args.settle)
+            rate = measure_rounds_per_sec(PRIMITIVES[name], waiters, rounds)
+            print(f"  {name:<10}{_percentile(lat, 0.5):>10,.1f}{_percentile(lat, 0.99):>10,.1f}"
+                  f"{_percentile(lat, 0.999):>10,.1f}{rate:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
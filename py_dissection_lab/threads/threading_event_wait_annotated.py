@@ -37,20 +37,24 @@ def worker():
     stop_event.set()    # Signal: event state becomes "set" and waiting threads are released
     print("Worker executed stop_event.set()")
 
-# target=worker means that run the worker function in a new OS-level thread managed by Python
-t = threading.Thread(target=worker)
-t.start()
-
-print("Main: I am waiting for stop_event)")
-# Block the main thread until the event is set.
-# - If the event is already set, wait() returns immediately
-# - Otherwise, it blocks until some thread calls stop_event.set()
-stop_event.wait()
-print("Main: stop_event got set so I am carrying on")
-
-# Ensure the worker thread has finished before exiting the program.
-# Even though the event has been set, joining is a good practice to:
-# - avoid leaving background work incomplete
-# - ensure a clean, deterministic shutdown
-t.join()
-
+def main():
+    # target=worker means that run the worker function in a new OS-level thread managed by Python
+    t = threading.Thread(target=worker)
+    t.start()
+
+    print("Main: I am waiting for stop_event)")
+    # Block the main thread until the event is set.
+    # - If the event is already set, wait() returns immediately
+    # - Otherwise, it blocks until some thread calls stop_event.set()
+    stop_event.wait()
+    print("Main: stop_event got set so I am carrying on")
+
+    # Ensure the worker thread has finished before exiting the program.
+    # Even though the event has been set, joining is a good practice to:
+    # - avoid leaving background work incomplete
+    # - ensure a clean, deterministic shutdown
+    t.join()
+
+
+if __name__ == "__main__":
+    main()